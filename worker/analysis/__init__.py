@@ -2,7 +2,29 @@
 Bull's Eye - Analysis Module
 """
 
-from .component_detector import ComponentDetector
-from .engine import AnalysisEngine
+from typing import Any
 
 __all__ = ["ComponentDetector", "AnalysisEngine"]
+
+# Exports are resolved lazily so importing a submodule (e.g. the component
+# detector) does not pull in the engine's git/database/scanner dependencies.
+_LAZY_EXPORTS = {
+    "ComponentDetector": ".component_detector",
+    "AnalysisEngine": ".engine",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from importlib import import_module
+
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -4,9 +4,12 @@ Intelligent detection of code components in a repository
 """
 
 import os
+import sys
+import mmap
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Set
-from collections import defaultdict
+from typing import List, Dict, Any, Optional, Set, Iterator, Tuple
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import structlog
 
 from config import settings
@@ -40,7 +43,7 @@ NON_CODE_EXTENSIONS = {
 EXTENSION_TO_LANGUAGE = {}
 for lang, exts in LANGUAGE_EXTENSIONS.items():
     for ext in exts:
-        EXTENSION_TO_LANGUAGE[ext] = lang
+        EXTENSION_TO_LANGUAGE[ext] = sys.intern(lang)
 
 # Directories to skip
 SKIP_DIRECTORIES = {
@@ -52,6 +55,17 @@ SKIP_DIRECTORIES = {
     "eggs", "*.egg-info", "site-packages",
 }
 
+# Exact names and wildcard suffixes split out for O(1) checks
+_SKIP_NAMES = frozenset(name for name in SKIP_DIRECTORIES if "*" not in name)
+_SKIP_SUFFIXES = tuple(name.replace("*", "") for name in SKIP_DIRECTORIES if "*" in name)
+
+# Files at or above this size are memory-mapped for line counting
+MMAP_LINE_COUNT_THRESHOLD = 64 * 1024
+MMAP_LINE_COUNT_CHUNK = 1024 * 1024
+
+# Threads used to read files for line counting (I/O-bound, releases the GIL)
+FILE_MEASURE_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
 # Component type markers
 COMPONENT_MARKERS = {
     "service": ["main.py", "main.go", "main.rs", "index.ts", "index.js", "app.py", "server.py"],
@@ -63,6 +77,48 @@ COMPONENT_MARKERS = {
     "util": ["utils/", "helpers/", "common/", "shared/", "lib/"],
 }
 
+def _basename(path: str) -> str:
+    """Final component of a relative path string, like Path.name without the Path."""
+    return path[max(path.rfind("/"), path.rfind(os.sep)) + 1:]
+
+
+def _ext(name: str) -> str:
+    """Lower-cased extension of a file name or path, like Path.suffix without the Path."""
+    start = max(name.rfind("/"), name.rfind(os.sep)) + 1
+    i = name.rfind(".")
+    return name[i:].lower() if start < i < len(name) - 1 else ""
+
+
+def read_file_capped(file_path: Path, max_bytes: int) -> Optional[str]:
+    """Read at most max_bytes of a file; None if it is larger. Raises OSError."""
+    with open(file_path, 'rb') as fh:
+        data = fh.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        return None
+    return data.decode('utf-8', errors='ignore')
+
+
+# Marker lookups derived from COMPONENT_MARKERS; earlier types win ties
+_TYPE_RANK = {comp_type: rank for rank, comp_type in enumerate(COMPONENT_MARKERS)}
+_DIR_MARKERS: Dict[str, str] = {}
+_EXACT_MARKERS: Dict[str, str] = {}
+for _comp_type, _markers in COMPONENT_MARKERS.items():
+    for _marker in _markers:
+        if _marker.endswith("/"):
+            _DIR_MARKERS.setdefault(_marker.rstrip("/"), _comp_type)
+        else:
+            _EXACT_MARKERS.setdefault(_marker, _comp_type)
+_SUBSTR_MARKERS: Tuple[Tuple[str, str], ...] = tuple(
+    (marker, comp_type)
+    for comp_type, markers in COMPONENT_MARKERS.items()
+    for marker in markers
+    if not marker.endswith("/")
+)
+_PREFIX_MARKERS: Tuple[Tuple[str, str], ...] = tuple(
+    sorted(_SUBSTR_MARKERS, key=lambda item: len(item[0]), reverse=True)
+)
+_PREFIXES = tuple(marker for marker, _ in _PREFIX_MARKERS)
+
 
 class ComponentDetector:
     """Detect logical components in a codebase."""
@@ -70,6 +126,8 @@ class ComponentDetector:
     def __init__(self, repo_path: Path):
         self.repo_path = Path(repo_path)
         self.logger = structlog.get_logger().bind(component="detector")
+        self._walk_cache: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._child_cache: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
     
     def detect_components(self) -> List[Dict[str, Any]]:
         """
@@ -91,40 +149,146 @@ class ComponentDetector:
         # Get top-level directories as potential components
         top_level_dirs = self._get_component_candidates()
         
-        for dir_path in top_level_dirs:
-            rel_path = dir_path.relative_to(self.repo_path)
-            
-            # Skip non-code directories
-            if self._should_skip_directory(dir_path):
-                continue
+        # One measuring pool for the whole run rather than one per component
+        with ThreadPoolExecutor(max_workers=FILE_MEASURE_WORKERS) as executor:
+            for dir_path in top_level_dirs:
+                rel_path = dir_path.relative_to(self.repo_path)
+                
+                # Skip non-code directories
+                if self._should_skip_directory(dir_path):
+                    continue
+                
+                # Analyze the directory
+                component = self._analyze_directory(dir_path, rel_path, executor)
+                if component and component.get("file_count", 0) > 0:
+                    components.append(component)
             
-            # Analyze the directory
-            component = self._analyze_directory(dir_path, rel_path)
-            if component and component.get("file_count", 0) > 0:
-                components.append(component)
-        
-        # If no components found, treat root as single component
-        if not components:
-            root_component = self._analyze_directory(self.repo_path, Path("."))
-            if root_component:
-                root_component["name"] = self.repo_path.name
-                components.append(root_component)
+            # If no components found, treat root as single component
+            if not components:
+                root_component = self._analyze_directory(self.repo_path, Path("."), executor)
+                if root_component:
+                    root_component["name"] = self.repo_path.name
+                    components.append(root_component)
         
         self.logger.info("Component detection complete", component_count=len(components))
         return components
     
+    def _walk_once(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Walk the repository a single time and cache code file metadata.
+        Entries are grouped by top-level directory ("." for root files).
+        """
+        if self._walk_cache is not None:
+            return self._walk_cache
+        
+        cache: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        prefix_len = len(os.path.join(str(self.repo_path), ""))
+        
+        for file_path, language, size_bytes in self._iter_code_files(self.repo_path):
+            rel_path = file_path[prefix_len:]
+            top_level, sep, _ = rel_path.partition(os.sep)
+            cache[top_level if sep else "."].append({
+                "path": rel_path,
+                "language": language,
+                "size_bytes": size_bytes,
+            })
+        
+        self._walk_cache = dict(cache)
+        return self._walk_cache
+    
+    def _iter_code_files(self, root: Path) -> Iterator[Tuple[str, str, int]]:
+        """
+        Yield (path, language, size_bytes) for every code file below root.
+        Uses os.scandir so file type and size come from the directory entry.
+        """
+        stack = [str(root)]
+        
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        # Like os.walk: never descend into symlinked directories,
+                        # but symlinked files still count
+                        if entry.is_dir(follow_symlinks=False):
+                            # Filter out skip directories
+                            if entry.name not in _SKIP_NAMES:
+                                stack.append(entry.path)
+                            continue
+                        
+                        if not entry.is_file():
+                            continue
+                        
+                        language = EXTENSION_TO_LANGUAGE.get(_ext(entry.name))
+                        if language is None:
+                            continue
+                        
+                        try:
+                            size_bytes = entry.stat().st_size
+                        except OSError as e:
+                            self.logger.warning(f"Error processing file {entry.path}: {e}")
+                            continue
+                        
+                        yield entry.path, language, size_bytes
+            except OSError as e:
+                self.logger.warning(f"Error scanning directory {current}: {e}")
+    
+    def _files_under(self, rel_path: Path) -> List[Dict[str, Any]]:
+        """Get cached code file metadata for files below a repo-relative directory."""
+        cache = self._walk_once()
+        
+        if not rel_path.parts:
+            return [entry for entries in cache.values() for entry in entries]
+        
+        top = rel_path.parts[0]
+        if len(rel_path.parts) == 1:
+            return cache.get(top, [])
+        
+        entries = self._entries_by_child(top).get(rel_path.parts[1], [])
+        if len(rel_path.parts) == 2:
+            return entries
+        
+        prefix = str(rel_path) + os.sep
+        return [entry for entry in entries if entry["path"].startswith(prefix)]
+    
+    def _is_behind_symlink(self, rel_path: Path) -> bool:
+        """Whether a repo-relative directory is, or sits under, a symlinked directory."""
+        current = self.repo_path
+        for part in rel_path.parts:
+            current = current / part
+            if current.is_symlink():
+                return True
+        return False
+    
+    def _scan_linked_directory(self, dir_path: Path) -> List[Dict[str, Any]]:
+        """
+        Walk a candidate the shared walk skipped because it is reached through a
+        symlink, so it resolves like a direct walk of that directory.
+        """
+        prefix_len = len(os.path.join(str(self.repo_path), ""))
+        return [
+            {"path": file_path[prefix_len:], "language": language, "size_bytes": size_bytes}
+            for file_path, language, size_bytes in self._iter_code_files(dir_path)
+        ]
+    
+    def _entries_by_child(self, top: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Group a top-level directory's cached entries by their second path segment."""
+        grouped = self._child_cache.get(top)
+        if grouped is None:
+            grouped = defaultdict(list)
+            offset = len(top) + len(os.sep)
+            for entry in self._walk_once().get(top, []):
+                child, sep, _ = entry["path"][offset:].partition(os.sep)
+                if sep:
+                    grouped[child].append(entry)
+            self._child_cache[top] = grouped = dict(grouped)
+        return grouped
+    
     def _count_languages(self) -> Dict[str, int]:
         """Count files by programming language."""
-        counts = defaultdict(int)
-        
-        for root, dirs, files in os.walk(self.repo_path):
-            # Filter out skip directories
-            dirs[:] = [d for d in dirs if d not in SKIP_DIRECTORIES]
-            
-            for file in files:
-                ext = Path(file).suffix.lower()
-                if ext in EXTENSION_TO_LANGUAGE:
-                    counts[EXTENSION_TO_LANGUAGE[ext]] += 1
+        counts = Counter()
+        for entries in self._walk_once().values():
+            counts.update(entry["language"] for entry in entries)
         
         return dict(counts)
     
@@ -155,67 +319,45 @@ class ComponentDetector:
         """Check if a directory should be skipped."""
         dir_name = dir_path.name
         
-        # Skip hidden directories
-        if dir_name.startswith("."):
-            return True
-        
-        # Skip known non-code directories
-        if dir_name in SKIP_DIRECTORIES:
-            return True
-        
-        # Skip if matches pattern
-        for pattern in SKIP_DIRECTORIES:
-            if "*" in pattern and dir_name.endswith(pattern.replace("*", "")):
-                return True
-        
-        return False
+        # Skip hidden directories, known non-code directories, and wildcard patterns
+        return (
+            dir_name.startswith(".")
+            or dir_name in _SKIP_NAMES
+            or dir_name.endswith(_SKIP_SUFFIXES)
+        )
     
-    def _analyze_directory(self, dir_path: Path, rel_path: Path) -> Optional[Dict[str, Any]]:
+    def _analyze_directory(
+        self,
+        dir_path: Path,
+        rel_path: Path,
+        executor: ThreadPoolExecutor,
+    ) -> Optional[Dict[str, Any]]:
         """Analyze a directory and create component info."""
         files = []
-        language_counts = defaultdict(int)
         total_lines = 0
         
-        for root, dirs, filenames in os.walk(dir_path):
-            # Filter out skip directories
-            dirs[:] = [d for d in dirs if d not in SKIP_DIRECTORIES]
-            
-            for filename in filenames:
-                file_path = Path(root) / filename
-                ext = file_path.suffix.lower()
-                
-                # Skip non-code files early for efficiency
-                if ext in NON_CODE_EXTENSIONS:
-                    continue
-                
-                if ext in EXTENSION_TO_LANGUAGE:
-                    language = EXTENSION_TO_LANGUAGE[ext]
-                    language_counts[language] += 1
-                    
-                    try:
-                        stat = file_path.stat()
-                        size_kb = stat.st_size / 1024
-                        
-                        # Skip files that are too large
-                        if size_kb > settings.max_file_size_kb:
-                            continue
-                        
-                        # Count lines
-                        try:
-                            line_count = sum(1 for _ in open(file_path, 'rb'))
-                        except:
-                            line_count = 0
-                        
-                        total_lines += line_count
-                        
-                        files.append({
-                            "path": str(file_path.relative_to(self.repo_path)),
-                            "language": language,
-                            "size_bytes": stat.st_size,
-                            "line_count": line_count,
-                        })
-                    except Exception as e:
-                        self.logger.warning(f"Error processing file {file_path}: {e}")
+        entries = (
+            self._scan_linked_directory(dir_path)
+            if self._is_behind_symlink(rel_path)
+            else self._files_under(rel_path)
+        )
+        language_counts = Counter(entry["language"] for entry in entries)
+        
+        # Skip files that are too large
+        max_size_bytes = settings.max_file_size_kb * 1024
+        candidates = [entry for entry in entries if entry["size_bytes"] <= max_size_bytes]
+        
+        line_counts = list(executor.map(self._measure_file, candidates))
+        
+        for entry, line_count in zip(candidates, line_counts):
+            total_lines += line_count
+            files.append({
+                "path": entry["path"],
+                "language": entry["language"],
+                "size_bytes": entry["size_bytes"],
+                "line_count": line_count,
+                "llm_eligible": self.should_analyze_with_llm(entry["path"]),
+            })
         
         if not files:
             return None
@@ -238,27 +380,43 @@ class ComponentDetector:
             "language_breakdown": dict(language_counts),
         }
     
+    def _measure_file(self, entry: Dict[str, Any]) -> int:
+        """Get the line count for a cached file entry."""
+        return self._count_lines(self.repo_path / entry["path"], entry["size_bytes"])
+    
+    def _count_lines(self, file_path: Path, size_bytes: int) -> int:
+        """Count lines in a file, memory-mapping large files."""
+        try:
+            with open(file_path, 'rb') as fh:
+                if size_bytes < MMAP_LINE_COUNT_THRESHOLD:
+                    data = fh.read()
+                    return data.count(b'\n') + (1 if data and not data.endswith(b'\n') else 0)
+                try:
+                    with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        newlines = sum(
+                            mm[start:start + MMAP_LINE_COUNT_CHUNK].count(b'\n')
+                            for start in range(0, len(mm), MMAP_LINE_COUNT_CHUNK)
+                        )
+                        return newlines + (1 if mm[-1:] != b'\n' else 0)
+                except ValueError:  # empty file
+                    return 0
+        except OSError:
+            return 0
+    
     def _determine_component_type(self, dir_path: Path, files: List[Dict]) -> str:
         """Determine the type of component based on contents."""
         dir_name = dir_path.name.lower()
         
         # Check directory name first
-        for comp_type, markers in COMPONENT_MARKERS.items():
-            for marker in markers:
-                if marker.endswith("/"):
-                    if dir_name == marker.rstrip("/"):
-                        return comp_type
+        comp_type = _DIR_MARKERS.get(dir_name)
+        if comp_type:
+            return comp_type
         
         # Check for marker files
-        file_names = {Path(f["path"]).name.lower() for f in files}
-        
-        for comp_type, markers in COMPONENT_MARKERS.items():
-            for marker in markers:
-                if not marker.endswith("/"):
-                    # Check exact match or prefix match
-                    for fn in file_names:
-                        if fn == marker or fn.startswith(marker) or marker in fn:
-                            return comp_type
+        file_names = {_basename(f["path"]).lower() for f in files}
+        comp_type = self._match_file_markers(file_names)
+        if comp_type:
+            return comp_type
         
         # Check for test files
         test_count = sum(1 for f in files if self._is_test_file(f["path"]))
@@ -267,6 +425,26 @@ class ComponentDetector:
         
         return "module"
     
+    def _match_file_markers(self, file_names: Set[str]) -> Optional[str]:
+        """Return the highest-priority component type whose marker matches a file name."""
+        best: Optional[str] = None
+        for fn in file_names:
+            comp_type = _EXACT_MARKERS.get(fn)
+            if comp_type is None and fn.startswith(_PREFIXES):
+                comp_type = next(t for marker, t in _PREFIX_MARKERS if fn.startswith(marker))
+            if comp_type is not None and (best is None or _TYPE_RANK[comp_type] < _TYPE_RANK[best]):
+                best = comp_type
+                if _TYPE_RANK[best] == 0:
+                    break
+        if best is not None:
+            return best
+        
+        # Substring fallback (e.g. "_test.py", ".spec.ts") only when no prefix matched
+        for marker, comp_type in _SUBSTR_MARKERS:
+            if any(marker in fn for fn in file_names):
+                return comp_type
+        return None
+    
     def _is_test_file(self, file_path: str) -> bool:
         """Check if a file is a test file."""
         path = Path(file_path)
@@ -281,14 +459,12 @@ class ComponentDetector:
     
     def should_analyze_with_llm(self, file_path: str) -> bool:
         """Check if file should be analyzed by LLM (only executable code files)."""
-        file_ext = Path(file_path).suffix.lower()
-        
         # Only analyze files with code extensions
-        if file_ext not in EXTENSION_TO_LANGUAGE:
+        if _ext(file_path) not in EXTENSION_TO_LANGUAGE:
             return False
         
         # Additional filters for efficiency
-        file_name = Path(file_path).name.lower()
+        file_name = _basename(file_path).lower()
         
         # Skip test files for LLM analysis (they're not business logic)
         if self._is_test_file(file_name):
@@ -297,10 +473,10 @@ class ComponentDetector:
         return True
     
     def get_file_content(self, file_path: str) -> Optional[str]:
-        """Read file content."""
+        """Read file content, skipping files over max_file_size_kb."""
         full_path = self.repo_path / file_path
         try:
-            return full_path.read_text(errors='ignore')
+            return read_file_capped(full_path, settings.max_file_size_kb * 1024)
         except Exception as e:
             self.logger.warning(f"Failed to read file {file_path}: {e}")
             return None
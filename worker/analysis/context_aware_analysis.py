@@ -3,11 +3,68 @@ Bull's Eye - Enhanced Context-Aware Analysis
 Solution for true codebase understanding with cross-file context
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Tuple
 from dataclasses import dataclass
+from collections import defaultdict, OrderedDict
+import asyncio
 import json
+import os
+import re
 from pathlib import Path
+from config import settings
 from llm.ollama_client import parse_llm_json_response
+from .component_detector import EXTENSION_TO_LANGUAGE, read_file_capped
+
+# Import-extraction patterns per language, compiled once
+_JS_IMPORT_PATTERNS = (
+    re.compile(r'import.*from\s+[\'"]([^\'"]+)[\'"]'),
+    re.compile(r'require\([\'"]([^\'"]+)[\'"]\)'),
+)
+
+_IMPORT_PATTERNS = {
+    "python": (
+        re.compile(r'^from\s+(\S+)\s+import', re.MULTILINE),
+        re.compile(r'^import\s+(\S+)', re.MULTILINE),
+    ),
+    "javascript": _JS_IMPORT_PATTERNS,
+    "typescript": _JS_IMPORT_PATTERNS,
+}
+
+# Go imports are only read from `import "x"` lines and `import ( ... )` blocks
+_GO_IMPORT_SINGLE = re.compile(r'^import\s+(?:[\w.]+\s+)?"([^"]+)"', re.MULTILINE)
+_GO_IMPORT_BLOCK = re.compile(r'^import\s*\((.*?)\)', re.MULTILINE | re.DOTALL)
+_GO_QUOTED = re.compile(r'"([^"]+)"')
+
+# Concurrent file reads while building the import graph
+IMPORT_READ_CONCURRENCY = 32
+
+# Compact separators for JSON embedded in prompts
+_JSON_COMPACT = (",", ":")
+
+# File stems that name their parent directory's module
+_PACKAGE_ENTRY_STEMS = {"__init__", "index", "mod"}
+
+
+def _module_key(name: str) -> str:
+    """Normalize a file path or import string to its bare module name."""
+    parts = name.replace("\\", "/").rstrip("/").split("/")
+    segment = parts[-1]
+    stem, ext = os.path.splitext(segment)
+    if ext.lower() in EXTENSION_TO_LANGUAGE:
+        segment = stem
+    # "./x/index" names the same module as "./x"
+    if segment in _PACKAGE_ENTRY_STEMS and len(parts) > 1:
+        segment = parts[-2]
+    return segment.rsplit(".", 1)[-1]
+
+
+def _file_module_key(file_path: str) -> str:
+    """Module name other files would use to import this file."""
+    path = Path(file_path)
+    # Go imports name a package, which is the file's directory
+    if (path.stem in _PACKAGE_ENTRY_STEMS or path.suffix == ".go") and path.parent.name:
+        return path.parent.name
+    return path.stem
 
 @dataclass
 class CodebaseContext:
@@ -38,19 +95,37 @@ class CodebaseContext:
 class ContextAwareAnalyzer:
     """Enhanced analyzer with cross-file context and memory."""
     
-    def __init__(self, ollama_client):
+    def __init__(self, ollama_client, repo_path: Optional[Path] = None):
         self.ollama = ollama_client
+        self.repo_path = Path(repo_path) if repo_path else None
         self.context = CodebaseContext()
         self.analysis_memory = {}  # Store previous analyses
+        self._reverse_imports: Dict[str, Set[str]] = {}  # module key -> importing files
+        self._file_siblings: Dict[str, Tuple[str, ...]] = {}  # file -> its component's files
+        self._intern: Dict[str, str] = {}  # shared string objects for paths/imports
+        
+        # Serialized prompt context, built once per codebase context
+        self._project_structure_json: Optional[str] = None
+        self._prompt_prefix_cache: Dict[Optional[str], str] = {}
+        
+        # File contents shared between the import pass and the analysis pass
+        self._content_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._content_cache_bytes = 0
+        self._content_cache_budget = settings.context_cache_max_mb * 1024 * 1024
     
     async def build_codebase_context(self, components: List[Dict]) -> CodebaseContext:
         """Build comprehensive understanding of the codebase structure."""
         
         # 1. Map project structure
         self.context.project_structure = self._map_project_structure(components)
+        self._project_structure_json = json.dumps(
+            self.context.project_structure, separators=_JSON_COMPACT
+        )
+        self._prompt_prefix_cache = {}
         
         # 2. Extract import relationships
         self.context.import_graph = await self._extract_import_graph(components)
+        self._build_file_indexes()
         
         # 3. Identify component relationships
         self.context.component_relationships = self._map_component_relationships()
@@ -64,11 +139,12 @@ class ContextAwareAnalyzer:
         """Create a comprehensive map of the project structure."""
         structure = {
             "components": {},
-            "languages": set(),
+            "languages": [],
             "entry_points": [],
             "config_files": [],
             "test_components": []
         }
+        seen_languages: Set[str] = set()
         
         for comp in components:
             comp_name = comp["name"]
@@ -77,63 +153,99 @@ class ContextAwareAnalyzer:
                 "language": comp.get("language"),
                 "file_count": comp.get("file_count", 0),
                 "component_type": comp.get("component_type"),
-                "files": [f["path"] for f in comp.get("files", [])]
+                "files": [self._i(f["path"]) for f in comp.get("files", [])]
             }
-            structure["languages"].add(comp.get("language"))
+            lang = comp.get("language")
+            if lang and lang not in seen_languages:
+                seen_languages.add(lang)
+                structure["languages"].append(lang)
             
             # Identify entry points
             if comp.get("component_type") == "service":
                 structure["entry_points"].append(comp_name)
         
-        structure["languages"] = list(structure["languages"])
         return structure
     
     async def _extract_import_graph(self, components: List[Dict]) -> Dict[str, List[str]]:
         """Extract import relationships between files."""
         import_graph = {}
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(IMPORT_READ_CONCURRENCY)
         
-        for comp in components:
-            for file_info in comp.get("files", []):
-                file_path = file_info["path"]
-                content = self._get_file_content(file_path)
-                
-                if content:
-                    imports = self._extract_imports(content, file_info.get("language"))
-                    import_graph[file_path] = imports
+        async def _one(file_info: Dict[str, Any]):
+            file_path = self._i(file_info["path"])
+            content = self._content_cache.get(file_path)
+            if content is None:
+                async with semaphore:
+                    content = await loop.run_in_executor(None, self._read_file, file_path)
+                if content is not None:
+                    self._cache_content(file_path, content)
+            
+            if not content:
+                return file_path, None
+            return file_path, self._extract_imports(content, file_info.get("language"))
+        
+        results = await asyncio.gather(*(
+            _one(file_info)
+            for comp in components
+            for file_info in comp.get("files", [])
+        ))
+        
+        for file_path, imports in results:
+            if imports is not None:
+                import_graph[file_path] = [self._i(imp) for imp in imports]
         
         return import_graph
     
+    def _i(self, value: str) -> str:
+        """Return the shared instance of a path or import string."""
+        return self._intern.setdefault(value, value)
+    
+    def _get_file_content(self, file_path: str) -> Optional[str]:
+        """Read file content, serving repeated reads from the LRU cache."""
+        cached = self._content_cache.get(file_path)
+        if cached is not None:
+            self._content_cache.move_to_end(file_path)
+            return cached
+        
+        content = self._read_file(file_path)
+        if content is not None:
+            self._cache_content(file_path, content)
+        return content
+    
+    def _read_file(self, file_path: str) -> Optional[str]:
+        """Read a file from disk, bypassing the cache."""
+        full_path = self.repo_path / file_path if self.repo_path else Path(file_path)
+        try:
+            return read_file_capped(full_path, settings.max_file_size_kb * 1024)
+        except Exception:
+            return None
+    
+    def _cache_content(self, file_path: str, content: str) -> None:
+        """Store content in the cache, evicting least recently used entries over budget."""
+        size = len(content)
+        if size > self._content_cache_budget:
+            return
+        
+        while self._content_cache and self._content_cache_bytes + size > self._content_cache_budget:
+            _, evicted = self._content_cache.popitem(last=False)
+            self._content_cache_bytes -= len(evicted)
+        
+        self._content_cache[file_path] = content
+        self._content_cache_bytes += size
+    
     def _extract_imports(self, content: str, language: str) -> List[str]:
         """Extract import statements based on language."""
         imports = []
         
-        if language == "python":
-            import re
-            # Python imports
-            patterns = [
-                r'^from\s+(\S+)\s+import',
-                r'^import\s+(\S+)',
-            ]
-            for pattern in patterns:
-                matches = re.findall(pattern, content, re.MULTILINE)
-                imports.extend(matches)
-        
-        elif language in ["javascript", "typescript"]:
-            import re
-            # JS/TS imports
-            patterns = [
-                r'import.*from\s+[\'"]([^\'"]+)[\'"]',
-                r'require\([\'"]([^\'"]+)[\'"]\)',
-            ]
-            for pattern in patterns:
-                matches = re.findall(pattern, content)
-                imports.extend(matches)
-        
-        elif language == "go":
-            import re
-            # Go imports
-            matches = re.findall(r'"([^"]+)"', content)
-            imports.extend(matches)
+        if language == "go":
+            imports.extend(_GO_IMPORT_SINGLE.findall(content))
+            for block in _GO_IMPORT_BLOCK.findall(content):
+                imports.extend(_GO_QUOTED.findall(block))
+            return imports
+        
+        for pattern in _IMPORT_PATTERNS.get(language, ()):
+            imports.extend(pattern.findall(content))
         
         return imports
     
@@ -149,19 +261,16 @@ class ContextAwareAnalyzer:
         # Build context messages
         context_messages = await self._build_context_messages(file_path, component_context)
         
+        comp_name = component_context.get("name") if component_context else None
+        file_imports = json.dumps(self._file_import_context(file_path), separators=_JSON_COMPACT)
+        
         # System message with enhanced instructions
         system_message = {
             "role": "system",
-            "content": f"""You are an expert software architect and security analyst with deep understanding of the entire codebase.
-
-CONTEXT ABOUT THIS CODEBASE:
-{json.dumps(self.context.project_structure, indent=2)}
+            "content": f"""{self._component_prompt_prefix(comp_name)}
 
-IMPORT RELATIONSHIPS:
-{json.dumps(self.context.import_graph, indent=2)}
-
-COMPONENT RELATIONSHIPS:
-{json.dumps(self.context.component_relationships, indent=2)}
+IMPORT RELATIONSHIPS FOR THIS FILE:
+{file_imports}
 
 Analyze the provided file considering:
 1. How it fits into the overall architecture
@@ -229,6 +338,38 @@ Respond with JSON:
         except Exception as e:
             return {"error": str(e)}
     
+    def _component_prompt_prefix(self, comp_name: Optional[str]) -> str:
+        """System prompt prefix shared by every file in a component."""
+        prefix = self._prompt_prefix_cache.get(comp_name)
+        if prefix is not None:
+            return prefix
+        
+        if self._project_structure_json is None:
+            self._project_structure_json = json.dumps(
+                self.context.project_structure, separators=_JSON_COMPACT
+            )
+        
+        relationships = self.context.component_relationships or {}
+        if comp_name is not None:
+            relationships = {comp_name: relationships.get(comp_name, [])}
+        
+        prefix = f"""You are an expert software architect and security analyst with deep understanding of the entire codebase.
+
+CONTEXT ABOUT THIS CODEBASE:
+{self._project_structure_json}
+
+COMPONENT RELATIONSHIPS:
+{json.dumps(relationships, separators=_JSON_COMPACT)}"""
+        self._prompt_prefix_cache[comp_name] = prefix
+        return prefix
+    
+    def _file_import_context(self, file_path: str) -> Dict[str, List[str]]:
+        """Imports of a file and the files importing it, instead of the whole graph."""
+        return {
+            "imports": self.context.import_graph.get(file_path, []),
+            "imported_by": sorted(self._reverse_imports.get(_file_module_key(file_path), ())),
+        }
+    
     async def _build_context_messages(self, file_path: str, component_context: Optional[Dict]) -> List[Dict]:
         """Build context messages from previous analyses."""
         messages = []
@@ -252,29 +393,49 @@ Respond with JSON:
         
         return messages
     
+    def _build_file_indexes(self) -> None:
+        """Index importers by module name and files by component for related-file lookups."""
+        reverse_imports: Dict[str, Set[str]] = defaultdict(set)
+        for importer, imports in self.context.import_graph.items():
+            for imp in imports:
+                key = self._i(_module_key(imp))
+                if key:
+                    reverse_imports[key].add(importer)
+        self._reverse_imports = dict(reverse_imports)
+        
+        self._file_siblings = {}
+        for comp_data in self.context.project_structure["components"].values():
+            siblings = tuple(comp_data["files"])
+            for file_path in siblings:
+                self._file_siblings.setdefault(file_path, siblings)
+    
     def _get_related_files(self, file_path: str) -> List[str]:
         """Find files related to the current file."""
-        related = []
-        
         # Files that import this file
-        for other_file, imports in self.context.import_graph.items():
-            if any(file_path in imp for imp in imports):
-                related.append(other_file)
+        related = set(self._reverse_imports.get(_file_module_key(file_path), ()))
         
         # Files this file imports
-        if file_path in self.context.import_graph:
-            related.extend(self.context.import_graph[file_path])
+        related.update(self.context.import_graph.get(file_path, ()))
         
         # Files in the same component
-        for comp_name, comp_data in self.context.project_structure["components"].items():
-            if file_path in comp_data["files"]:
-                related.extend(comp_data["files"])
-                break
+        related.update(self._file_siblings.get(file_path, ()))
         
-        return list(set(related) - {file_path})  # Remove self, deduplicate
+        related.discard(file_path)  # Remove self
+        return list(related)
     
     def _parse_analysis_response(self, response: str) -> Dict[str, Any]:
         """Parse LLM response into structured format."""
+        # Fast path: a bare JSON object needs no payload extraction
+        text = response.strip()
+        if text.startswith("{") and text.endswith("}"):
+            try:
+                parsed = json.loads(text)
+            except ValueError:
+                pass
+            else:
+                if isinstance(parsed, dict):
+                    return parsed
+        
         parsed, _ = parse_llm_json_response(response)
         if parsed is not None:
             return parsed
@@ -310,7 +471,7 @@ Focus on systemic issues, not individual file problems."""
             "content": f"""Generate a comprehensive architectural summary for this codebase.
 
 PROJECT STRUCTURE:
-{json.dumps(self.context.project_structure, indent=2)}
+{self._project_structure_json or json.dumps(self.context.project_structure, separators=_JSON_COMPACT)}
 
 FILE ANALYSES:
 {json.dumps(all_analyses, indent=2)}
@@ -337,9 +498,9 @@ Respond with JSON:
             return {"error": str(e)}
 
 # Integration with existing engine
-async def enhanced_analysis_engine(components, ollama_client):
+async def enhanced_analysis_engine(components, ollama_client, repo_path: Optional[Path] = None):
     """Enhanced analysis engine with context awareness."""
-    analyzer = ContextAwareAnalyzer(ollama_client)
+    analyzer = ContextAwareAnalyzer(ollama_client, repo_path)
     
     # Step 1: Build codebase context
     await analyzer.build_codebase_context(components)
@@ -4,24 +4,131 @@ Core orchestration for codebase analysis with detailed status tracking
 """
 
 import asyncio
+import functools
+import hashlib
+import os
 import shutil
-import json
+import stat
+import sys
+import time
+import uuid
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Deque, Optional
 from datetime import datetime
-from collections import defaultdict
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import httpx
 import structlog
 from git import Repo, GitCommandError
+import orjson
 
 from config import settings
 from database import db
-from llm.ollama_client import OllamaCloudClient, get_ollama_client
+from llm.ollama_client import (
+    MAX_CODE_LENGTH,
+    OllamaCloudClient,
+    ScreenModelUnavailable,
+    get_ollama_client,
+)
 from .component_detector import ComponentDetector
 from .context_aware_analysis import ContextAwareAnalyzer
 from scanners import get_scanner_for_language, get_universal_scanners
 
 logger = structlog.get_logger()
 
+# Threads reading file contents ahead of the LLM workers
+FILE_READ_WORKERS = 8
+
+# Seconds an idle LLM connection is kept open; covers gaps between stages and rate-limit waits
+LLM_KEEPALIVE_EXPIRY = 75.0
+
+# Files with less code than this are not worth an LLM request
+MIN_LLM_CODE_CHARS = 50
+
+# Average line length above which the code the model would see is treated as minified
+MINIFIED_LINE_LENGTH = 400
+
+# Process-wide pool deleting finished clones; outlives each task's event loop
+_repo_cleanup_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="repo-cleanup")
+_pending_repo_cleanups: set = set()
+
+# Path patterns for files unlikely to hold security-relevant logic (analyzed last)
+LOW_SIGNAL_DIRS = frozenset({
+    "docs", "doc", "examples", "example", "samples", "fixtures", "mocks", "__mocks__",
+    "migrations", "benchmarks", "scripts", "build", "dist", "generated", "vendor", "third_party",
+})
+LOW_SIGNAL_SUFFIXES = (
+    ".d.ts", ".min.js", ".bundle.js", ".generated.ts", ".generated.go", "_pb2.py", "_pb2_grpc.py",
+    ".pb.go", "_gen.go", ".config.js", ".config.ts", ".config.mjs", ".stories.tsx", ".stories.ts",
+    "setup.py", "conftest.py", "manage.py",
+)
+
+def _is_low_signal_path(file_path: str) -> bool:
+    """Check a path against the low-signal directory and suffix lists."""
+    lowered = file_path.replace("\\", "/").lower()
+    if lowered.endswith(LOW_SIGNAL_SUFFIXES):
+        return True
+    return not LOW_SIGNAL_DIRS.isdisjoint(lowered.split("/")[:-1])
+
+
+def _name_preview(names, limit: int = 5) -> str:
+    """Join the first few distinct names, noting how many more there are."""
+    unique = list(dict.fromkeys(names))
+    preview = ", ".join(unique[:limit])
+    if len(unique) > limit:
+        preview += f" (+{len(unique) - limit} more)"
+    return preview
+
+
+def _looks_minified(content: str) -> bool:
+    """Check whether the code sent to the model (its first MAX_CODE_LENGTH chars) is minified."""
+    head = content[:MAX_CODE_LENGTH]
+    return len(head) / (head.count("\n") + 1) > MINIFIED_LINE_LENGTH
+
+
+def _content_hash(content: str, language: str) -> str:
+    """Key for the LLM analysis cache: the same code in the same language."""
+    return hashlib.blake2b(f"{language}\0{content}".encode(), digest_size=16).hexdigest()
+
+
+def _retry_writable(func, path, _exc):
+    """Make a read-only entry (e.g. git pack files) and its directory writable, then retry."""
+    try:
+        os.chmod(os.path.dirname(path), stat.S_IRWXU)
+        os.chmod(path, stat.S_IRWXU)
+        func(path)
+    except OSError:
+        pass
+
+
+def _safe_rmtree(path: Path):
+    """Remove a tree, retrying read-only entries instead of leaving them behind."""
+    if sys.version_info >= (3, 12):
+        shutil.rmtree(path, onexc=_retry_writable)
+    else:
+        shutil.rmtree(path, onerror=_retry_writable)
+
+
+def _schedule_repo_cleanup(repo_path: Path):
+    """Move a clone aside and delete it in the background."""
+    staging = repo_path.with_name(f"{repo_path.name}.deleting-{uuid.uuid4().hex[:8]}")
+    os.replace(repo_path, staging)
+    future = _repo_cleanup_pool.submit(_safe_rmtree, staging)
+    _pending_repo_cleanups.add(future)
+    future.add_done_callback(_pending_repo_cleanups.discard)
+    return future
+
+
+@dataclass(frozen=True, slots=True)
+class FileJob:
+    """A code file queued for LLM analysis."""
+    component_id: Optional[str]
+    path: str
+    language: str
+    size_bytes: int
+
+
 class AnalysisCancelled(Exception):
     """Raised when a job is cancelled by the user."""
 
@@ -36,6 +143,9 @@ class StatusTracker:
         self.progress = 0
         self.total_steps = 0
         self.completed_steps = 0
+        self.cancelled = False
+        self._buffer: List[tuple] = []  # (stage, message, progress, detail, time) awaiting flush
+        self._pending: Optional[Dict[str, Any]] = None  # latest same-stage update awaiting flush
     
     def update(
         self,
@@ -45,36 +155,75 @@ class StatusTracker:
         progress_total: int = 100,
         detail: Optional[str] = None
     ):
-        """Update job status in database."""
+        """
+        Update job status in database.
+        Stage changes are written immediately; progress within a stage is
+        coalesced and only the latest state is written at the next flush.
+        """
+        state = {
+            "status": stage,
+            "message": message,
+            "progress": progress,
+            "progress_total": progress_total,
+            "progress_detail": detail,
+        }
+        stage_changed = stage != self.current_stage
         self.current_stage = stage
         self.progress = progress
-        
-        db.update_job_status(
-            job_id=self.job_id,
-            status=stage,
-            message=message,
-            progress=progress,
-            progress_total=progress_total,
-            progress_detail=detail
-        )
+        if stage_changed:
+            self._pending = None
+            self.flush()
+            self._write(state)
+        else:
+            self._pending = state
+    
+    def _write(self, state: Dict[str, Any]):
+        """Write one status state to the job, unless the job was cancelled."""
+        updated = db.update_job_status(job_id=self.job_id, unless_cancelled=True, **state)
+        if not updated:
+            # The API marked the job cancelled; leave its status in place
+            self.cancelled = True
+            return
         
         logger.info(
             "Status update",
             job_id=self.job_id[:8],
-            stage=stage,
-            message=message,
-            progress=f"{progress}/{progress_total}"
+            stage=state["status"],
+            message=state["message"],
+            progress=f"{state['progress']}/{state['progress_total']}"
         )
     
     def log_step(self, message: str, detail: Optional[str] = None):
-        """Log a step without changing main progress."""
-        db.add_status_update(
-            job_id=self.job_id,
-            stage=self.current_stage,
-            message=message,
-            progress=self.progress,
-            details=detail
-        )
+        """Log a step without changing main progress (buffered until the next flush)."""
+        self._buffer.append((self.current_stage, message, self.progress, detail, time.time()))
+    
+    def flush(self):
+        """Write buffered steps and the latest coalesced status to the database."""
+        if self._buffer:
+            steps, self._buffer = self._buffer, []
+            # Rows and timestamps are only formatted here, once per flush
+            db.bulk_add_status_updates(self.job_id, [
+                {
+                    "stage": stage,
+                    "message": message,
+                    "progress": progress,
+                    "details": detail,
+                    "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(logged_at)),
+                }
+                for stage, message, progress, detail, logged_at in steps
+            ])
+        if self._pending:
+            state, self._pending = self._pending, None
+            self._write(state)
+    
+    async def flush_periodically(self, interval: float):
+        """Flush buffered steps and status every interval seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning("Status flush failed", job_id=self.job_id[:8], error=str(e))
 
 
 class AnalysisEngine:
@@ -88,16 +237,29 @@ class AnalysisEngine:
         self.ollama: Optional[OllamaCloudClient] = None
         self.ollama_clients: List[OllamaCloudClient] = []
         self.repo_path: Optional[Path] = None
+        self._job: Optional[Dict[str, Any]] = None  # job row, read once per run
+        self._cancel_event = asyncio.Event()
+        self._cancel_watcher: Optional[asyncio.Task] = None
+        self._status_flusher: Optional[asyncio.Task] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._io_pool = ThreadPoolExecutor(max_workers=FILE_READ_WORKERS)
     
     async def run(self) -> bool:
         """Run the full analysis pipeline."""
         try:
             # Get job info
-            job = db.get_job(self.job_id)
+            job = self._job = db.get_job(self.job_id)
             if not job:
                 self.logger.error("Job not found")
                 return False
 
+            if job.get("status") == "cancelled":
+                self._cancel_event.set()
+            self._cancel_watcher = asyncio.create_task(self._watch_cancellation())
+            self._status_flusher = asyncio.create_task(
+                self.status.flush_periodically(settings.status_flush_interval)
+            )
+
             # Initialize LLM client
             self._init_llm_clients(job)
             self._ensure_not_cancelled()
@@ -130,71 +292,56 @@ class AnalysisEngine:
                 detail=f"Cloned to {self.repo_path}"
             )
             
-            # ========== STAGE 2: DETECT COMPONENTS ==========
-            self.status.update(
-                "detecting_components",
-                "Analyzing repository structure...",
-                progress=8,
-                detail="Scanning directories and files"
-            )
-            
-            detector = ComponentDetector(self.repo_path)
-            components = detector.detect_components()
-
-            self._ensure_not_cancelled()
-            
-            self.status.update(
-                "detecting_components",
-                f"Detected {len(components)} components",
-                progress=10,
-                detail=", ".join([c["name"] for c in components[:5]])
-            )
-            
-            # Save components to database
-            component_ids = []
-            total_files = 0
-            for comp in components:
-                comp_id = db.create_component(
-                    job_id=self.job_id,
-                    name=comp["name"],
-                    path=comp["path"],
-                    component_type=comp["component_type"],
-                    language=comp["language"]
+            # Universal scanners only need the checkout, so they overlap component detection
+            universal_task = asyncio.create_task(self._run_universal_scanners())
+            try:
+                # ========== STAGE 2: DETECT COMPONENTS ==========
+                self.status.update(
+                    "detecting_components",
+                    "Analyzing repository structure...",
+                    progress=max(self.status.progress, 8),
+                    detail="Scanning directories and files"
                 )
-                component_ids.append(comp_id)
-                comp["db_id"] = comp_id
                 
-                # Save files
-                for file_info in comp.get("files", []):
-                    db.create_file(
-                        component_id=comp_id,
-                        job_id=self.job_id,
-                        path=file_info["path"],
-                        language=file_info.get("language"),
-                        line_count=file_info.get("line_count", 0),
-                        size_bytes=file_info.get("size_bytes", 0)
+                detector = ComponentDetector(self.repo_path)
+                loop = asyncio.get_running_loop()
+                components = await loop.run_in_executor(self._io_pool, detector.detect_components)
+
+                self._ensure_not_cancelled()
+                
+                detected = f"Detected {len(components)} components"
+                detected_names = _name_preview(c["name"] for c in components)
+                if self.status.current_stage == "detecting_components":
+                    self.status.update(
+                        "detecting_components",
+                        detected,
+                        progress=max(self.status.progress, 10),
+                        detail=detected_names
                     )
-                    total_files += 1
+                else:
+                    # Universal scanners already moved the job on; don't step the stage back
+                    self.status.log_step(detected, detail=detected_names)
                 
-                db.update_component(
-                    comp_id,
-                    file_count=len(comp.get("files", [])),
-                    line_count=comp.get("line_count", 0)
+                # Save components and their files to database in one transaction
+                component_ids = await loop.run_in_executor(
+                    self._io_pool,
+                    functools.partial(db.bulk_create_components, self.job_id, components, include_files=True)
                 )
+                for comp, comp_id in zip(components, component_ids):
+                    comp["db_id"] = comp_id
+                total_files = sum(len(comp.get("files", [])) for comp in components)
+                
+                self.status.log_step(
+                    f"Saved {len(components)} components with {total_files} files"
+                )
+                
+                # ========== STAGE 3: RUN SCANNERS ==========
+                all_findings = await universal_task
+            finally:
+                if not universal_task.done():
+                    universal_task.cancel()
             
-            self.status.log_step(
-                f"Saved {len(components)} components with {total_files} files"
-            )
-            
-            # ========== STAGE 3: RUN SCANNERS ==========
-            self.status.update(
-                "scanning",
-                "Running security scanners...",
-                progress=15,
-                detail="Initializing scanners"
-            )
-            
-            all_findings = await self._run_all_scanners(components, detector)
+            all_findings.extend(await self._run_component_scanners(components))
 
             self._ensure_not_cancelled()
             
@@ -275,10 +422,22 @@ class AnalysisEngine:
             return False
         
         finally:
+            if self._cancel_watcher:
+                self._cancel_watcher.cancel()
+            if self._status_flusher:
+                self._status_flusher.cancel()
+            try:
+                self.status.flush()
+            except Exception as e:
+                self.logger.warning(f"Failed to flush status updates: {e}")
+            if self._http_client:
+                await self._http_client.aclose()
+            self._io_pool.shutdown(wait=False)
+
             # Cleanup
             if self.repo_path and self.repo_path.exists():
                 try:
-                    shutil.rmtree(self.repo_path)
+                    _schedule_repo_cleanup(self.repo_path)
                 except Exception as e:
                     self.logger.warning(f"Failed to cleanup repo: {e}")
 
@@ -317,21 +476,50 @@ class AnalysisEngine:
     def _init_llm_clients(self, job: Dict[str, Any]) -> None:
         """Initialize LLM clients for parallel analysis."""
         api_keys = self._normalize_api_keys(job)
+
+        # One keep-alive pool for every key; requests differ only by Authorization header
+        pool_size = max(2, len(api_keys) * 2 * max(1, settings.llm_concurrency_per_key))
+        self._http_client = httpx.AsyncClient(
+            timeout=settings.ollama_timeout,
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+            ),
+        )
+
         if api_keys:
             self.ollama_clients = [
-                get_ollama_client(model=self.model, api_key=key)
+                get_ollama_client(model=self.model, api_key=key, http_client=self._http_client)
                 for key in api_keys
             ]
         else:
-            self.ollama_clients = [get_ollama_client(model=self.model)]
+            self.ollama_clients = [get_ollama_client(model=self.model, http_client=self._http_client)]
 
         self.ollama = self.ollama_clients[0]
         self.logger.info("Initialized LLM clients", workers=len(self.ollama_clients))
 
     def _is_cancelled(self) -> bool:
         """Check whether the job has been cancelled."""
-        job = db.get_job(self.job_id)
-        return bool(job and job.get("status") == "cancelled")
+        if self.status.cancelled:
+            self._cancel_event.set()
+        return self._cancel_event.is_set()
+
+    async def _watch_cancellation(self) -> None:
+        """Poll the job status in the background and flag cancellation."""
+        while not self._cancel_event.is_set():
+            await asyncio.sleep(settings.cancel_poll_interval)
+            try:
+                self._refresh_job_status()
+            except Exception as e:
+                self.logger.warning("Cancellation check failed", error=str(e))
+
+    def _refresh_job_status(self) -> Optional[str]:
+        """Re-read only the job status, flagging cancellation."""
+        status = db.get_job_status(self.job_id)
+        if status == "cancelled":
+            self._cancel_event.set()
+        return status
 
     def _ensure_not_cancelled(self) -> None:
         """Raise if the job has been cancelled."""
@@ -339,20 +527,28 @@ class AnalysisEngine:
             raise AnalysisCancelled()
 
     async def _filter_security_irrelevant_files(self, file_paths: List[str]) -> List[str]:
-        """Use LLM to skip files unlikely to contain security-relevant logic."""
-        if not file_paths or not self.ollama:
+        """Select files unlikely to contain security-relevant logic, by path patterns."""
+        if not file_paths:
             return []
 
+        skipped: List[str] = []
+        undecided: List[str] = []
+        for path in file_paths:
+            (skipped if _is_low_signal_path(path) else undecided).append(path)
+        if not settings.enable_llm_triage or not self.ollama:
+            return skipped
+
+        # Optionally let the LLM triage the paths the patterns did not decide
         chunk_size = 200
-        skipped = set()
+        llm_skipped = set()
 
         self.status.log_step(
             "LLM file triage: selecting low-signal files by name",
-            detail=f"{len(file_paths)} candidates"
+            detail=f"{len(undecided)} candidates"
         )
 
-        for start in range(0, len(file_paths), chunk_size):
-            chunk = file_paths[start:start + chunk_size]
+        for start in range(0, len(undecided), chunk_size):
+            chunk = undecided[start:start + chunk_size]
             try:
                 skip_list = await self.ollama.filter_security_irrelevant_files(chunk)
             except Exception as e:
@@ -362,9 +558,9 @@ class AnalysisEngine:
             allowed = set(chunk)
             for path in skip_list:
                 if path in allowed:
-                    skipped.add(path)
+                    llm_skipped.add(path)
 
-        return list(skipped)
+        return skipped + list(llm_skipped)
     
     async def _clone_repository(self, repo_url: str, branch: str) -> Optional[Path]:
         """Clone the repository."""
@@ -374,18 +570,20 @@ class AnalysisEngine:
         try:
             self.status.log_step(f"Cloning {repo_url} (branch: {branch})")
             
-            # Clone with depth limit for speed
-            repo = Repo.clone_from(
-                repo_url,
-                str(repo_dir),
-                branch=branch,
-                depth=1,
-                single_branch=True
+            sparse_paths = [p.strip() for p in settings.clone_sparse_paths.split(",") if p.strip()]
+            
+            # git runs in a thread so cancellation polling and status flushes keep going
+            loop = asyncio.get_running_loop()
+            commit_hash = await loop.run_in_executor(
+                self._io_pool, self._clone_sync, repo_url, branch, repo_dir, sparse_paths
             )
+            if sparse_paths:
+                self.status.log_step(f"Sparse checkout of {', '.join(sparse_paths)}")
             
             # Store commit hash
-            commit_hash = repo.head.commit.hexsha
             db.set_job_commit(self.job_id, commit_hash)
+            if self._job is not None:
+                self._job["commit_hash"] = commit_hash
             
             self.status.log_step(f"Cloned at commit {commit_hash[:8]}")
             
@@ -398,123 +596,172 @@ class AnalysisEngine:
             self.logger.error("Clone failed", error=str(e))
             return None
     
-    async def _run_all_scanners(
-        self,
-        components: List[Dict],
-        detector: ComponentDetector
-    ) -> List[Dict]:
-        """Run all applicable scanners on the repository."""
+    @staticmethod
+    def _clone_sync(repo_url: str, branch: str, repo_dir: Path, sparse_paths: List[str]) -> str:
+        """Clone the repository and return the checked-out commit hash."""
+        # Clone with depth limit for speed
+        clone_options = {"branch": branch, "depth": 1, "single_branch": True}
+        if sparse_paths:
+            # Partial clone: fetch trees only, then materialize blobs under the sparse paths
+            clone_options.update(filter="blob:none", no_checkout=True)
+        
+        repo = Repo.clone_from(repo_url, str(repo_dir), **clone_options)
+        
+        if sparse_paths:
+            repo.git.sparse_checkout("set", *sparse_paths)
+            repo.git.checkout(branch)
+        
+        return repo.head.commit.hexsha
+    
+    async def _run_universal_scanners(self) -> List[Dict]:
+        """Run the whole-repository scanners; they do not need detected components."""
         all_findings = []
         self._ensure_not_cancelled()
         
         # Get universal scanners (gitleaks, opengrep, osv-scanner, lizard, trivy)
         universal_scanners = get_universal_scanners(self.repo_path)
         
-        # Run universal scanners on whole repo
+        # Run universal scanners on whole repo, concurrently; findings are saved as each finishes
         scanner_count = len(universal_scanners)
-        for i, scanner in enumerate(universal_scanners):
-            self._ensure_not_cancelled()
+        semaphore = asyncio.Semaphore(max(1, settings.max_concurrent_scanners))
+        
+        async def run_universal(scanner):
             scanner_name = scanner.get_tool_name()
-            progress = 15 + int((i / scanner_count) * 15)
-            
+            async with semaphore:
+                self.status.log_step(f"Running {scanner_name}...")
+                result_id = db.create_scanner_result(self.job_id, scanner_name)
+                try:
+                    findings = await scanner.scan(str(self.repo_path), self.job_id)
+                except Exception as e:
+                    return scanner_name, result_id, None, e
+            return scanner_name, result_id, findings, None
+        
+        if scanner_count:
             self.status.update(
                 "scanning",
-                f"Running {scanner_name}...",
-                progress=progress,
-                detail=f"Scanner {i+1}/{scanner_count}"
+                f"Running {scanner_count} scanners...",
+                progress=15,
+                detail=", ".join(s.get_tool_name() for s in universal_scanners)
             )
-            
-            result_id = db.create_scanner_result(self.job_id, scanner_name)
-            
-            try:
-                findings = await scanner.scan(str(self.repo_path), self.job_id)
-                
-                for finding in findings:
-                    db.create_finding(
-                        job_id=self.job_id,
-                        scanner=scanner_name,
-                        severity=finding.get("severity", "info"),
-                        title=finding.get("title", "Untitled"),
-                        description=finding.get("description"),
-                        rule_id=finding.get("rule_id"),
-                        category=finding.get("category"),
-                        file_path=finding.get("file_path"),
-                        line_start=finding.get("line_start"),
-                        line_end=finding.get("line_end"),
-                        code_snippet=finding.get("code_snippet"),
-                        suggestion=finding.get("suggestion"),
-                    )
-                    all_findings.append(finding)
-                
-                db.update_scanner_result(result_id, "completed", len(findings))
-                self.status.log_step( f"{scanner_name}: {len(findings)} findings")
-                
-            except Exception as e:
-                self.logger.warning(f"Scanner {scanner_name} failed: {e}")
-                db.update_scanner_result(result_id, "failed", error_message=str(e))
         
-        # Run language-specific scanners per component
-        for comp_idx, comp in enumerate(components):
-            self._ensure_not_cancelled()
-            language = comp.get("language", "unknown")
-            scanners = get_scanner_for_language(language, self.repo_path)
-            
-            if not scanners:
-                continue
-            
-            comp_path = self.repo_path / comp["path"]
-            
-            for scanner in scanners:
-                self._ensure_not_cancelled()
-                scanner_name = scanner.get_tool_name()
-                progress = 30 + int((comp_idx / len(components)) * 15)
+        scan_tasks = [asyncio.create_task(run_universal(s)) for s in universal_scanners]
+        try:
+            for i, next_done in enumerate(asyncio.as_completed(scan_tasks)):
+                scanner_name, result_id, findings, error = await next_done
+                
+                if error is not None:
+                    self.logger.warning(f"Scanner {scanner_name} failed: {error}")
+                    db.update_scanner_result(result_id, "failed", error_message=str(error))
+                else:
+                    db.bulk_create_findings(self.job_id, [
+                        self._scanner_finding_record(scanner_name, finding)
+                        for finding in findings
+                    ])
+                    all_findings.extend(findings)
+                    
+                    db.update_scanner_result(result_id, "completed", len(findings))
+                    self.status.log_step( f"{scanner_name}: {len(findings)} findings")
                 
                 self.status.update(
                     "scanning",
-                    f"Running {scanner_name} on {comp['name']}",
-                    progress=progress,
-                    detail=f"Component {comp_idx+1}/{len(components)}"
+                    f"{scanner_name} finished",
+                    progress=15 + int(((i + 1) / scanner_count) * 15),
+                    detail=f"Scanner {i+1}/{scanner_count}"
                 )
-                
-                result_id = db.create_scanner_result(
-                    self.job_id,
-                    scanner_name,
-                    component_id=comp.get("db_id")
-                )
-                
+                self._ensure_not_cancelled()
+        finally:
+            for task in scan_tasks:
+                task.cancel()
+        
+        return all_findings
+    
+    async def _run_component_scanners(self, components: List[Dict]) -> List[Dict]:
+        """Run language-specific scanners on each component."""
+        all_findings = []
+        self._ensure_not_cancelled()
+        semaphore = asyncio.Semaphore(max(1, settings.max_concurrent_scanners))
+        
+        # Run language-specific scanners per component, sharing the same concurrency cap
+        # Scanners hold no per-scan state, so one set per language serves every component
+        scanners_by_language = {
+            language: get_scanner_for_language(language, self.repo_path)
+            for language in {comp.get("language", "unknown") for comp in components}
+        }
+        component_scans = [
+            (comp, scanner)
+            for comp in components
+            for scanner in scanners_by_language[comp.get("language", "unknown")]
+        ]
+        
+        async def run_component(comp: Dict[str, Any], scanner):
+            scanner_name = scanner.get_tool_name()
+            comp_id = comp.get("db_id")
+            async with semaphore:
+                self._ensure_not_cancelled()
+                self.status.log_step(f"Running {scanner_name} on {comp['name']}")
+                result_id = db.create_scanner_result(self.job_id, scanner_name, component_id=comp_id)
                 try:
                     findings = await scanner.scan(
-                        str(comp_path),
+                        str(self.repo_path / comp["path"]),
                         self.job_id,
-                        component_id=comp.get("db_id")
+                        component_id=comp_id
                     )
-                    
-                    for finding in findings:
-                        db.create_finding(
-                            job_id=self.job_id,
-                            component_id=comp.get("db_id"),
-                            scanner=scanner_name,
-                            severity=finding.get("severity", "info"),
-                            title=finding.get("title", "Untitled"),
-                            description=finding.get("description"),
-                            rule_id=finding.get("rule_id"),
-                            category=finding.get("category"),
-                            file_path=finding.get("file_path"),
-                            line_start=finding.get("line_start"),
-                            line_end=finding.get("line_end"),
-                            code_snippet=finding.get("code_snippet"),
-                            suggestion=finding.get("suggestion"),
-                        )
-                        all_findings.append(finding)
+                except Exception as e:
+                    return comp, scanner_name, result_id, None, e
+            return comp, scanner_name, result_id, findings, None
+        
+        scan_tasks = [asyncio.create_task(run_component(comp, s)) for comp, s in component_scans]
+        try:
+            for i, next_done in enumerate(asyncio.as_completed(scan_tasks)):
+                comp, scanner_name, result_id, findings, error = await next_done
+                
+                if error is not None:
+                    self.logger.warning(f"Scanner {scanner_name} failed on {comp['name']}: {error}")
+                    db.update_scanner_result(result_id, "failed", error_message=str(error))
+                else:
+                    db.bulk_create_findings(self.job_id, [
+                        self._scanner_finding_record(scanner_name, finding, comp.get("db_id"))
+                        for finding in findings
+                    ])
+                    all_findings.extend(findings)
                     
                     db.update_scanner_result(result_id, "completed", len(findings))
-                    
-                except Exception as e:
-                    self.logger.warning(f"Scanner {scanner_name} failed on {comp['name']}: {e}")
-                    db.update_scanner_result(result_id, "failed", error_message=str(e))
+                
+                self.status.update(
+                    "scanning",
+                    f"{scanner_name} finished on {comp['name']}",
+                    progress=30 + int(((i + 1) / len(scan_tasks)) * 15),
+                    detail=f"Component scan {i+1}/{len(scan_tasks)}"
+                )
+                self._ensure_not_cancelled()
+        finally:
+            for task in scan_tasks:
+                task.cancel()
         
         return all_findings
     
+    def _scanner_finding_record(
+        self,
+        scanner_name: str,
+        finding: Dict[str, Any],
+        component_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Map a scanner finding to bulk_create_findings fields."""
+        return {
+            "component_id": component_id,
+            "scanner": scanner_name,
+            "severity": finding.get("severity", "info"),
+            "title": finding.get("title", "Untitled"),
+            "description": finding.get("description"),
+            "rule_id": finding.get("rule_id"),
+            "category": finding.get("category"),
+            "file_path": finding.get("file_path"),
+            "line_start": finding.get("line_start"),
+            "line_end": finding.get("line_end"),
+            "code_snippet": finding.get("code_snippet"),
+            "suggestion": finding.get("suggestion"),
+        }
+    
     async def _run_llm_analysis(
         self,
         components: List[Dict],
@@ -523,17 +770,20 @@ class AnalysisEngine:
     ):
         """Run LLM analysis on code files with parallel workers per API key."""
         self._ensure_not_cancelled()
-        file_jobs = []
         total_files = sum(len(c.get("files", [])) for c in components)
-
-        for comp in components:
-            files = comp.get("files", [])
-            code_files = [f for f in files if detector.should_analyze_with_llm(f["path"])]
-            for file_info in code_files:
-                file_jobs.append({
-                    "component": comp,
-                    "file_info": file_info,
-                })
+        # Eligibility is classified once by the component detector
+        file_jobs = [
+            FileJob(
+                component_id=comp.get("db_id"),
+                path=file_info["path"],
+                language=file_info.get("language", "unknown"),
+                size_bytes=file_info.get("size_bytes", 0),
+            )
+            for comp in components
+            for file_info in comp.get("files", [])
+            if file_info.get("llm_eligible")
+            and file_info.get("size_bytes", 0) >= MIN_LLM_CODE_CHARS
+        ]
 
         total_code_files = len(file_jobs)
         skipped_files = total_files - total_code_files
@@ -545,15 +795,15 @@ class AnalysisEngine:
         if total_code_files == 0:
             return
 
-        candidate_paths = [job["file_info"]["path"] for job in file_jobs]
+        candidate_paths = [job.path for job in file_jobs]
         llm_skipped = await self._filter_security_irrelevant_files(candidate_paths)
         skip_set = set(llm_skipped)
+        # Low-signal files go last; within each group the largest files start first
+        # (longest-processing-time order) so they overlap the tail of small ones
+        file_jobs.sort(key=lambda job: (job.path in skip_set, -job.size_bytes))
         if skip_set:
-            keep_jobs = [job for job in file_jobs if job["file_info"]["path"] not in skip_set]
-            skip_jobs = [job for job in file_jobs if job["file_info"]["path"] in skip_set]
-            file_jobs = keep_jobs + skip_jobs
             self.status.log_step(
-                f"LLM file triage flagged {len(skip_set)} low-signal files based on names"
+                f"File triage flagged {len(skip_set)} low-signal files based on names"
             )
 
         total_llm_files = len(file_jobs)
@@ -561,7 +811,8 @@ class AnalysisEngine:
             self.status.log_step("LLM Analysis: No files left after triage")
             return
 
-        worker_count = max(1, min(len(self.ollama_clients), total_llm_files))
+        slots_per_key = max(1, settings.llm_concurrency_per_key)
+        worker_count = max(1, min(len(self.ollama_clients) * slots_per_key, total_llm_files))
         detail_parts = [f"Skipping {skipped_files} non-code files"]
         if llm_skipped:
             detail_parts.append(f"{len(llm_skipped)} name-filtered")
@@ -573,137 +824,246 @@ class AnalysisEngine:
             detail=", ".join(detail_parts)
         )
 
-        queue: asyncio.Queue = asyncio.Queue()
-        for job in file_jobs:
-            queue.put_nowait(job)
-        for _ in range(worker_count):
-            queue.put_nowait(None)
+        # Files are read ahead on the I/O pool so workers only wait on the LLM
+        queue: asyncio.Queue = asyncio.Queue(maxsize=worker_count * 2)
+        loop = asyncio.get_running_loop()
 
-        file_summaries_by_component: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        cache_model = self.model or settings.ollama_model
+        screen_model = settings.ollama_screen_model.strip()
+        screening = bool(screen_model)
+        screened_out = 0
+        use_cache = settings.enable_caching
+        content_hashes: Dict[str, str] = {}
+        cached_files = 0
+
+        def read_file(job: FileJob):
+            """Read a file and, with caching on, look up a prior analysis of the same content."""
+            content = detector.get_file_content(job.path)
+            if content and _looks_minified(content):
+                # A truncated slice of minified or bundled code costs a full request for nothing
+                self.logger.debug("Skipping minified file for LLM analysis", file=job.path)
+                return None, None, None
+            if not use_cache or not content or len(content.strip()) < MIN_LLM_CODE_CHARS:
+                return content, None, None
+            content_hash = _content_hash(content, job.language)
+            try:
+                cached = db.get_cached_analysis(content_hash, cache_model)
+            except Exception as e:
+                # A failed lookup only costs a fresh analysis
+                self.logger.warning(f"Analysis cache lookup failed for {job.path}: {e}")
+                cached = None
+            return content, content_hash, cached
+
+        async def hand_over(job: FileJob, read: asyncio.Future):
+            nonlocal processed_files, cached_files
+            content, content_hash, cached = await read
+            # Unreadable or mostly-whitespace files never reach a worker
+            if not content or len(content.strip()) < MIN_LLM_CODE_CHARS:
+                processed_files += 1
+                file_done(job)
+                return
+            if cached is not None:
+                try:
+                    record_analysis(job, cached)
+                except Exception as e:
+                    self.logger.warning(f"Cached analysis unusable for {job.path}, re-analyzing: {e}")
+                else:
+                    processed_files += 1
+                    cached_files += 1
+                    file_done(job)
+                    return
+            if content_hash:
+                content_hashes[job.path] = content_hash
+            await queue.put((job, content))
+
+        async def producer():
+            # Keep up to FILE_READ_WORKERS reads in flight, handing results over in order
+            reads: Deque = deque()
+            try:
+                for job in file_jobs:
+                    if self._is_cancelled():
+                        break
+                    reads.append((job, loop.run_in_executor(self._io_pool, read_file, job)))
+                    if len(reads) >= FILE_READ_WORKERS:
+                        await hand_over(*reads.popleft())
+                while reads and not self._is_cancelled():
+                    await hand_over(*reads.popleft())
+            finally:
+                for _, read in reads:
+                    read.cancel()
+                # Always release the workers; a producer error is re-raised below.
+                # Once cancelled, workers stop draining, so only fill free slots:
+                # a worker blocked on get() means the queue has room
+                for _ in range(worker_count):
+                    if self._is_cancelled():
+                        try:
+                            queue.put_nowait(None)
+                        except asyncio.QueueFull:
+                            break
+                    else:
+                        await queue.put(None)
+
+        file_summaries_by_component: Dict[str, List[Dict[str, Any]]] = {
+            comp["db_id"]: [] for comp in components if comp.get("db_id")
+        }
         processed_files = 0
+        active_workers = 0
         last_progress = 50
-        progress_lock = asyncio.Lock()
+
+        batch_size = max(1, settings.llm_batch_size)
+
+        def record_analysis(job: FileJob, analysis: Dict[str, Any]):
+            file_path = job.path
+            comp_id = job.component_id
+
+            # Create findings from LLM analysis, one write per file
+            file_findings = []
+            for category, default_severity, default_title in (
+                ("security", "medium", "Security Issue"),
+                ("quality", "low", "Quality Issue"),
+            ):
+                for issue in analysis.get(f"{category}_issues", []):
+                    file_findings.append({
+                        "component_id": comp_id,
+                        "scanner": "llm",
+                        "severity": issue.get("severity", default_severity),
+                        "title": issue.get("title", default_title),
+                        "description": issue.get("description"),
+                        "category": category,
+                        "file_path": file_path,
+                        "suggestion": issue.get("recommendation"),
+                    })
+            db.bulk_create_findings(self.job_id, file_findings)
+
+            # Only after the findings are stored, so a retried file is not summarized twice
+            bucket = file_summaries_by_component.get(comp_id)
+            if bucket is not None:
+                bucket.append({
+                    "path": file_path,
+                    "summary": analysis.get("summary", ""),
+                    "complexity": analysis.get("complexity", "unknown"),
+                })
 
         async def worker(client: OllamaCloudClient, worker_id: int):
-            nonlocal processed_files, last_progress
+            nonlocal processed_files, last_progress, active_workers, screened_out, screening
 
-            while True:
-                job = await queue.get()
-                if job is None:
-                    queue.task_done()
-                    break
-                if self._is_cancelled():
-                    queue.task_done()
-                    while True:
-                        try:
-                            queue.get_nowait()
-                        except asyncio.QueueEmpty:
-                            break
-                        queue.task_done()
+            stop = False
+            carry = None
+            while not stop:
+                item = carry if carry is not None else await queue.get()
+                carry = None
+                if item is None or self._is_cancelled():
                     break
 
-                comp = job["component"]
-                file_info = job["file_info"]
-                file_path = file_info["path"]
-
-                self.status.log_step(
-                    f"Analyzing code file: {file_path}",
-                    detail=f"Worker {worker_id + 1}/{worker_count}"
-                )
+                # Take whatever else is already read, up to the batch size, as long as
+                # it still fits one packed request; a file that does not is kept for next time
+                batch = [item]
+                batch_chars = len(item[1])
+                while len(batch) < batch_size:
+                    try:
+                        item = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                    if item is None:
+                        stop = True
+                        break
+                    if batch_chars + len(item[1]) > MAX_CODE_LENGTH:
+                        carry = item
+                        break
+                    batch.append(item)
+                    batch_chars += len(item[1])
 
+                active_workers += 1
                 try:
-                    content = detector.get_file_content(file_path)
-                    if content and len(content.strip()) >= 50:
-                        analysis = await client.analyze_code(
-                            code=content,
-                            file_path=file_path,
-                            language=file_info.get("language", "unknown")
-                        )
+                    deep = batch
+                    if screening:
+                        # Files the light model clears keep its summary and skip the full analysis
+                        try:
+                            screened = await client.screen_code_batch([
+                                {"code": content, "file_path": job.path, "language": job.language}
+                                for job, content in batch
+                            ], screen_model)
+                        except ScreenModelUnavailable:
+                            if screening:
+                                self.logger.warning(
+                                    "Screen model unavailable, skipping screening", model=screen_model
+                                )
+                            screening = False
+                            screened = {}
+                        deep = []
+                        for job, content in batch:
+                            result = screened.get(job.path)
+                            if result and not result["suspicious"]:
+                                record_analysis(job, {"summary": result["summary"]})
+                                # Only fresh full analyses are cached
+                                content_hashes.pop(job.path, None)
+                                screened_out += 1
+                            else:
+                                deep.append((job, content))
 
-                        comp_id = comp.get("db_id")
-                        if comp_id:
-                            file_summaries_by_component[comp_id].append({
-                                "path": file_path,
-                                "summary": analysis.get("summary", ""),
-                                "complexity": analysis.get("complexity", "unknown"),
-                            })
-
-                        # Create findings from LLM analysis
-                        for issue in analysis.get("security_issues", []):
-                            db.create_finding(
-                                job_id=self.job_id,
-                                component_id=comp.get("db_id"),
-                                scanner="llm",
-                                severity=issue.get("severity", "medium"),
-                                title=issue.get("title", "Security Issue"),
-                                description=issue.get("description"),
-                                category="security",
-                                file_path=file_path,
-                                suggestion=issue.get("recommendation"),
-                            )
-
-                        for issue in analysis.get("quality_issues", []):
-                            db.create_finding(
-                                job_id=self.job_id,
-                                component_id=comp.get("db_id"),
-                                scanner="llm",
-                                severity=issue.get("severity", "low"),
-                                title=issue.get("title", "Quality Issue"),
-                                description=issue.get("description"),
-                                category="quality",
-                                file_path=file_path,
-                                suggestion=issue.get("recommendation"),
-                            )
+                    analyses = await client.analyze_code_batch([
+                        {
+                            "code": content,
+                            "file_path": job.path,
+                            "language": job.language,
+                        }
+                        for job, content in deep
+                    ]) if deep else []
+
+                    fresh = {}
+                    for (job, _), analysis in zip(deep, analyses):
+                        try:
+                            record_analysis(job, analysis)
+                        except Exception as e:
+                            self.logger.warning(f"LLM analysis failed for {job.path}: {e}")
+                            continue
+                        content_hash = content_hashes.pop(job.path, None)
+                        if content_hash and not analysis.get("error") and not analysis.get("parse_error"):
+                            fresh[content_hash] = analysis
+                    db.bulk_cache_analyses(cache_model, fresh)
 
                 except Exception as e:
-                    self.logger.warning(f"LLM analysis failed for {file_path}: {e}")
+                    self.logger.warning(f"LLM analysis failed for {len(batch)} files: {e}")
 
                 finally:
-                    async with progress_lock:
-                        processed_files += 1
-                        progress = 50 + int((processed_files / total_llm_files) * 35)
-                        if progress > last_progress:
-                            last_progress = progress
-                            self.status.update(
-                                "analyzing",
-                                "Analyzing code files...",
-                                progress=progress,
-                                detail=f"{processed_files}/{total_llm_files} files analyzed"
-                            )
-                    queue.task_done()
-
-        workers = []
-        for idx in range(worker_count):
-            client = self.ollama_clients[idx % len(self.ollama_clients)]
-            workers.append(asyncio.create_task(worker(client, idx)))
+                    active_workers -= 1
+                    for job, _ in batch:
+                        file_done(job)
+                    # No await between read and write, so no lock is needed
+                    processed_files += len(batch)
+                    progress = 50 + int((processed_files / total_llm_files) * 35)
+                    if progress > last_progress:
+                        last_progress = progress
+                        self.status.update(
+                            "analyzing",
+                            "Analyzing code files...",
+                            progress=progress,
+                            detail=f"{processed_files}/{total_llm_files} files analyzed"
+                        )
 
-        await queue.join()
-        for worker_task in workers:
-            await worker_task
+        # Each component is summarized as soon as its last file is done,
+        # overlapping with analysis of the remaining files; spread across API keys
+        clients = self.ollama_clients or [self.ollama]
+        semaphore = asyncio.Semaphore(len(clients))
+        comps_by_id = {comp["db_id"]: comp for comp in components if comp.get("db_id")}
+        remaining_by_component = Counter(job.component_id for job in file_jobs)
+        summary_tasks: List[asyncio.Task] = []
 
-        self.status.log_step(
-            f"LLM Analysis complete: {processed_files}/{total_llm_files} files analyzed"
-        )
-
-        # Summarize components (after all files analyzed)
-        for comp in components:
-            self._ensure_not_cancelled()
-            comp_id = comp.get("db_id")
-            file_summaries = file_summaries_by_component.get(comp_id, [])
-            if not file_summaries:
-                continue
-
-            try:
-                self.status.log_step(f"Generating summary for {comp['name']}")
+        async def summarize(comp: Dict[str, Any], client: OllamaCloudClient):
+            comp_id = comp["db_id"]
+            async with semaphore:
+                if self._is_cancelled():
+                    return
+                try:
+                    self.status.log_step(f"Generating summary for {comp['name']}")
 
-                comp_summary = await self.ollama.summarize_component(
-                    component_name=comp["name"],
-                    component_path=comp["path"],
-                    file_summaries=file_summaries,
-                    language=comp.get("language", "unknown")
-                )
+                    comp_summary = await client.summarize_component(
+                        component_name=comp["name"],
+                        component_path=comp["path"],
+                        file_summaries=file_summaries_by_component[comp_id],
+                        language=comp.get("language", "unknown")
+                    )
 
-                if comp_id:
                     db.update_component(
                         comp_id,
                         status="completed",
@@ -711,19 +1071,80 @@ class AnalysisEngine:
                         health_score=comp_summary.get("health_score", 50)
                     )
 
-            except Exception as e:
-                self.logger.warning(f"Component summary failed for {comp['name']}: {e}")
-                if comp_id:
+                except Exception as e:
+                    self.logger.warning(f"Component summary failed for {comp['name']}: {e}")
                     db.update_component(comp_id, status="completed")
+
+        def file_done(job: FileJob):
+            comp_id = job.component_id
+            remaining_by_component[comp_id] -= 1
+            if remaining_by_component[comp_id] == 0 and file_summaries_by_component.get(comp_id):
+                client = clients[len(summary_tasks) % len(clients)]
+                summary_tasks.append(asyncio.create_task(summarize(comps_by_id[comp_id], client)))
+
+        async def heartbeat():
+            # One aggregated step per interval instead of one per file
+            while True:
+                await asyncio.sleep(settings.status_heartbeat_interval)
+                self.status.log_step(
+                    f"Analyzed {processed_files}/{total_llm_files} files",
+                    detail=f"{active_workers}/{worker_count} workers active"
+                )
+
+        producer_task = asyncio.create_task(producer())
+        heartbeat_task = asyncio.create_task(heartbeat())
+        workers = []
+        for idx in range(worker_count):
+            client = self.ollama_clients[idx % len(self.ollama_clients)]
+            workers.append(asyncio.create_task(worker(client, idx)))
+
+        try:
+            await asyncio.gather(*workers)
+            if not producer_task.done():
+                # Workers only stop early on cancellation; nothing drains the queue now
+                producer_task.cancel()
+            await asyncio.wait([producer_task])
+            if not producer_task.cancelled():
+                producer_task.result()
+        except BaseException:
+            for task in summary_tasks:
+                task.cancel()
+            raise
+        finally:
+            # Unblocks the producer if workers stopped early on cancellation
+            producer_task.cancel()
+            heartbeat_task.cancel()
+
+        reuse_parts = []
+        if cached_files:
+            reuse_parts.append(f"{cached_files} reused from cache")
+        if screened_out:
+            reuse_parts.append(f"{screened_out} cleared by {screen_model}")
+        self.status.log_step(
+            f"LLM Analysis complete: {processed_files}/{total_llm_files} files analyzed",
+            detail=", ".join(reuse_parts) or None
+        )
+
+        # Summaries started as components finished; wait for the rest
+        self._ensure_not_cancelled()
+        try:
+            await asyncio.gather(*summary_tasks)
+        finally:
+            for task in summary_tasks:
+                task.cancel()
+        self._ensure_not_cancelled()
     
     async def _generate_report(self, components: List[Dict]):
         """Generate the final analysis report."""
         self._ensure_not_cancelled()
-        # Get all data
-        job = db.get_job(self.job_id)
-        findings = db.get_findings(self.job_id)
-        findings_summary = db.get_findings_summary(self.job_id)
-        db_components = db.get_components(self.job_id)
+        # Get all data; each I/O thread reads on its own connection, which WAL lets run in parallel
+        loop = asyncio.get_running_loop()
+        job, findings, findings_summary, db_components = await asyncio.gather(
+            loop.run_in_executor(self._io_pool, lambda: self._job or db.get_job(self.job_id)),
+            loop.run_in_executor(self._io_pool, db.get_findings, self.job_id),
+            loop.run_in_executor(self._io_pool, db.get_findings_summary, self.job_id),
+            loop.run_in_executor(self._io_pool, db.get_components, self.job_id),
+        )
         
         # Generate executive summary with LLM
         self.status.log_step("Generating executive summary...")
@@ -742,6 +1163,17 @@ class AnalysisEngine:
             self.logger.warning(f"Executive summary generation failed: {e}")
             executive_summary = "Executive summary generation failed."
         
+        # Findings come ordered by severity; optionally keep only the first N of each
+        per_severity_cap = settings.report_max_findings_per_severity
+        report_findings = findings
+        if per_severity_cap > 0:
+            kept = Counter()
+            report_findings = []
+            for f in findings:
+                kept[f["severity"]] += 1
+                if kept[f["severity"]] <= per_severity_cap:
+                    report_findings.append(f)
+        
         # Build full report
         report = {
             "generated_at": datetime.utcnow().isoformat(),
@@ -779,14 +1211,15 @@ class AnalysisEngine:
                     "line": f["line_start"],
                     "suggestion": f["suggestion"],
                 }
-                for f in findings
+                for f in report_findings
             ],
+            "findings_truncated": len(report_findings) < len(findings),
         }
         
         # Save report
         db.create_report(
             job_id=self.job_id,
-            content=json.dumps(report, indent=2),
+            content=orjson.dumps(report).decode(),
             report_type="full",
             format="json"
         )
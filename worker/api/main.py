@@ -7,16 +7,27 @@ from datetime import datetime
 from typing import List, Optional, Dict, Any
 import structlog
 import asyncio
-import secrets
-
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Query, Depends, Header
+import functools
+import hmac
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from celery import group
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
 import json
+import orjson
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
 
 from config import settings, get_available_models
 from database import db
+from events import job_channel
 from worker import analyze_repository, celery_app
 
 # Configure logging
@@ -35,34 +46,95 @@ structlog.configure(
 
 logger = structlog.get_logger()
 
-
-def require_api_key(
-    x_api_key: Optional[str] = Header(None, alias="X-API-Key"),
-    authorization: Optional[str] = Header(None, alias="Authorization"),
-    api_key: Optional[str] = Query(None, description="API key (use headers when possible)")
-) -> None:
-    """Require a valid API key for protected endpoints."""
-    expected = (settings.api_key or "").strip()
-    if not expected:
-        # Misconfiguration: refuse unauthenticated operation
-        raise HTTPException(status_code=500, detail="Server API key is not configured")
-
-    token = (x_api_key or api_key or "").strip()
-    if not token and authorization:
-        auth = authorization.strip()
-        if auth.lower().startswith("bearer "):
-            token = auth.split(" ", 1)[1].strip()
-
-    if not token or not secrets.compare_digest(token, expected):
-        raise HTTPException(status_code=401, detail="Unauthorized")
+# Job statuses after which a status stream ends
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+# Seconds a status stream waits on a quiet channel before re-reading the job
+STREAM_RESYNC_INTERVAL = 15.0
+# Polling delays without Redis, growing while the job is unchanged
+STREAM_POLL_BACKOFF = (1.0, 2.0, 5.0)
+# Seconds a new status stream waits for its Redis subscription before seeding
+STREAM_SUBSCRIBE_TIMEOUT = 2.0
+# Undelivered events buffered per status stream
+STREAM_QUEUE_SIZE = 100
+
+# Every handler's database calls run on these threads, so they never queue
+# behind more callers than there are pooled SQLite readers
+_db_pool = ThreadPoolExecutor(max_workers=settings.api_db_threads, thread_name_prefix="sqlite")
+
+
+async def _db(func, *args, **kwargs):
+    """Run a blocking database call on the SQLite threads."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_pool, functools.partial(func, *args, **kwargs))
+
+
+# Subscriber side of the worker's status events (connects lazily)
+_redis = aioredis.from_url(settings.redis_url)
+
+
+# URL prefixes that require the API key
+PROTECTED_PREFIXES = ("/api/", "/webhook/")
+
+
+class ApiKeyMiddleware:
+    """Require a valid API key for protected endpoints, checked on the raw ASGI scope."""
+
+    def __init__(self, app, api_key: str):
+        self.app = app
+        # Encoded once; requests compare raw header bytes against it
+        self.expected = api_key.strip().encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(PROTECTED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        if not self.expected:
+            # Misconfiguration: refuse unauthenticated operation
+            response = ORJSONResponse({"detail": "Server API key is not configured"}, status_code=500)
+        else:
+            token = _request_token(scope)
+            if token and hmac.compare_digest(token, self.expected):
+                await self.app(scope, receive, send)
+                return
+            response = ORJSONResponse({"detail": "Unauthorized"}, status_code=401)
+        await response(scope, receive, send)
+
+
+def _request_token(scope) -> bytes:
+    """Read the API key from X-API-Key, the api_key query parameter or a Bearer token."""
+    authorization = b""
+    for name, value in scope["headers"]:
+        if name == b"x-api-key":
+            token = value.strip()
+            if token:
+                return token
+        elif name == b"authorization":
+            authorization = value.strip()
+
+    # Query parameter for clients like EventSource that cannot set headers (use headers when possible)
+    query = scope.get("query_string", b"")
+    if b"api_key=" in query:
+        values = parse_qs(query.decode("latin-1")).get("api_key")
+        token = values[0].strip().encode() if values else b""
+        if token:
+            return token
+
+    if authorization[:7].lower() == b"bearer ":
+        return authorization[7:].strip()
+    return b""
 
 # Create FastAPI app
 app = FastAPI(
     title="Bull's Eye API",
     description="Intelligent Codebase Analysis API",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
+# Added before CORS so CORS wraps it and rejections keep their CORS headers
+app.add_middleware(ApiKeyMiddleware, api_key=settings.api_key or "")
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -124,6 +196,7 @@ class JobSummary(BaseModel):
 
 class StatusUpdate(BaseModel):
     """Status update entry."""
+    id: int
     timestamp: str
     stage: str
     message: str
@@ -164,6 +237,21 @@ class StatsResponse(BaseModel):
     findings: Dict[str, int]
 
 
+# Row shapes for list endpoints, selected so database rows already match the response models
+COMPONENT_COLUMNS = (
+    "id",
+    "name",
+    "path",
+    "COALESCE(component_type, 'module') AS component_type",
+    "language",
+    "COALESCE(file_count, 0) AS file_count",
+    "COALESCE(line_count, 0) AS line_count",
+    "health_score",
+    "analysis_summary",
+)
+FINDING_COLUMNS = tuple(FindingInfo.model_fields)
+
+
 # ==================== STARTUP/SHUTDOWN ====================
 
 @app.on_event("startup")
@@ -182,13 +270,13 @@ async def startup():
 
 @app.get(
     "/api/models",
-    response_model=List[ModelInfo],
+    response_model=None,
+    responses={200: {"model": List[ModelInfo]}},
     tags=["Models"],
-    dependencies=[Depends(require_api_key)],
 )
 async def get_models():
     """Get list of available Ollama cloud models."""
-    return get_available_models()
+    return Response(content=_models_json(), media_type="application/json")
 
 
 # ==================== JOB ENDPOINTS ====================
@@ -197,7 +285,6 @@ async def get_models():
     "/api/jobs",
     response_model=JobStatus,
     tags=["Jobs"],
-    dependencies=[Depends(require_api_key)],
 )
 async def create_job(job_data: JobCreate, background_tasks: BackgroundTasks):
     """
@@ -207,51 +294,42 @@ async def create_job(job_data: JobCreate, background_tasks: BackgroundTasks):
     Use the status endpoint to track progress.
     """
     # Create job in database
-    config = {}
-    if job_data.ollama_api_key:
-        config["ollama_api_key"] = job_data.ollama_api_key.strip()
-    if job_data.ollama_api_keys:
-        normalized_keys = []
-        seen = set()
-        for key in job_data.ollama_api_keys:
-            if not key:
-                continue
-            trimmed = key.strip()
-            if trimmed and trimmed not in seen:
-                normalized_keys.append(trimmed)
-                seen.add(trimmed)
-        if normalized_keys:
-            config["ollama_api_keys"] = normalized_keys
+    config = _job_config(job_data)
 
-    job_id = db.create_job(
+    # Pick the task ID up front so the job row is written once, already linked
+    task_id = str(uuid.uuid4())
+    job = await _db(
+        db.create_job_with_task_id,
         repo_url=job_data.repo_url,
         branch=job_data.branch,
         model=job_data.model,
+        celery_task_id=task_id,
         name=job_data.name,
-        config=config if config else None,
+        config=config,
     )
     
     logger.info(
         "Job created",
-        job_id=job_id[:8],
+        job_id=job["id"][:8],
         repo=job_data.repo_url,
         model=job_data.model
     )
     
-    # Start analysis via Celery
-    task = analyze_repository.delay(job_id, job_data.model)
-    db.set_job_task_id(job_id, task.id)
+    # Start analysis via Celery (broker publish is blocking socket I/O)
+    await run_in_threadpool(
+        analyze_repository.apply_async,
+        args=[job["id"], job_data.model],
+        task_id=task_id,
+    )
     
-    # Return job status
-    job = db.get_job(job_id)
     return _format_job_status(job)
 
 
 @app.get(
     "/api/jobs",
-    response_model=List[JobSummary],
+    response_model=None,
+    responses={200: {"model": List[JobSummary]}},
     tags=["Jobs"],
-    dependencies=[Depends(require_api_key)],
 )
 async def list_jobs(
     status: Optional[str] = Query(None, description="Filter by status"),
@@ -259,33 +337,19 @@ async def list_jobs(
     offset: int = Query(0, ge=0),
 ):
     """Get list of all jobs."""
-    jobs = db.get_jobs(status=status, limit=limit, offset=offset)
-    
-    result = []
-    for job in jobs:
-        findings_summary = db.get_findings_summary(job["id"])
-        result.append({
-            "id": job["id"],
-            "name": job["name"],
-            "repo_url": job["repo_url"],
-            "status": job["status"],
-            "progress": job["progress"],
-            "created_at": job["created_at"],
-            "findings_count": findings_summary,
-        })
-    
-    return result
+    # Rows are already shaped like JobSummary; skip per-item response validation
+    jobs = await _db(db.list_jobs_with_summary, status=status, limit=limit, offset=offset)
+    return ORJSONResponse(jobs)
 
 
 @app.get(
     "/api/jobs/{job_id}",
     response_model=JobStatus,
     tags=["Jobs"],
-    dependencies=[Depends(require_api_key)],
 )
 async def get_job(job_id: str):
     """Get detailed job status."""
-    job = db.get_job(job_id)
+    job = await _db(db.get_job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
@@ -295,11 +359,10 @@ async def get_job(job_id: str):
 @app.post(
     "/api/jobs/{job_id}/stop",
     tags=["Jobs"],
-    dependencies=[Depends(require_api_key)],
 )
 async def stop_job(job_id: str):
     """Stop a running job."""
-    job = db.get_job(job_id)
+    job = await _db(db.get_job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
@@ -309,7 +372,9 @@ async def stop_job(job_id: str):
     # Stop Celery task if it exists
     if job.get("celery_task_id"):
         try:
-            celery_app.control.revoke(job["celery_task_id"], terminate=True, signal="SIGTERM")
+            await run_in_threadpool(
+                celery_app.control.revoke, job["celery_task_id"], terminate=True, signal="SIGTERM"
+            )
             logger.info(f"Revoked Celery task {job['celery_task_id']} for job {job_id}")
         except Exception as e:
             logger.warning(
@@ -321,7 +386,8 @@ async def stop_job(job_id: str):
     
     # Update job status to cancelled
     try:
-        db.update_job_status(
+        await _db(
+            db.update_job_status,
             job_id=job_id,
             status="cancelled",
             message="Job stopped by user",
@@ -340,11 +406,10 @@ async def stop_job(job_id: str):
 @app.delete(
     "/api/jobs/{job_id}",
     tags=["Jobs"],
-    dependencies=[Depends(require_api_key)],
 )
 async def delete_job(job_id: str):
     """Delete a job and all its data."""
-    job = db.get_job(job_id)
+    job = await _db(db.get_job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
@@ -352,7 +417,7 @@ async def delete_job(job_id: str):
         raise HTTPException(status_code=400, detail="Cannot delete running job. Stop it first.")
     
     # Delete job and all related data
-    db.delete_job(job_id)
+    await _db(db.delete_job, job_id)
     
     logger.info(f"Job {job_id} deleted by user")
     
@@ -362,23 +427,25 @@ async def delete_job(job_id: str):
 @app.get(
     "/api/jobs/{job_id}/status",
     tags=["Jobs"],
-    dependencies=[Depends(require_api_key)],
 )
 async def get_job_status_updates(
     job_id: str,
-    limit: int = Query(50, ge=1, le=200)
+    limit: int = Query(50, ge=1, le=200),
+    before_id: Optional[int] = Query(None, ge=1, description="Return updates older than this id"),
 ):
     """
     Get detailed status updates for a job.
     
-    Returns chronological list of all status changes.
+    Returns status changes newest first; page back with ``before_id``.
     """
-    job = db.get_job(job_id)
+    # Independent reads; updates are simply dropped if the job is missing
+    job, updates = await asyncio.gather(
+        _db(db.get_job, job_id),
+        _db(db.get_status_updates, job_id, before_id=before_id, limit=limit),
+    )
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    updates = db.get_status_updates(job_id, limit=limit)
-    
     return {
         "job_id": job_id,
         "current_status": job["status"],
@@ -386,6 +453,7 @@ async def get_job_status_updates(
         "current_message": job["status_message"],
         "updates": [
             {
+                "id": u["id"],
                 "timestamp": u["timestamp"],
                 "stage": u["stage"],
                 "message": u["message"],
@@ -397,10 +465,70 @@ async def get_job_status_updates(
     }
 
 
+class _JobRelay:
+    """One Redis subscription for a job, fanned out to every open status stream."""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.queues: List[asyncio.Queue] = []
+        self.ready = asyncio.Event()
+        self.live = False
+        self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        pubsub = _redis.pubsub()
+        try:
+            await pubsub.subscribe(job_channel(self.job_id))
+            self.live = True
+            self.ready.set()
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                for queue in self.queues:
+                    try:
+                        queue.put_nowait(message["data"])
+                    except asyncio.QueueFull:
+                        # A stalled client catches up on its next resync
+                        pass
+        except RedisError as e:
+            logger.warning("Status events unavailable, polling instead", job_id=self.job_id[:8], error=str(e))
+        finally:
+            self.live = False
+            self.ready.set()
+            for queue in self.queues:
+                # Wake waiting streams so they switch to polling
+                try:
+                    queue.put_nowait(None)
+                except asyncio.QueueFull:
+                    pass
+            await pubsub.aclose()
+
+
+_job_relays: Dict[str, _JobRelay] = {}
+
+
+def _join_job_relay(job_id: str):
+    """Register a stream for a job's events, subscribing on first use."""
+    relay = _job_relays.get(job_id)
+    if relay is None or relay.task.done():
+        relay = _job_relays[job_id] = _JobRelay(job_id)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+    relay.queues.append(queue)
+    return relay, queue
+
+
+def _leave_job_relay(relay: _JobRelay, queue: asyncio.Queue):
+    """Unregister a stream; the last one out drops the subscription."""
+    relay.queues.remove(queue)
+    if not relay.queues:
+        relay.task.cancel()
+        if _job_relays.get(relay.job_id) is relay:
+            del _job_relays[relay.job_id]
+
+
 @app.get(
     "/api/jobs/{job_id}/stream",
     tags=["Jobs"],
-    dependencies=[Depends(require_api_key)],
 )
 async def stream_job_status(job_id: str):
     """
@@ -408,37 +536,60 @@ async def stream_job_status(job_id: str):
     
     Connect to this endpoint to receive real-time status updates.
     """
-    job = db.get_job(job_id)
+    job = await _db(db.get_job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
     async def event_generator():
-        last_progress = -1
-        last_status = ""
-        
-        while True:
-            job = db.get_job(job_id)
+        relay, queue = _join_job_relay(job_id)
+        try:
+            # Seed from the database once the relay listens so no update falls in between
+            try:
+                await asyncio.wait_for(relay.ready.wait(), timeout=STREAM_SUBSCRIBE_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+            job = await _db(db.get_job, job_id)
             if not job:
-                break
-            
-            # Send update if changed
-            if job["progress"] != last_progress or job["status"] != last_status:
-                data = {
-                    "status": job["status"],
-                    "progress": job["progress"],
-                    "progress_total": job["progress_total"],
-                    "message": job["status_message"],
-                    "detail": job["progress_detail"],
-                }
+                return
+            last_rev = job["status_rev"]
+            data = _stream_payload(job)
+            idle = 0
+            while True:
                 yield f"data: {json.dumps(data)}\n\n"
-                last_progress = job["progress"]
-                last_status = job["status"]
-            
-            # Stop if completed or failed
-            if job["status"] in ("completed", "failed"):
-                break
-            
-            await asyncio.sleep(1)
+                if data["status"] in TERMINAL_STATUSES:
+                    break
+
+                while True:
+                    message = None
+                    if relay.live:
+                        try:
+                            message = await asyncio.wait_for(queue.get(), timeout=STREAM_RESYNC_INTERVAL)
+                        except asyncio.TimeoutError:
+                            pass
+                    else:
+                        await asyncio.sleep(STREAM_POLL_BACKOFF[idle])
+
+                    if message is not None:
+                        event = json.loads(message)
+                        rev = event.pop("rev", None)
+                        if rev is not None:
+                            if rev <= last_rev:
+                                # Already sent when the stream was seeded
+                                continue
+                            last_rev = rev
+                        data = event
+                        break
+
+                    # Quiet channel or no Redis: resync in case an event was missed
+                    job = await _db(db.get_job_if_newer, job_id, last_rev)
+                    if job is not None:
+                        last_rev = job["status_rev"]
+                        data = _stream_payload(job)
+                        break
+                    idle = min(idle + 1, len(STREAM_POLL_BACKOFF) - 1)
+                idle = 0
+        finally:
+            _leave_job_relay(relay, queue)
     
     return StreamingResponse(
         event_generator(),
@@ -454,27 +605,29 @@ async def stream_job_status(job_id: str):
 
 @app.get(
     "/api/jobs/{job_id}/components",
-    response_model=List[ComponentInfo],
+    response_model=None,
+    responses={200: {"model": List[ComponentInfo]}},
     tags=["Components"],
-    dependencies=[Depends(require_api_key)],
 )
 async def get_job_components(job_id: str):
     """Get all components for a job."""
-    job = db.get_job(job_id)
+    job, components = await asyncio.gather(
+        _db(db.get_job, job_id),
+        _db(db.get_components, job_id, columns=COMPONENT_COLUMNS),
+    )
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    components = db.get_components(job_id)
-    return [_format_component(c) for c in components]
+    return ORJSONResponse(components)
 
 
 # ==================== FINDING ENDPOINTS ====================
 
 @app.get(
     "/api/jobs/{job_id}/findings",
-    response_model=List[FindingInfo],
+    response_model=None,
+    responses={200: {"model": List[FindingInfo]}},
     tags=["Findings"],
-    dependencies=[Depends(require_api_key)],
 )
 async def get_job_findings(
     job_id: str,
@@ -483,32 +636,37 @@ async def get_job_findings(
     component_id: Optional[str] = Query(None, description="Filter by component"),
 ):
     """Get all findings for a job."""
-    job = db.get_job(job_id)
+    job, findings = await asyncio.gather(
+        _db(db.get_job, job_id),
+        _db(
+            db.get_findings,
+            job_id=job_id,
+            severity=severity,
+            scanner=scanner,
+            component_id=component_id,
+            columns=FINDING_COLUMNS,
+        ),
+    )
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    findings = db.get_findings(
-        job_id=job_id,
-        severity=severity,
-        scanner=scanner,
-        component_id=component_id,
-    )
-    
-    return [_format_finding(f) for f in findings]
+    return ORJSONResponse(findings)
 
 
 @app.get(
     "/api/jobs/{job_id}/findings/summary",
     tags=["Findings"],
-    dependencies=[Depends(require_api_key)],
 )
 async def get_findings_summary(job_id: str):
     """Get findings summary by severity."""
-    job = db.get_job(job_id)
+    job, summary = await asyncio.gather(
+        _db(db.get_job, job_id),
+        _db(db.get_findings_summary, job_id),
+    )
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    return db.get_findings_summary(job_id)
+    return summary
 
 
 # ==================== REPORT ENDPOINTS ====================
@@ -516,19 +674,21 @@ async def get_findings_summary(job_id: str):
 @app.get(
     "/api/jobs/{job_id}/report",
     tags=["Reports"],
-    dependencies=[Depends(require_api_key)],
 )
 async def get_job_report(job_id: str):
     """Get the full analysis report."""
-    job = db.get_job(job_id)
+    job, report = await asyncio.gather(
+        _db(db.get_job, job_id),
+        _db(db.get_report, job_id),
+    )
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    report = db.get_report(job_id)
     if not report:
         raise HTTPException(status_code=404, detail="Report not ready")
     
-    return json.loads(report["content"])
+    # Stored content is already JSON; ship it as-is instead of parsing and re-encoding
+    return Response(content=report["content"], media_type="application/json")
 
 
 # ==================== STATS ENDPOINTS ====================
@@ -537,11 +697,10 @@ async def get_job_report(job_id: str):
     "/api/stats",
     response_model=StatsResponse,
     tags=["Stats"],
-    dependencies=[Depends(require_api_key)],
 )
 async def get_stats():
     """Get overall statistics."""
-    return db.get_stats()
+    return await _db(db.get_stats)
 
 
 # ==================== WEBHOOK ENDPOINTS ====================
@@ -549,7 +708,6 @@ async def get_stats():
 @app.post(
     "/webhook/analyze",
     tags=["Webhooks"],
-    dependencies=[Depends(require_api_key)],
 )
 async def webhook_analyze(
     repo_url: str,
@@ -563,14 +721,15 @@ async def webhook_analyze(
     
     Can be used by n8n workflows or CI/CD pipelines.
     """
-    job_id = db.create_job(
+    job_id = await _db(
+        db.create_job,
         repo_url=repo_url,
         branch=branch,
         model=model,
         name=name,
     )
     
-    analyze_repository.delay(job_id, model)
+    await run_in_threadpool(analyze_repository.delay, job_id, model)
     
     return {
         "status": "queued",
@@ -579,6 +738,48 @@ async def webhook_analyze(
     }
 
 
+@app.post(
+    "/webhook/analyze/batch",
+    tags=["Webhooks"],
+)
+async def webhook_analyze_batch(jobs: List[JobCreate]):
+    """
+    Webhook endpoint for triggering several analyses at once.
+    
+    Jobs are stored in one transaction and submitted to Celery as one group.
+    """
+    if not jobs:
+        raise HTTPException(status_code=400, detail="No jobs given")
+
+    task_ids = [str(uuid.uuid4()) for _ in jobs]
+    job_ids = await _db(db.create_jobs_bulk, [
+        {
+            "repo_url": job_data.repo_url,
+            "branch": job_data.branch,
+            "model": job_data.model,
+            "name": job_data.name,
+            "config": _job_config(job_data),
+            "celery_task_id": task_id,
+        }
+        for job_data, task_id in zip(jobs, task_ids)
+    ])
+
+    submission = group(
+        analyze_repository.s(job_id, job_data.model).set(task_id=task_id)
+        for job_id, job_data, task_id in zip(job_ids, jobs, task_ids)
+    )
+    await run_in_threadpool(submission.apply_async)
+
+    return {
+        "status": "queued",
+        "jobs": [
+            {"job_id": job_id, "repo_url": job_data.repo_url}
+            for job_id, job_data in zip(job_ids, jobs)
+        ],
+        "message": f"Analysis queued for {len(jobs)} repositories",
+    }
+
+
 # ==================== HEALTH ENDPOINTS ====================
 
 @app.get("/health", tags=["Health"])
@@ -586,13 +787,48 @@ async def health_check():
     """Health check endpoint."""
     return {
         "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": _health_timestamp(),
         "version": "1.0.0",
     }
 
 
 # ==================== HELPER FUNCTIONS ====================
 
+_health_second = 0
+_health_stamp = ""
+
+
+@functools.cache
+def _models_json() -> bytes:
+    """Validated model list, serialized once since settings are fixed per process."""
+    return orjson.dumps([ModelInfo(**model).model_dump() for model in get_available_models()])
+
+
+def _health_timestamp() -> str:
+    """UTC ISO timestamp for health probes, formatted at most once per second."""
+    global _health_second, _health_stamp
+    now = int(time.time())
+    if now != _health_second:
+        _health_second = now
+        _health_stamp = datetime.utcfromtimestamp(now).isoformat()
+    return _health_stamp
+
+
+def _job_config(job_data: JobCreate) -> Optional[Dict]:
+    """Build the stored job config from per-job request options."""
+    config = {}
+    if job_data.ollama_api_key:
+        config["ollama_api_key"] = job_data.ollama_api_key.strip()
+    if job_data.ollama_api_keys:
+        # Strip, drop blanks and dedupe while keeping the caller's order
+        normalized_keys = list(dict.fromkeys(
+            trimmed for trimmed in (key.strip() for key in job_data.ollama_api_keys if key) if trimmed
+        ))
+        if normalized_keys:
+            config["ollama_api_keys"] = normalized_keys
+    return config or None
+
+
 def _format_job_status(job: Dict) -> Dict:
     """Format job for API response."""
     return {
@@ -614,34 +850,16 @@ def _format_job_status(job: Dict) -> Dict:
     }
 
 
-def _format_component(comp: Dict) -> Dict:
-    """Format component for API response."""
-    return {
-        "id": comp["id"],
-        "name": comp["name"],
-        "path": comp["path"],
-        "component_type": comp.get("component_type", "module"),
-        "language": comp.get("language"),
-        "file_count": comp.get("file_count", 0),
-        "line_count": comp.get("line_count", 0),
-        "health_score": comp.get("health_score"),
-        "analysis_summary": comp.get("analysis_summary"),
-    }
-
-
-def _format_finding(finding: Dict) -> Dict:
-    """Format finding for API response."""
+def _stream_payload(job: Optional[Dict]) -> Optional[Dict]:
+    """Format job progress for a status stream event."""
+    if not job:
+        return None
     return {
-        "id": finding["id"],
-        "scanner": finding["scanner"],
-        "severity": finding["severity"],
-        "category": finding.get("category"),
-        "title": finding["title"],
-        "description": finding.get("description"),
-        "file_path": finding.get("file_path"),
-        "line_start": finding.get("line_start"),
-        "suggestion": finding.get("suggestion"),
-        "llm_explanation": finding.get("llm_explanation"),
+        "status": job["status"],
+        "progress": job["progress"],
+        "progress_total": job["progress_total"],
+        "message": job["status_message"],
+        "detail": job["progress_detail"],
     }
 
 
@@ -5,17 +5,18 @@ Configuration settings using Pydantic
 
 from pydantic_settings import BaseSettings
 from pydantic import Field
-from typing import Optional, List
+from typing import Optional, Tuple
 from pathlib import Path
+import functools
 import json
 
 
 # Available Ollama Cloud Models
-OLLAMA_CLOUD_MODELS = [
+OLLAMA_CLOUD_MODELS = (
     {"id": "deepseek-v3.2:cloud", "name": "DeepSeek V3.2 Cloud", "description": "Latest DeepSeek model for strong reasoning"},
     {"id": "gpt-oss:120b-cloud", "name": "GPT-OSS 120B Cloud", "description": "Powerful open-source model for complex analysis"},
     {"id": "kimi-k2-thinking:cloud", "name": "Kimi K2 Thinking Cloud", "description": "Long-form reasoning and deep analysis"},
-]
+)
 
 
 class Settings(BaseSettings):
@@ -26,6 +27,14 @@ class Settings(BaseSettings):
         default=Path("/app/data/bullseye.db"),
         description="SQLite database file path"
     )
+    db_pool_size: int = Field(
+        default=8,
+        description="SQLite connections opened up front and shared by all threads of a process"
+    )
+    sqlite_mmap_mb: int = Field(
+        default=256,
+        description="Megabytes of the SQLite file each connection memory-maps for reads (0 disables)"
+    )
     
     # Redis
     redis_url: str = Field(
@@ -46,6 +55,10 @@ class Settings(BaseSettings):
         default="deepseek-v3.2:cloud",
         description="Default Ollama model for analysis"
     )
+    ollama_screen_model: str = Field(
+        default="",
+        description="Lighter model that screens files first; only suspicious files get the full analysis model (empty disables)"
+    )
     ollama_models: Optional[str] = Field(
         default=None,
         description="Override model list for UI (comma-separated or JSON array)"
@@ -74,6 +87,10 @@ class Settings(BaseSettings):
         default=Path("/app/repos"),
         description="Directory to store cloned repositories"
     )
+    clone_sparse_paths: str = Field(
+        default="",
+        description="Comma-separated directories to check out via a partial, sparse clone (empty clones everything)"
+    )
     data_dir: Path = Field(
         default=Path("/app/data"),
         description="Directory for SQLite database and cache"
@@ -92,9 +109,25 @@ class Settings(BaseSettings):
         default=1.0,
         description="Delay between sequential LLM requests (no parallel)"
     )
+    llm_concurrency_per_key: int = Field(
+        default=1,
+        description="Concurrent LLM requests allowed per API key (1 keeps requests sequential)"
+    )
+    llm_batch_size: int = Field(
+        default=4,
+        description="Maximum small files analyzed together in one LLM request (1 disables batching)"
+    )
+    enable_llm_triage: bool = Field(
+        default=False,
+        description="Ask the LLM to triage file paths the built-in skip patterns do not match"
+    )
+    cancel_poll_interval: float = Field(
+        default=2.0,
+        description="Seconds between background checks for job cancellation"
+    )
     enable_caching: bool = Field(
         default=True,
-        description="Enable file/component caching"
+        description="Reuse LLM analyses of unchanged file contents across jobs"
     )
     max_files_per_component: int = Field(
         default=50,
@@ -108,6 +141,15 @@ class Settings(BaseSettings):
         default=10,
         description="Maximum related files to include in context"
     )
+    context_cache_max_mb: int = Field(
+        default=256,
+        description="Memory budget in MB for file contents cached during context-aware analysis"
+    )
+
+    report_max_findings_per_severity: int = Field(
+        default=0,
+        description="Maximum findings per severity embedded in the stored report (0 keeps all)"
+    )
 
     # Scanner settings
     enable_opengrep: bool = Field(
@@ -130,17 +172,37 @@ class Settings(BaseSettings):
         default=10,
         description="Cyclomatic complexity threshold for Lizard findings"
     )
+    max_concurrent_scanners: int = Field(
+        default=3,
+        description="Maximum repository-wide scanners run at the same time"
+    )
     
     # Logging
     log_level: str = Field(
         default="INFO",
         description="Logging level"
     )
+    log_format: str = Field(
+        default="console",
+        description="Log output format for the worker: console or json"
+    )
+    status_heartbeat_interval: float = Field(
+        default=2.0,
+        description="Seconds between aggregated progress steps during LLM analysis"
+    )
+    status_flush_interval: float = Field(
+        default=0.5,
+        description="Seconds between writes of buffered status updates"
+    )
     
     # API settings
     api_host: str = Field(default="0.0.0.0")
     api_port: int = Field(default=8000)
     api_workers: int = Field(default=4)
+    api_db_threads: int = Field(
+        default=4,
+        description="Threads serving every API database call; keep at or below db_pool_size"
+    )
     
     # Security
     api_key: str = Field(
@@ -157,8 +219,9 @@ class Settings(BaseSettings):
 settings = Settings()
 
 
-def get_available_models() -> List[dict]:
-    """Get list of available Ollama cloud models."""
+@functools.cache
+def get_available_models() -> Tuple[dict, ...]:
+    """Get list of available Ollama cloud models (parsed once, settings are fixed per process)."""
     if settings.ollama_models:
         raw = settings.ollama_models.strip()
         if raw:
@@ -166,15 +229,15 @@ def get_available_models() -> List[dict]:
                 try:
                     parsed = json.loads(raw)
                     if isinstance(parsed, list) and all(isinstance(item, dict) and "id" in item for item in parsed):
-                        return parsed
+                        return tuple(parsed)
                 except json.JSONDecodeError:
                     pass
 
             model_ids = [item.strip() for item in raw.replace("\n", ",").split(",") if item.strip()]
             if model_ids:
-                return [
+                return tuple(
                     {"id": model_id, "name": model_id, "description": "Custom model"}
                     for model_id in model_ids
-                ]
+                )
 
     return OLLAMA_CLOUD_MODELS
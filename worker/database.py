@@ -3,26 +3,162 @@ Bull's Eye - SQLite Database Manager
 Lightweight database operations for analysis jobs
 """
 
+import atexit
+import os
 import sqlite3
 import json
 import uuid
-from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 from contextlib import contextmanager
+import queue
 import threading
+import time
+
+import orjson
 
 from config import settings
+from events import publish_job_status
+
+# Page cache per connection in KiB; pooled connections are reused, so it stays warm
+SQLITE_PAGE_CACHE_KB = 64000
+# Seconds get_stats reuses its result; writes from this process invalidate it sooner
+STATS_CACHE_TTL = 2.0
+# Seconds to wait for a free pooled connection before giving up
+CONNECTION_WAIT_TIMEOUT = 60.0
+# Prepared statements kept per connection (the filter variants of get_findings add up)
+SQLITE_STATEMENT_CACHE = 256
+
+# Findings written per transaction by bulk_create_findings
+FINDINGS_BATCH_SIZE = 500
+
+# Findings count by severity for the rows of findings alias `f`, built as JSON by SQLite
+_FINDINGS_SUMMARY_JSON = "json_object({}, 'total', COUNT(f.id))".format(", ".join(
+    f"'{severity}', COUNT(CASE WHEN f.severity = '{severity}' THEN 1 END)"
+    for severity in ("critical", "high", "medium", "low", "info")
+))
+
+# UTC ISO-8601 timestamp with milliseconds, computed by SQLite instead of Python
+_SQL_NOW = "strftime('%Y-%m-%dT%H:%M:%f', 'now')"
+
+# Shared by both update_job_status variants; the guard clause slots in before RETURNING
+_UPDATE_JOB_STATUS_TEMPLATE = """
+    UPDATE jobs
+    SET
+        status = ?,
+        status_message = ?,
+        progress = COALESCE(?, progress),
+        progress_total = COALESCE(?, progress_total),
+        progress_detail = COALESCE(?, progress_detail),
+        status_rev = status_rev + 1,
+        error_message = COALESCE(?, error_message),
+        started_at = CASE WHEN ? = 'cloning' THEN {now} ELSE started_at END,
+        completed_at = CASE WHEN ? IN ('completed', 'failed') THEN {now} ELSE completed_at END
+    WHERE id = ?{guard}
+    RETURNING status, progress, progress_total, status_message, progress_detail, status_rev
+"""
+_UPDATE_JOB_STATUS_SQL = _UPDATE_JOB_STATUS_TEMPLATE.format(now=_SQL_NOW, guard="")
+_UPDATE_JOB_STATUS_UNLESS_CANCELLED_SQL = _UPDATE_JOB_STATUS_TEMPLATE.format(
+    now=_SQL_NOW, guard=" AND status != 'cancelled'"
+)
+
+# Upper bound for rowid keyset pages when no cursor is given
+_MAX_ROWID = 2 ** 63 - 1
+
+_SELECT_STATUS_UPDATES_SQL = """
+    SELECT id, timestamp, stage, message, progress, details
+    FROM status_updates
+    WHERE job_id = ? AND id < ?
+    ORDER BY id DESC
+    LIMIT ?
+"""
+
+_INSERT_STATUS_UPDATE_SQL = """
+    INSERT INTO status_updates (job_id, stage, message, progress, details)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+_INSERT_FINDING_SQL = """
+    INSERT OR IGNORE INTO findings (
+        id, job_id, component_id, file_id, scanner, rule_id,
+        severity, category, title, description, file_path,
+        line_start, line_end, code_snippet, suggestion,
+        llm_explanation, fingerprint
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_INSERT_JOB_SQL = """
+    INSERT INTO jobs (id, name, repo_url, branch, model, config, status, progress, celery_task_id)
+    VALUES (?, ?, ?, ?, ?, ?, 'pending', 0, ?)
+"""
+
+_INSERT_JOB_CREATED_SQL = """
+    INSERT INTO status_updates (job_id, stage, message)
+    VALUES (?, 'created', ?)
+"""
+
+_INSERT_FILE_SQL = """
+    INSERT INTO files (id, component_id, job_id, path, language, line_count, size_bytes)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+def _mint_ids(count: int) -> List[str]:
+    """Random UUID4 strings for bulk inserts, drawn from one urandom call."""
+    buf = bytearray(os.urandom(16 * count))
+    # Stamp the version (4) and RFC 4122 variant bits that uuid.uuid4() would set
+    buf[6::16] = bytes((b & 0x0F) | 0x40 for b in buf[6::16])
+    buf[8::16] = bytes((b & 0x3F) | 0x80 for b in buf[8::16])
+    h = buf.hex()
+    return [
+        f"{h[i:i + 8]}-{h[i + 8:i + 12]}-{h[i + 12:i + 16]}-{h[i + 16:i + 20]}-{h[i + 20:i + 32]}"
+        for i in range(0, 32 * count, 32)
+    ]
+
+
+def _job_name(repo_url: str, name: Optional[str]) -> str:
+    """Use the given job name or derive one from the repository URL."""
+    return name or f"Analysis of {repo_url.split('/')[-1].replace('.git', '')}"
+
+
+class _ConnectionPool:
+    """Bounded pool of pre-configured read-only SQLite connections, most recently used first."""
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], size: int):
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        # Open every connection up front so PRAGMA setup is paid once per connection
+        for _ in range(max(1, size)):
+            self._idle.put(connect())
+
+    def get(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get(timeout=CONNECTION_WAIT_TIMEOUT)
+        except queue.Empty:
+            raise sqlite3.OperationalError("No free database connection in the pool") from None
+
+    def put(self, conn: sqlite3.Connection):
+        self._idle.put(conn)
+
+    def close(self):
+        """Close the idle connections."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
 
 
 class Database:
     """Thread-safe SQLite database manager."""
     
-    _local = threading.local()
-    
     def __init__(self, db_path: Optional[Path] = None):
         self.db_path = db_path or settings.database_path
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._writer = self._connect(writer=True)
+        self._writer_lock = threading.Lock()
+        # Bumped after every local write so cached reads can tell they are stale
+        self._write_generation = 0
+        self._stats_cache: Optional[Tuple[int, float, Dict[str, Any]]] = None
+        self._pool = _ConnectionPool(self._connect, settings.db_pool_size)
         self._init_db()
     
     def _init_db(self):
@@ -33,23 +169,28 @@ class Database:
         ]
         schema_path = next((path for path in schema_candidates if path.exists()), None)
         if schema_path:
-            with self.get_connection() as conn:
+            with self.writer() as conn:
                 conn.executescript(schema_path.read_text())
 
         self._ensure_jobs_schema()
         
-        # Migration: Add celery_task_id to jobs if it doesn't exist
-        try:
-            with self.get_connection() as conn:
-                conn.execute("ALTER TABLE jobs ADD COLUMN celery_task_id TEXT")
-                print("Added celery_task_id column to jobs table")
-        except sqlite3.OperationalError as e:
-            if "duplicate column name" not in str(e).lower():
-                print(f"Migration error: {e}")
+        # Migration: Add newer job columns if they don't exist
+        for column, definition in (("celery_task_id", "TEXT"), ("status_rev", "INTEGER DEFAULT 0")):
+            try:
+                with self.writer() as conn:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+                    print(f"Added {column} column to jobs table")
+            except sqlite3.OperationalError as e:
+                if "duplicate column name" not in str(e).lower():
+                    print(f"Migration error: {e}")
+
+        # Give the planner statistics for the indexes (cheap when nothing changed)
+        with self.writer() as conn:
+            conn.execute("PRAGMA optimize")
 
     def _ensure_jobs_schema(self):
         """Ensure jobs table supports the cancelled status and new columns."""
-        with self.get_connection() as conn:
+        with self.writer() as conn:
             row = conn.execute(
                 "SELECT sql FROM sqlite_master WHERE type='table' AND name='jobs'"
             ).fetchone()
@@ -77,6 +218,7 @@ class Database:
                 "progress_detail",
                 "model",
                 "celery_task_id",
+                "status_rev",
                 "created_at",
                 "started_at",
                 "completed_at",
@@ -113,6 +255,7 @@ class Database:
                     progress_detail TEXT,
                     model TEXT NOT NULL,
                     celery_task_id TEXT,
+                    status_rev INTEGER DEFAULT 0,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     started_at TIMESTAMP,
                     completed_at TIMESTAMP,
@@ -132,32 +275,83 @@ class Database:
             conn.execute("ALTER TABLE jobs_new RENAME TO jobs")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at DESC)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs(status, created_at DESC)")
             print("Migrated jobs table to include cancelled status")
     
+    def _connect(self, writer: bool = False) -> sqlite3.Connection:
+        """Open a connection with the performance PRAGMAs applied."""
+        conn = sqlite3.connect(
+            str(self.db_path),
+            check_same_thread=False,
+            timeout=30.0,
+            cached_statements=SQLITE_STATEMENT_CACHE,
+            # The writer manages its own transactions with BEGIN IMMEDIATE
+            isolation_level=None if writer else "",
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL stays consistent with NORMAL sync, which skips the fsync on every commit
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA cache_size=-{SQLITE_PAGE_CACHE_KB}")
+        # Memory-mapped reads skip a copy per page; 0 disables where mmap is unreliable
+        conn.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_mb * 1024 * 1024}")
+        conn.execute("PRAGMA foreign_keys=ON")
+        if not writer:
+            conn.execute("PRAGMA query_only=ON")
+        return conn
+
     @contextmanager
-    def get_connection(self):
-        """Get thread-local database connection."""
-        if not hasattr(self._local, 'connection') or self._local.connection is None:
-            self._local.connection = sqlite3.connect(
-                str(self.db_path),
-                check_same_thread=False,
-                timeout=30.0
-            )
-            self._local.connection.row_factory = sqlite3.Row
-            self._local.connection.execute("PRAGMA journal_mode=WAL")
-            self._local.connection.execute("PRAGMA foreign_keys=ON")
-        
+    def reader(self):
+        """Check out a pooled read-only connection; WAL readers never block each other."""
+        conn = self._pool.get()
         try:
-            yield self._local.connection
-            self._local.connection.commit()
-        except Exception:
-            self._local.connection.rollback()
-            raise
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def writer(self):
+        """Run one write transaction on the single writer connection."""
+        with self._writer_lock:
+            conn = self._writer
+            # Take the write lock up front instead of upgrading mid-transaction
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                if conn.in_transaction:
+                    conn.execute("COMMIT")
+                self._write_generation += 1
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+
+    # Any statement is safe on the writer; reads should prefer reader()
+    get_connection = writer
+
+    def close(self):
+        """Let SQLite refresh its planner statistics, then close all connections."""
+        with self._writer_lock:
+            try:
+                self._writer.execute("PRAGMA optimize")
+            finally:
+                self._writer.close()
+        self._pool.close()
     
     def dict_from_row(self, row: sqlite3.Row) -> Dict[str, Any]:
         """Convert sqlite Row to dictionary."""
         return dict(row) if row else None
 
+    @staticmethod
+    def _job_from_row(row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a jobs row to a dictionary, decoding config only when it was selected."""
+        job = dict(row)
+        if "config" in job:
+            job["config"] = orjson.loads(job["config"]) if job["config"] else {}
+        return job
+
     # ==================== JOB OPERATIONS ====================
     
     def create_job(
@@ -169,53 +363,136 @@ class Database:
         config: Optional[Dict] = None
     ) -> str:
         """Create a new analysis job."""
+        return self._insert_job(repo_url, branch, model, name, config)["id"]
+
+    def create_job_with_task_id(
+        self,
+        repo_url: str,
+        branch: str,
+        model: str,
+        celery_task_id: str,
+        name: Optional[str] = None,
+        config: Optional[Dict] = None
+    ) -> Dict:
+        """Create a job already linked to its Celery task and return the stored row."""
+        return self._insert_job(repo_url, branch, model, name, config, celery_task_id)
+
+    def _insert_job(
+        self,
+        repo_url: str,
+        branch: str,
+        model: str,
+        name: Optional[str],
+        config: Optional[Dict],
+        celery_task_id: Optional[str] = None
+    ) -> Dict:
+        """Insert a job and its creation status update in one transaction."""
         job_id = str(uuid.uuid4())
-        job_name = name or f"Analysis of {repo_url.split('/')[-1].replace('.git', '')}"
-        
-        with self.get_connection() as conn:
-            conn.execute("""
-                INSERT INTO jobs (id, name, repo_url, branch, model, config, status, progress)
-                VALUES (?, ?, ?, ?, ?, ?, 'pending', 0)
-            """, (job_id, job_name, repo_url, branch, model, json.dumps(config or {})))
+        job_name = _job_name(repo_url, name)
         
-        self.add_status_update(job_id, "created", f"Job created: {job_name}")
-        return job_id
+        with self.writer() as conn:
+            row = conn.execute(_INSERT_JOB_SQL + " RETURNING *", (
+                job_id, job_name, repo_url, branch, model, json.dumps(config or {}), celery_task_id
+            )).fetchone()
+            conn.execute(_INSERT_JOB_CREATED_SQL, (job_id, f"Job created: {job_name}"))
+
+        return self._job_from_row(row)
+
+    def create_jobs_bulk(self, jobs: List[Dict[str, Any]]) -> List[str]:
+        """Create several jobs, each optionally linked to a Celery task, in one transaction."""
+        job_rows = []
+        created_rows = []
+        for job_id, job in zip(_mint_ids(len(jobs)), jobs):
+            job_name = _job_name(job["repo_url"], job.get("name"))
+            job_rows.append((
+                job_id,
+                job_name,
+                job["repo_url"],
+                job.get("branch", "main"),
+                job["model"],
+                json.dumps(job.get("config") or {}),
+                job.get("celery_task_id"),
+            ))
+            created_rows.append((job_id, f"Job created: {job_name}"))
+
+        with self.writer() as conn:
+            conn.executemany(_INSERT_JOB_SQL, job_rows)
+            conn.executemany(_INSERT_JOB_CREATED_SQL, created_rows)
+        return [row[0] for row in job_rows]
     
     def get_job(self, job_id: str) -> Optional[Dict]:
         """Get job by ID."""
-        with self.get_connection() as conn:
+        with self.reader() as conn:
             row = conn.execute(
                 "SELECT * FROM jobs WHERE id = ?", (job_id,)
             ).fetchone()
-            if row:
-                job = self.dict_from_row(row)
-                job['config'] = json.loads(job['config']) if job['config'] else {}
-                return job
-            return None
+            return self._job_from_row(row) if row else None
+    
+    def get_job_if_newer(self, job_id: str, status_rev: int) -> Optional[Dict]:
+        """Get a job only if its status changed after the given revision."""
+        with self.reader() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE id = ? AND status_rev > ?", (job_id, status_rev)
+            ).fetchone()
+            return self._job_from_row(row) if row else None
+
+    def get_job_status(self, job_id: str) -> Optional[str]:
+        """Get only the status of a job."""
+        with self.reader() as conn:
+            row = conn.execute(
+                "SELECT status FROM jobs WHERE id = ? LIMIT 1", (job_id,)
+            ).fetchone()
+            return row["status"] if row else None
     
     def get_jobs(
         self,
         status: Optional[str] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        columns: Sequence[str] = ("*",)
     ) -> List[Dict]:
-        """Get all jobs with optional filtering."""
-        with self.get_connection() as conn:
+        """Get all jobs with optional filtering, optionally only the given columns."""
+        select = ", ".join(columns)
+        with self.reader() as conn:
             if status:
-                rows = conn.execute("""
-                    SELECT * FROM jobs WHERE status = ?
+                rows = conn.execute(f"""
+                    SELECT {select} FROM jobs WHERE status = ?
                     ORDER BY created_at DESC LIMIT ? OFFSET ?
                 """, (status, limit, offset)).fetchall()
             else:
-                rows = conn.execute("""
-                    SELECT * FROM jobs
+                rows = conn.execute(f"""
+                    SELECT {select} FROM jobs
                     ORDER BY created_at DESC LIMIT ? OFFSET ?
                 """, (limit, offset)).fetchall()
             
+            return [self._job_from_row(row) for row in rows]
+
+    def list_jobs_with_summary(
+        self,
+        status: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[Dict]:
+        """Get a page of jobs with their findings count by severity in one query."""
+        where = "WHERE status = ?" if status else ""
+        params = (status, limit, offset) if status else (limit, offset)
+        with self.reader() as conn:
+            rows = conn.execute(f"""
+                SELECT j.id, j.name, j.repo_url, j.status, j.progress, j.created_at,
+                       {_FINDINGS_SUMMARY_JSON} AS findings_count
+                FROM (
+                    SELECT * FROM jobs {where}
+                    ORDER BY created_at DESC LIMIT ? OFFSET ?
+                ) j
+                LEFT JOIN findings f ON f.job_id = j.id
+                GROUP BY j.id
+                ORDER BY j.created_at DESC
+            """, params).fetchall()
+
             jobs = []
             for row in rows:
                 job = self.dict_from_row(row)
-                job['config'] = json.loads(job['config']) if job['config'] else {}
+                job["findings_count"] = orjson.loads(job["findings_count"])
                 jobs.append(job)
             return jobs
     
@@ -227,31 +504,16 @@ class Database:
         progress: Optional[int] = None,
         progress_total: Optional[int] = None,
         progress_detail: Optional[str] = None,
-        error: Optional[str] = None
-    ):
-        """Update job status with detailed progress."""
-        started_at = None
-        completed_at = None
-        if status == "cloning":
-            started_at = datetime.utcnow().isoformat()
-        elif status in ("completed", "failed"):
-            completed_at = datetime.utcnow().isoformat()
-
-        with self.get_connection() as conn:
-            conn.execute(
-                """
-                UPDATE jobs
-                SET
-                    status = ?,
-                    status_message = ?,
-                    progress = COALESCE(?, progress),
-                    progress_total = COALESCE(?, progress_total),
-                    progress_detail = COALESCE(?, progress_detail),
-                    error_message = COALESCE(?, error_message),
-                    started_at = COALESCE(?, started_at),
-                    completed_at = COALESCE(?, completed_at)
-                WHERE id = ?
-                """,
+        error: Optional[str] = None,
+        unless_cancelled: bool = False
+    ) -> bool:
+        """Update job status with detailed progress. Returns False if no row was changed."""
+        # Never overwrite a cancellation made by the API while the job runs
+        query = _UPDATE_JOB_STATUS_UNLESS_CANCELLED_SQL if unless_cancelled else _UPDATE_JOB_STATUS_SQL
+
+        with self.writer() as conn:
+            row = conn.execute(
+                query,
                 (
                     status,
                     message,
@@ -259,18 +521,29 @@ class Database:
                     progress_total,
                     progress_detail,
                     error,
-                    started_at,
-                    completed_at,
+                    status,
+                    status,
                     job_id,
                 ),
-            )
+            ).fetchone()
+            if row is None:
+                return False
+            # Status update entry rides in the same transaction as the job row
+            conn.execute(_INSERT_STATUS_UPDATE_SQL, (job_id, status, message or status, progress, progress_detail))
         
-        # Add status update entry
-        self.add_status_update(job_id, status, message or status, progress, progress_detail)
+        publish_job_status(job_id, {
+            "status": row["status"],
+            "progress": row["progress"],
+            "progress_total": row["progress_total"],
+            "message": row["status_message"],
+            "detail": row["progress_detail"],
+            "rev": row["status_rev"],
+        })
+        return True
     
     def set_job_commit(self, job_id: str, commit_hash: str):
         """Set the commit hash for a job."""
-        with self.get_connection() as conn:
+        with self.writer() as conn:
             conn.execute(
                 "UPDATE jobs SET commit_hash = ? WHERE id = ?",
                 (commit_hash, job_id)
@@ -278,7 +551,7 @@ class Database:
 
     def set_job_task_id(self, job_id: str, task_id: str):
         """Set the Celery task ID for a job."""
-        with self.get_connection() as conn:
+        with self.writer() as conn:
             conn.execute(
                 "UPDATE jobs SET celery_task_id = ? WHERE id = ?",
                 (task_id, job_id)
@@ -295,21 +568,34 @@ class Database:
         details: Optional[str] = None
     ):
         """Add a detailed status update for progress tracking."""
-        with self.get_connection() as conn:
-            conn.execute("""
-                INSERT INTO status_updates (job_id, stage, message, progress, details)
-                VALUES (?, ?, ?, ?, ?)
-            """, (job_id, stage, message, progress, details))
+        with self.writer() as conn:
+            conn.execute(_INSERT_STATUS_UPDATE_SQL, (job_id, stage, message, progress, details))
     
-    def get_status_updates(self, job_id: str, limit: int = 100) -> List[Dict]:
-        """Get status updates for a job."""
-        with self.get_connection() as conn:
-            rows = conn.execute("""
-                SELECT * FROM status_updates 
-                WHERE job_id = ? 
-                ORDER BY timestamp DESC 
-                LIMIT ?
-            """, (job_id, limit)).fetchall()
+    def bulk_add_status_updates(self, job_id: str, updates: List[Dict[str, Any]]):
+        """Add buffered status updates in one transaction, keeping their timestamps."""
+        if not updates:
+            return
+        with self.writer() as conn:
+            conn.executemany("""
+                INSERT INTO status_updates (job_id, stage, message, progress, details, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [
+                (job_id, u["stage"], u["message"], u.get("progress"), u.get("details"), u["timestamp"])
+                for u in updates
+            ])
+    
+    def get_status_updates(self, job_id: str, before_id: Optional[int] = None,
+                           limit: int = 100) -> List[Dict]:
+        """Get status updates for a job, newest first.
+
+        Pages by ``id`` rather than OFFSET: pass the smallest ``id`` of the
+        previous page as ``before_id`` to fetch the next older page.
+        """
+        with self.reader() as conn:
+            rows = conn.execute(
+                _SELECT_STATUS_UPDATES_SQL,
+                (job_id, _MAX_ROWID if before_id is None else before_id, limit),
+            ).fetchall()
             return [self.dict_from_row(row) for row in rows]
 
     # ==================== COMPONENT OPERATIONS ====================
@@ -325,7 +611,7 @@ class Database:
         """Create a new component."""
         component_id = str(uuid.uuid4())
         
-        with self.get_connection() as conn:
+        with self.writer() as conn:
             conn.execute("""
                 INSERT INTO components (id, job_id, name, path, component_type, language)
                 VALUES (?, ?, ?, ?, ?, ?)
@@ -333,11 +619,47 @@ class Database:
         
         return component_id
     
-    def get_components(self, job_id: str) -> List[Dict]:
-        """Get all components for a job."""
-        with self.get_connection() as conn:
+    def bulk_create_components(
+        self,
+        job_id: str,
+        components: List[Dict[str, Any]],
+        include_files: bool = False
+    ) -> List[str]:
+        """
+        Create many components in one transaction, including their file and line counts.
+        With include_files, each component's file records are inserted in the same transaction.
+        """
+        component_ids = _mint_ids(len(components))
+        
+        with self.writer() as conn:
+            conn.executemany("""
+                INSERT INTO components (id, job_id, name, path, component_type, language, file_count, line_count)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (
+                    component_id, job_id, comp["name"], comp["path"], comp.get("component_type"),
+                    comp.get("language"), len(comp.get("files", [])), comp.get("line_count", 0),
+                )
+                for component_id, comp in zip(component_ids, components)
+            ])
+            if include_files:
+                file_entries = [
+                    (component_id, file_info)
+                    for component_id, comp in zip(component_ids, components)
+                    for file_info in comp.get("files", [])
+                ]
+                conn.executemany(_INSERT_FILE_SQL, [
+                    self._file_row(file_id, component_id, job_id, file_info)
+                    for file_id, (component_id, file_info) in zip(_mint_ids(len(file_entries)), file_entries)
+                ])
+        
+        return component_ids
+    
+    def get_components(self, job_id: str, columns: Sequence[str] = ("*",)) -> List[Dict]:
+        """Get all components for a job, optionally only the given column expressions."""
+        with self.reader() as conn:
             rows = conn.execute(
-                "SELECT * FROM components WHERE job_id = ? ORDER BY path",
+                f"SELECT {', '.join(columns)} FROM components WHERE job_id = ? ORDER BY path",
                 (job_id,)
             ).fetchall()
             return [self.dict_from_row(row) for row in rows]
@@ -352,7 +674,7 @@ class Database:
         health_score: Optional[int] = None
     ):
         """Update component details."""
-        with self.get_connection() as conn:
+        with self.writer() as conn:
             conn.execute(
                 """
                 UPDATE components
@@ -381,7 +703,7 @@ class Database:
         """Create a new file record."""
         file_id = str(uuid.uuid4())
         
-        with self.get_connection() as conn:
+        with self.writer() as conn:
             conn.execute("""
                 INSERT INTO files (id, component_id, job_id, path, language, line_count, size_bytes)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
@@ -389,9 +711,27 @@ class Database:
         
         return file_id
     
+    def bulk_create_files(self, component_id: str, job_id: str, files: List[Dict[str, Any]]) -> int:
+        """Create file records for a component in one transaction."""
+        with self.writer() as conn:
+            conn.executemany(_INSERT_FILE_SQL, [
+                self._file_row(file_id, component_id, job_id, file_info)
+                for file_id, file_info in zip(_mint_ids(len(files)), files)
+            ])
+        
+        return len(files)
+    
+    @staticmethod
+    def _file_row(file_id: str, component_id: str, job_id: str, file_info: Dict[str, Any]) -> tuple:
+        """Build the _INSERT_FILE_SQL parameters for one file entry."""
+        return (
+            file_id, component_id, job_id, file_info["path"], file_info.get("language"),
+            file_info.get("line_count", 0), file_info.get("size_bytes", 0),
+        )
+    
     def get_files(self, component_id: str) -> List[Dict]:
         """Get all files for a component."""
-        with self.get_connection() as conn:
+        with self.reader() as conn:
             rows = conn.execute(
                 "SELECT * FROM files WHERE component_id = ? ORDER BY path",
                 (component_id,)
@@ -405,7 +745,7 @@ class Database:
         analysis_summary: Optional[str] = None
     ):
         """Update file analysis status."""
-        with self.get_connection() as conn:
+        with self.writer() as conn:
             conn.execute(
                 """
                 UPDATE files
@@ -446,7 +786,7 @@ class Database:
             fingerprint = f"{scanner}:{rule_id or title}:{file_path}:{line_start}"
         
         try:
-            with self.get_connection() as conn:
+            with self.writer() as conn:
                 conn.execute("""
                     INSERT INTO findings (
                         id, job_id, component_id, file_id, scanner, rule_id,
@@ -465,15 +805,49 @@ class Database:
             # Duplicate fingerprint - skip
             return None
     
+    def bulk_create_findings(self, job_id: str, findings: List[Dict[str, Any]]) -> int:
+        """
+        Create many findings in one transaction.
+        Each dict takes the create_finding keyword arguments; rows that would
+        raise IntegrityError there (duplicates, invalid severity) are skipped.
+        Returns the number of findings inserted.
+        """
+        if not findings:
+            return 0
+        
+        rows = []
+        for finding_id, finding in zip(_mint_ids(len(findings)), findings):
+            fingerprint = finding.get("fingerprint") or (
+                f"{finding['scanner']}:{finding.get('rule_id') or finding['title']}:"
+                f"{finding.get('file_path')}:{finding.get('line_start')}"
+            )
+            rows.append((
+                finding_id, job_id, finding.get("component_id"), finding.get("file_id"),
+                finding["scanner"], finding.get("rule_id"), finding["severity"], finding.get("category"),
+                finding["title"], finding.get("description"), finding.get("file_path"),
+                finding.get("line_start"), finding.get("line_end"), finding.get("code_snippet"),
+                finding.get("suggestion"), finding.get("llm_explanation"), fingerprint,
+            ))
+        
+        inserted = 0
+        # Commit in bounded batches so a huge scanner run never holds the write lock for long
+        for start in range(0, len(rows), FINDINGS_BATCH_SIZE):
+            with self.writer() as conn:
+                before = conn.total_changes
+                conn.executemany(_INSERT_FINDING_SQL, rows[start:start + FINDINGS_BATCH_SIZE])
+                inserted += conn.total_changes - before
+        return inserted
+    
     def get_findings(
         self,
         job_id: str,
         severity: Optional[str] = None,
         scanner: Optional[str] = None,
-        component_id: Optional[str] = None
+        component_id: Optional[str] = None,
+        columns: Sequence[str] = ("*",)
     ) -> List[Dict]:
-        """Get findings with optional filtering."""
-        query = "SELECT * FROM findings WHERE job_id = ?"
+        """Get findings with optional filtering, optionally only the given column expressions."""
+        query = f"SELECT {', '.join(columns)} FROM findings WHERE job_id = ?"
         params = [job_id]
         
         if severity:
@@ -488,13 +862,13 @@ class Database:
         
         query += " ORDER BY CASE severity WHEN 'critical' THEN 1 WHEN 'high' THEN 2 WHEN 'medium' THEN 3 WHEN 'low' THEN 4 ELSE 5 END, created_at"
         
-        with self.get_connection() as conn:
+        with self.reader() as conn:
             rows = conn.execute(query, params).fetchall()
             return [self.dict_from_row(row) for row in rows]
     
     def get_findings_summary(self, job_id: str) -> Dict[str, int]:
         """Get findings count by severity."""
-        with self.get_connection() as conn:
+        with self.reader() as conn:
             rows = conn.execute("""
                 SELECT severity, COUNT(*) as count
                 FROM findings WHERE job_id = ?
@@ -507,6 +881,27 @@ class Database:
                 summary["total"] += row["count"]
             return summary
 
+    def get_findings_summary_bulk(self, job_ids: List[str]) -> Dict[str, Dict[str, int]]:
+        """Get findings count by severity for several jobs in one query."""
+        summaries = {
+            job_id: {"critical": 0, "high": 0, "medium": 0, "low": 0, "info": 0, "total": 0}
+            for job_id in job_ids
+        }
+        if not summaries:
+            return summaries
+
+        placeholders = ",".join("?" * len(summaries))
+        with self.reader() as conn:
+            rows = conn.execute(f"""
+                SELECT f.job_id, {_FINDINGS_SUMMARY_JSON} AS summary
+                FROM findings f WHERE f.job_id IN ({placeholders})
+                GROUP BY f.job_id
+            """, tuple(summaries)).fetchall()
+
+            for row in rows:
+                summaries[row["job_id"]] = orjson.loads(row["summary"])
+            return summaries
+
     # ==================== SCANNER RESULTS ====================
     
     def create_scanner_result(
@@ -518,11 +913,11 @@ class Database:
         """Create a scanner result record."""
         result_id = str(uuid.uuid4())
         
-        with self.get_connection() as conn:
-            conn.execute("""
+        with self.writer() as conn:
+            conn.execute(f"""
                 INSERT INTO scanner_results (id, job_id, component_id, scanner, status, started_at)
-                VALUES (?, ?, ?, ?, 'running', ?)
-            """, (result_id, job_id, component_id, scanner, datetime.utcnow().isoformat()))
+                VALUES (?, ?, ?, ?, 'running', {_SQL_NOW})
+            """, (result_id, job_id, component_id, scanner))
         
         return result_id
     
@@ -535,12 +930,12 @@ class Database:
         error_message: Optional[str] = None
     ):
         """Update scanner result."""
-        with self.get_connection() as conn:
-            conn.execute("""
+        with self.writer() as conn:
+            conn.execute(f"""
                 UPDATE scanner_results
-                SET status = ?, completed_at = ?, findings_count = ?, raw_output = ?, error_message = ?
+                SET status = ?, completed_at = {_SQL_NOW}, findings_count = ?, raw_output = ?, error_message = ?
                 WHERE id = ?
-            """, (status, datetime.utcnow().isoformat(), findings_count, raw_output, error_message, result_id))
+            """, (status, findings_count, raw_output, error_message, result_id))
 
     # ==================== REPORTS ====================
     
@@ -554,7 +949,7 @@ class Database:
         """Create a report."""
         report_id = str(uuid.uuid4())
         
-        with self.get_connection() as conn:
+        with self.writer() as conn:
             conn.execute("""
                 INSERT INTO reports (id, job_id, report_type, format, content)
                 VALUES (?, ?, ?, ?, ?)
@@ -564,48 +959,74 @@ class Database:
     
     def get_report(self, job_id: str, report_type: str = "full") -> Optional[Dict]:
         """Get report for a job."""
-        with self.get_connection() as conn:
+        with self.reader() as conn:
             row = conn.execute(
                 "SELECT * FROM reports WHERE job_id = ? AND report_type = ?",
                 (job_id, report_type)
             ).fetchone()
             return self.dict_from_row(row)
 
+    # ==================== LLM CACHE ====================
+    
+    def get_cached_analysis(self, content_hash: str, model: str) -> Optional[Dict[str, Any]]:
+        """Get a cached LLM file analysis for identical content and model."""
+        with self.reader() as conn:
+            row = conn.execute(
+                "SELECT analysis FROM llm_file_cache WHERE content_hash = ? AND model = ?",
+                (content_hash, model)
+            ).fetchone()
+            return orjson.loads(row["analysis"]) if row else None
+    
+    def bulk_cache_analyses(self, model: str, analyses: Dict[str, Dict[str, Any]]):
+        """Store LLM file analyses keyed by content hash in one transaction."""
+        if not analyses:
+            return
+        
+        with self.writer() as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO llm_file_cache (content_hash, model, analysis)
+                VALUES (?, ?, ?)
+            """, [
+                (content_hash, model, json.dumps(analysis))
+                for content_hash, analysis in analyses.items()
+            ])
+
     # ==================== STATS ====================
     
     def get_stats(self) -> Dict[str, Any]:
-        """Get overall statistics."""
-        with self.get_connection() as conn:
-            stats = {}
-            
-            # Job counts
-            row = conn.execute("""
-                SELECT 
-                    COUNT(*) as total,
-                    COALESCE(SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END), 0) as completed,
-                    COALESCE(SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END), 0) as failed,
-                    COALESCE(SUM(CASE WHEN status IN ('pending', 'cloning', 'scanning', 'analyzing') THEN 1 ELSE 0 END), 0) as running
-                FROM jobs
-            """).fetchone()
-            stats['jobs'] = dict(row)
-            
-            # Findings counts
-            row = conn.execute("""
-                SELECT 
-                    COUNT(*) as total,
-                    COALESCE(SUM(CASE WHEN severity = 'critical' THEN 1 ELSE 0 END), 0) as critical,
-                    COALESCE(SUM(CASE WHEN severity = 'high' THEN 1 ELSE 0 END), 0) as high,
-                    COALESCE(SUM(CASE WHEN severity = 'medium' THEN 1 ELSE 0 END), 0) as medium,
-                    COALESCE(SUM(CASE WHEN severity = 'low' THEN 1 ELSE 0 END), 0) as low
-                FROM findings
-            """).fetchone()
-            stats['findings'] = dict(row)
-            
-            return stats
+        """Get overall statistics (cached briefly, and dropped on local writes)."""
+        cached = self._stats_cache
+        if cached and cached[0] == self._write_generation and time.monotonic() < cached[1]:
+            return {key: dict(counts) for key, counts in cached[2].items()}
+
+        generation = self._write_generation
+        with self.reader() as conn:
+            # GROUP BY over idx_jobs_status / idx_findings_severity scans only the index
+            job_counts = dict(conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall())
+            severity_counts = dict(conn.execute(
+                "SELECT severity, COUNT(*) FROM findings GROUP BY severity"
+            ).fetchall())
+
+        stats = {
+            'jobs': {
+                'total': sum(job_counts.values()),
+                'completed': job_counts.get('completed', 0),
+                'failed': job_counts.get('failed', 0),
+                'running': sum(job_counts.get(status, 0) for status in ('pending', 'cloning', 'scanning', 'analyzing')),
+            },
+            'findings': {
+                'total': sum(severity_counts.values()),
+                **{severity: severity_counts.get(severity, 0) for severity in ('critical', 'high', 'medium', 'low')},
+            },
+        }
+        self._stats_cache = (generation, time.monotonic() + STATS_CACHE_TTL, stats)
+        return {key: dict(counts) for key, counts in stats.items()}
     
     def delete_job(self, job_id: str):
         """Delete a job and all related data."""
-        with self.get_connection() as conn:
+        with self.writer() as conn:
             # Delete all related data in order due to foreign keys
             conn.execute("DELETE FROM status_updates WHERE job_id = ?", (job_id,))
             conn.execute("DELETE FROM reports WHERE job_id = ?", (job_id,))
@@ -618,3 +1039,4 @@ class Database:
 
 # Global database instance
 db = Database()
+atexit.register(db.close)
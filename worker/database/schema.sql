@@ -14,6 +14,7 @@ CREATE TABLE IF NOT EXISTS jobs (
     progress_total INTEGER DEFAULT 100,
     progress_detail TEXT,
     model TEXT NOT NULL,
+    status_rev INTEGER DEFAULT 0,  -- bumped on every status update
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     started_at TIMESTAMP,
     completed_at TIMESTAMP,
@@ -109,14 +110,33 @@ CREATE TABLE IF NOT EXISTS reports (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- LLM file analysis cache - reused across jobs for unchanged file contents
+CREATE TABLE IF NOT EXISTS llm_file_cache (
+    content_hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    analysis TEXT NOT NULL,  -- JSON analysis result
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (content_hash, model)
+);
+
 -- Create indexes for common queries
 CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
 CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs(status, created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_components_job ON components(job_id);
 CREATE INDEX IF NOT EXISTS idx_files_component ON files(component_id);
 CREATE INDEX IF NOT EXISTS idx_files_job ON files(job_id);
 CREATE INDEX IF NOT EXISTS idx_findings_job ON findings(job_id);
+CREATE INDEX IF NOT EXISTS idx_findings_job_severity ON findings(job_id, severity);
+CREATE INDEX IF NOT EXISTS idx_findings_job_scanner ON findings(job_id, scanner);
+CREATE INDEX IF NOT EXISTS idx_findings_job_component ON findings(job_id, component_id);
+-- Matches the severity ordering of get_findings so the index supplies the sort
+CREATE INDEX IF NOT EXISTS idx_findings_job_rank ON findings(
+    job_id,
+    (CASE severity WHEN 'critical' THEN 1 WHEN 'high' THEN 2 WHEN 'medium' THEN 3 WHEN 'low' THEN 4 ELSE 5 END),
+    created_at
+);
 CREATE INDEX IF NOT EXISTS idx_findings_severity ON findings(severity);
 CREATE INDEX IF NOT EXISTS idx_findings_scanner ON findings(scanner);
-CREATE INDEX IF NOT EXISTS idx_status_updates_job ON status_updates(job_id);
+CREATE INDEX IF NOT EXISTS idx_status_updates_job_id ON status_updates(job_id, id DESC);
 CREATE INDEX IF NOT EXISTS idx_scanner_results_job ON scanner_results(job_id);
@@ -0,0 +1,45 @@
+"""
+Bull's Eye - Job Status Events
+Publishes job status changes over Redis Pub/Sub so API streams are pushed, not polled
+"""
+
+import json
+import time
+from typing import Any, Dict, Optional
+
+import redis
+import structlog
+
+from config import settings
+
+logger = structlog.get_logger()
+
+# Seconds to stop publishing after Redis is unreachable, so status writes stay fast
+PUBLISH_RETRY_DELAY = 30.0
+
+_client: Optional[redis.Redis] = None
+_retry_at = 0.0
+
+
+def job_channel(job_id: str) -> str:
+    """Pub/Sub channel carrying status updates for one job."""
+    return f"job:{job_id}"
+
+
+def publish_job_status(job_id: str, payload: Dict[str, Any]) -> None:
+    """Publish a status payload for a job; best effort, never raises."""
+    global _client, _retry_at
+
+    if time.monotonic() < _retry_at:
+        return
+    try:
+        if _client is None:
+            _client = redis.Redis.from_url(
+                settings.redis_url,
+                socket_connect_timeout=1,
+                socket_timeout=1,
+            )
+        _client.publish(job_channel(job_id), json.dumps(payload))
+    except redis.RedisError as e:
+        _retry_at = time.monotonic() + PUBLISH_RETRY_DELAY
+        logger.debug("Status event not published", job_id=job_id[:8], error=str(e))
@@ -1,14 +1,14 @@
 """
 Bull's Eye - Ollama Cloud API Client
 Client for interacting with Ollama Cloud API (https://ollama.com/api)
-IMPORTANT: All requests are SEQUENTIAL - no parallel requests allowed
+IMPORTANT: Requests are SEQUENTIAL per API key unless llm_concurrency_per_key is raised
 """
 
 import json
 import time
 import asyncio
 import re
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 import httpx
 import structlog
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
@@ -20,6 +20,9 @@ logger = structlog.get_logger()
 # JSON response helpers
 _JSON_CODE_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
 
+# Largest amount of code sent to the model in one analysis request
+MAX_CODE_LENGTH = 12000
+
 ANALYSIS_SCHEMA_TEMPLATE = """{
     "summary": "Brief 1-2 sentence description of what this file does",
     "purpose": "Main responsibility/purpose of this code",
@@ -98,10 +101,16 @@ def parse_llm_json_response(text: str) -> tuple[Optional[Dict[str, Any]], str]:
     return None, ""
 
 # Per-API-key locks to allow parallelism across keys while keeping each key sequential.
-_ollama_locks: Dict[str, asyncio.Lock] = {}
+# A semaphore binds to the loop it is first contended on, and each Celery task runs
+# its own loop, so slots are stored with their loop and rebuilt when it changes.
+_ollama_slots: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = {}
 _last_request_times: Dict[str, float] = {}
 
 
+class ScreenModelUnavailable(Exception):
+    """The configured screening model cannot be used with this API key."""
+
+
 class OllamaCloudClient:
     """Client for Ollama Cloud API with Bearer token authentication."""
     
@@ -110,6 +119,7 @@ class OllamaCloudClient:
         api_key: Optional[str] = None,
         model: Optional[str] = None,
         timeout: Optional[int] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
     ):
         self.api_url = settings.ollama_api_url
         self.api_key = api_key or settings.ollama_api_key
@@ -117,6 +127,8 @@ class OllamaCloudClient:
         self.timeout = timeout or settings.ollama_timeout
         self.logger = structlog.get_logger().bind(component="ollama_cloud")
         self._lock_key = self.api_key or "default"
+        # Shared connection pool, owned by the caller; None opens a client per request
+        self._http_client = http_client
         
         if not self.api_key:
             raise ValueError("OLLAMA_API_KEY is required for Ollama Cloud API")
@@ -128,23 +140,24 @@ class OllamaCloudClient:
             "Content-Type": "application/json",
         }
 
-    def _get_lock(self) -> asyncio.Lock:
-        """Get per-key lock to allow parallelism across API keys."""
-        lock = _ollama_locks.get(self._lock_key)
-        if lock is None:
-            lock = asyncio.Lock()
-            _ollama_locks[self._lock_key] = lock
-        return lock
+    def _get_lock(self) -> asyncio.Semaphore:
+        """Get per-key request slots to allow parallelism across API keys."""
+        loop = asyncio.get_running_loop()
+        entry = _ollama_slots.get(self._lock_key)
+        if entry is None or entry[0] is not loop:
+            entry = (loop, asyncio.Semaphore(max(1, settings.llm_concurrency_per_key)))
+            _ollama_slots[self._lock_key] = entry
+        return entry[1]
     
     async def _wait_for_rate_limit(self):
-        """Ensure minimum delay between requests (sequential only)."""
-        last_request_time = _last_request_times.get(self._lock_key, 0.0)
-        elapsed = time.time() - last_request_time
-        min_delay = settings.llm_request_delay
+        """Ensure minimum delay between request starts on this key."""
+        now = time.time()
+        # Reserve the next start time before sleeping so concurrent slots stay spaced out
+        start_at = max(now, _last_request_times.get(self._lock_key, 0.0) + settings.llm_request_delay)
+        _last_request_times[self._lock_key] = start_at
         
-        if elapsed < min_delay:
-            await asyncio.sleep(min_delay - elapsed)
-        _last_request_times[self._lock_key] = time.time()
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
     
     async def _chat_once(
         self,
@@ -168,24 +181,32 @@ class OllamaCloudClient:
                 messages_count=len(messages)
             )
 
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
+            if self._http_client is not None:
+                response = await self._http_client.post(
                     self.api_url,
                     headers=self._get_headers(),
                     json=payload,
+                    timeout=self.timeout,
                 )
-                response.raise_for_status()
-                result = response.json()
-
-                # Extract content from response
-                content = result.get("message", {}).get("content", "")
+            else:
+                async with httpx.AsyncClient(timeout=self.timeout) as client:
+                    response = await client.post(
+                        self.api_url,
+                        headers=self._get_headers(),
+                        json=payload,
+                    )
+            response.raise_for_status()
+            result = response.json()
+
+            # Extract content from response
+            content = result.get("message", {}).get("content", "")
 
-                self.logger.debug(
-                    "Chat response received",
-                    response_length=len(content)
-                )
+            self.logger.debug(
+                "Chat response received",
+                response_length=len(content)
+            )
 
-                return content
+            return content
 
     @retry(
         stop=stop_after_attempt(2),
@@ -257,9 +278,8 @@ class OllamaCloudClient:
         Analyze code and return structured results.
         """
         # Truncate very long files
-        max_code_length = 12000
-        if len(code) > max_code_length:
-            code = code[:max_code_length] + "\n\n... [TRUNCATED - file too large] ..."
+        if len(code) > MAX_CODE_LENGTH:
+            code = code[:MAX_CODE_LENGTH] + "\n\n... [TRUNCATED - file too large] ..."
         
         system_message = {
             "role": "system",
@@ -324,6 +344,148 @@ Respond with JSON in this exact format:
 
         return self._normalize_analysis_result(parsed)
 
+    async def analyze_code_batch(self, items: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Analyze several files, packing small ones into shared requests.
+        Each item has code, file_path and language; results keep item order.
+        Files missing from a batched response are re-analyzed on their own.
+        """
+        groups: List[List[int]] = []
+        group: List[int] = []
+        group_length = 0
+        for idx, item in enumerate(items):
+            size = len(item["code"])
+            if group and group_length + size > MAX_CODE_LENGTH:
+                groups.append(group)
+                group, group_length = [], 0
+            group.append(idx)
+            group_length += size
+        if group:
+            groups.append(group)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        for group in groups:
+            if len(group) > 1:
+                batched = await self._analyze_code_group([items[idx] for idx in group])
+                for idx in group:
+                    results[idx] = batched.get(items[idx]["file_path"])
+            for idx in group:
+                if results[idx] is None:
+                    results[idx] = await self.analyze_code(
+                        code=items[idx]["code"],
+                        file_path=items[idx]["file_path"],
+                        language=items[idx]["language"],
+                    )
+        return results
+
+    async def _analyze_code_group(self, items: List[Dict[str, str]]) -> Dict[str, Dict[str, Any]]:
+        """Analyze several small files in one request, keyed by file path."""
+        system_message = {
+            "role": "system",
+            "content": """You are an expert code security analyst and software engineer. 
+Analyze each provided file independently and thoroughly for:
+1. Security vulnerabilities (injection, auth issues, data exposure, etc.)
+2. Code quality issues (complexity, maintainability, error handling)
+3. Performance concerns
+4. Best practice violations
+
+Be specific and actionable. Focus on real issues, not stylistic preferences.
+Always respond with valid JSON."""
+        }
+
+        files_block = "\n\n".join(
+            f"File: `{item['file_path']}` ({item['language']})\n```{item['language']}\n{item['code']}\n```"
+            for item in items
+        )
+        user_message = {
+            "role": "user",
+            "content": f"""Analyze these {len(items)} files.
+
+{files_block}
+
+Respond with JSON of this form, with one entry per file path exactly as given:
+{{
+  "files": {{
+    "path/to/file.ext": {ANALYSIS_SCHEMA_TEMPLATE}
+  }}
+}}"""
+        }
+
+        try:
+            response = await self.chat([system_message, user_message])
+        except Exception as e:
+            self.logger.warning("Batched code analysis failed", files=len(items), error=str(e))
+            return {}
+
+        parsed, _ = parse_llm_json_response(response)
+        per_file = parsed.get("files") if parsed else None
+        if not isinstance(per_file, dict):
+            self.logger.info("Batched analysis response unusable, analyzing files individually", files=len(items))
+            return {}
+
+        return {
+            path: self._normalize_analysis_result(data)
+            for path, data in per_file.items()
+            if isinstance(data, dict)
+        }
+
+    async def screen_code_batch(self, items: List[Dict[str, str]], model: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Quickly screen files with a lighter model, keyed by file path.
+        Each result has suspicious (bool) and summary; files missing from
+        the response are left out so callers treat them as suspicious.
+        """
+        system_message = {
+            "role": "system",
+            "content": """You are a fast first-pass code reviewer.
+For each file decide only whether it may contain a security vulnerability or a significant
+quality problem worth a detailed review. If unsure, mark it suspicious.
+Always respond with valid JSON."""
+        }
+
+        files_block = "\n\n".join(
+            f"File: `{item['file_path']}` ({item['language']})\n```{item['language']}\n{item['code'][:MAX_CODE_LENGTH]}\n```"
+            for item in items
+        )
+        user_message = {
+            "role": "user",
+            "content": f"""Screen these {len(items)} files.
+
+{files_block}
+
+Respond with JSON of this form, with one entry per file path exactly as given:
+{{
+  "files": {{
+    "path/to/file.ext": {{"suspicious": true/false, "summary": "Brief 1 sentence description of the file"}}
+  }}
+}}"""
+        }
+
+        try:
+            # Screening must stay on the light model, never the full analysis fallbacks
+            response = await self.chat(
+                [system_message, user_message], temperature=0.0, model=model, allow_fallback=False
+            )
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in (401, 404):
+                raise ScreenModelUnavailable(model) from e
+            self.logger.warning("Code screening failed", files=len(items), error=str(e))
+            return {}
+        except Exception as e:
+            self.logger.warning("Code screening failed", files=len(items), error=str(e))
+            return {}
+
+        parsed, _ = parse_llm_json_response(response)
+        per_file = parsed.get("files") if parsed else None
+        if not isinstance(per_file, dict):
+            return {}
+
+        return {
+            path: {"suspicious": data.get("suspicious") is not False, "summary": str(data.get("summary", ""))}
+            for path, data in per_file.items()
+            if isinstance(data, dict)
+        }
+
     async def _repair_json_response(
         self,
         response: str,
@@ -653,6 +815,7 @@ The analysis of {job_name} has identified {total} security and quality findings
 def get_ollama_client(
     model: Optional[str] = None,
     api_key: Optional[str] = None,
+    http_client: Optional[httpx.AsyncClient] = None,
 ) -> OllamaCloudClient:
     """Get an Ollama Cloud client instance."""
-    return OllamaCloudClient(api_key=api_key, model=model)
+    return OllamaCloudClient(api_key=api_key, model=model, http_client=http_client)
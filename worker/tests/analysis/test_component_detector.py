@@ -0,0 +1,181 @@
+from pathlib import Path
+
+from analysis.component_detector import ComponentDetector
+
+
+def _write(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def test_detect_components_uses_single_walk(tmp_path, monkeypatch):
+    _write(tmp_path / "src" / "api" / "main.py", "import os\nprint('hi')\n")
+    _write(tmp_path / "src" / "api" / "routes" / "users.py", "def users():\n    return []\n")
+    _write(tmp_path / "src" / "web" / "index.ts", "export const x = 1;\n")
+    _write(tmp_path / "src" / "web" / "node_modules" / "dep" / "index.js", "module.exports = 1;\n")
+    _write(tmp_path / "README.md", "# readme\n")
+
+    walks = []
+    real_iter = ComponentDetector._iter_code_files
+
+    def counting_iter(self, root):
+        walks.append(root)
+        return real_iter(self, root)
+
+    monkeypatch.setattr(ComponentDetector, "_iter_code_files", counting_iter)
+
+    detector = ComponentDetector(tmp_path)
+    components = {c["name"]: c for c in detector.detect_components()}
+
+    assert len(walks) == 1
+    assert set(components) == {"api", "web"}
+
+    api = components["api"]
+    assert api["file_count"] == 2
+    assert api["language"] == "python"
+    assert api["line_count"] == 4
+    assert {f["path"] for f in api["files"]} == {
+        str(Path("src/api/main.py")),
+        str(Path("src/api/routes/users.py")),
+    }
+
+    assert all(f["llm_eligible"] for f in api["files"])
+
+    web = components["web"]
+    assert web["file_count"] == 1
+    assert web["language"] == "typescript"
+
+
+def test_detect_components_falls_back_to_repo_root(tmp_path):
+    _write(tmp_path / "app.py", "print('hello')\n")
+
+    components = ComponentDetector(tmp_path).detect_components()
+
+    assert len(components) == 1
+    assert components[0]["name"] == tmp_path.name
+    assert components[0]["files"][0]["path"] == "app.py"
+
+
+def test_count_lines_matches_line_iteration(tmp_path):
+    detector = ComponentDetector(tmp_path)
+    small = tmp_path / "small.py"
+    small.write_bytes(b"a\nb\nc")
+    large = tmp_path / "large.py"
+    large.write_bytes(b"x = 1\n" * 20000)
+    empty = tmp_path / "empty.py"
+    empty.write_bytes(b"")
+
+    for path in (small, large, empty):
+        with open(path, "rb") as fh:
+            expected = sum(1 for _ in fh)
+        assert detector._count_lines(path, path.stat().st_size) == expected
+
+
+def test_determine_component_type_marker_priority(tmp_path):
+    detector = ComponentDetector(tmp_path)
+
+    def files(*names):
+        return [{"path": f"pkg/{name}"} for name in names]
+
+    assert detector._determine_component_type(Path("src/routes"), files("a.py")) == "api"
+    assert detector._determine_component_type(Path("pkg"), files("__init__.py", "main.py")) == "service"
+    assert detector._determine_component_type(Path("pkg"), files("index.ts")) == "service"
+    assert detector._determine_component_type(Path("pkg"), files("test_a.py", "settings.py")) == "config"
+    assert detector._determine_component_type(Path("pkg"), files("user.spec.ts")) == "test"
+    assert detector._determine_component_type(Path("pkg"), files("plain.py")) == "module"
+
+
+def test_path_helpers_match_pathlib():
+    from analysis.component_detector import _basename, _ext
+
+    for name in ("a.PY", "src/main.go", "archive.tar.gz", "Makefile", ".env", "dir.d/file", "x."):
+        assert _ext(name) == Path(name).suffix.lower()
+        assert _basename(name) == Path(name).name
+
+
+def test_every_file_is_measured_past_component_cap(tmp_path, monkeypatch):
+    from config import settings
+
+    monkeypatch.setattr(settings, "max_files_per_component", 2)
+    for name in ("a", "b", "c", "d"):
+        _write(tmp_path / "src" / "api" / f"{name}.py", "x = 1\n" * 10)
+
+    measured = []
+    real_measure = ComponentDetector._measure_file
+
+    def counting_measure(self, entry):
+        measured.append(entry["path"])
+        return real_measure(self, entry)
+
+    monkeypatch.setattr(ComponentDetector, "_measure_file", counting_measure)
+
+    (component,) = ComponentDetector(tmp_path).detect_components()
+
+    assert len(measured) == 4
+    assert component["file_count"] == 4
+    assert component["line_count"] == 40
+
+
+def test_get_file_content_skips_files_over_size_limit(tmp_path, monkeypatch):
+    from config import settings
+
+    monkeypatch.setattr(settings, "max_file_size_kb", 1)
+    (tmp_path / "small.py").write_text("x = 1\n")
+    (tmp_path / "big.py").write_text("x" * 2048)
+
+    detector = ComponentDetector(tmp_path)
+
+    assert detector.get_file_content("small.py") == "x = 1\n"
+    assert detector.get_file_content("big.py") is None
+    assert detector.get_file_content("missing.py") is None
+
+
+def test_detect_components_reuses_one_measuring_pool(tmp_path, monkeypatch):
+    from analysis import component_detector
+
+    _write(tmp_path / "src" / "api" / "main.py", "print('hi')\n")
+    _write(tmp_path / "src" / "web" / "app.py", "print('hi')\n")
+    _write(tmp_path / "src" / "cli" / "run.py", "print('hi')\n")
+
+    pools = []
+    real_pool = component_detector.ThreadPoolExecutor
+
+    def counting_pool(*args, **kwargs):
+        pools.append(kwargs)
+        return real_pool(*args, **kwargs)
+
+    monkeypatch.setattr(component_detector, "ThreadPoolExecutor", counting_pool)
+
+    components = ComponentDetector(tmp_path).detect_components()
+
+    assert len(components) == 3
+    assert len(pools) == 1
+
+
+def test_symlinked_files_are_counted_but_symlinked_dirs_are_not_walked(tmp_path):
+    _write(tmp_path / "shared" / "util.py", "def util():\n    return 1\n")
+    _write(tmp_path / "app" / "main.py", "print('hi')\n")
+    (tmp_path / "app" / "util.py").symlink_to(tmp_path / "shared" / "util.py")
+    (tmp_path / "app" / "shared").symlink_to(tmp_path / "shared", target_is_directory=True)
+
+    components = {c["name"]: c for c in ComponentDetector(tmp_path).detect_components()}
+
+    app = components["app"]
+    assert {f["path"] for f in app["files"]} == {
+        str(Path("app/main.py")),
+        str(Path("app/util.py")),
+    }
+    assert app["line_count"] == 3
+
+
+def test_symlinked_candidate_directory_is_still_a_component(tmp_path):
+    _write(tmp_path / "shared" / "util.py", "def util():\n    return 1\n")
+    _write(tmp_path / "src" / "api" / "main.py", "print('hi')\n")
+    (tmp_path / "src" / "foo").symlink_to(tmp_path / "shared", target_is_directory=True)
+
+    components = {c["name"]: c for c in ComponentDetector(tmp_path).detect_components()}
+
+    assert set(components) == {"api", "foo"}
+    foo = components["foo"]
+    assert [f["path"] for f in foo["files"]] == [str(Path("src/foo/util.py"))]
+    assert foo["line_count"] == 2
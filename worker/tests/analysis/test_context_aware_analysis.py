@@ -0,0 +1,167 @@
+import asyncio
+
+from analysis.context_aware_analysis import ContextAwareAnalyzer
+
+
+def test_extract_imports_python():
+    analyzer = ContextAwareAnalyzer(ollama_client=None)
+    content = "import os\nfrom pathlib import Path\n\nx = 'import nothing'\n"
+
+    imports = analyzer._extract_imports(content, "python")
+
+    assert imports == ["pathlib", "os"]
+
+
+def test_extract_imports_javascript_and_typescript_share_patterns():
+    analyzer = ContextAwareAnalyzer(ollama_client=None)
+    content = "import { a } from './a';\nconst b = require(\"b\");\n"
+
+    assert analyzer._extract_imports(content, "javascript") == ["./a", "b"]
+    assert analyzer._extract_imports(content, "typescript") == ["./a", "b"]
+
+
+def test_extract_imports_unknown_language():
+    analyzer = ContextAwareAnalyzer(ollama_client=None)
+
+    assert analyzer._extract_imports("import os", "ruby") == []
+
+
+def test_extract_imports_go_ignores_string_literals():
+    analyzer = ContextAwareAnalyzer(ollama_client=None)
+    content = '''package main
+
+import "fmt"
+
+import (
+    "net/http"
+    log "github.com/sirupsen/logrus"
+)
+
+func main() {
+    fmt.Println("hello world")
+    http.Get("https://example.com")
+}
+'''
+
+    imports = analyzer._extract_imports(content, "go")
+
+    assert imports == ["fmt", "net/http", "github.com/sirupsen/logrus"]
+
+
+def test_get_related_files_uses_reverse_index():
+    analyzer = ContextAwareAnalyzer(ollama_client=None)
+    analyzer.context.project_structure = {
+        "components": {
+            "api": {"files": ["api/main.py", "api/routes.py"]},
+            "core": {"files": ["core/helpers.py", "core/__init__.py"]},
+        }
+    }
+    analyzer.context.import_graph = {
+        "api/main.py": ["core.helpers", "os"],
+        "api/routes.py": ["core"],
+        "core/helpers.py": [],
+    }
+    analyzer._build_file_indexes()
+
+    assert set(analyzer._get_related_files("core/helpers.py")) == {
+        "api/main.py",
+        "core/__init__.py",
+    }
+    assert set(analyzer._get_related_files("core/__init__.py")) == {
+        "api/routes.py",
+        "core/helpers.py",
+    }
+    assert set(analyzer._get_related_files("api/main.py")) == {
+        "core.helpers",
+        "os",
+        "api/routes.py",
+    }
+
+
+def test_get_related_files_resolves_go_packages_by_directory():
+    analyzer = ContextAwareAnalyzer(ollama_client=None)
+    analyzer.context.project_structure = {"components": {}}
+    analyzer.context.import_graph = {
+        "cmd/server/main.go": ["fmt", "github.com/acme/app/internal/auth"],
+        "internal/auth/token.go": [],
+        "internal/auth/session.go": [],
+    }
+    analyzer._build_file_indexes()
+
+    assert analyzer._get_related_files("internal/auth/token.go") == ["cmd/server/main.go"]
+    assert analyzer._get_related_files("internal/auth/session.go") == ["cmd/server/main.go"]
+
+
+def test_get_related_files_resolves_js_directory_imports_to_index():
+    analyzer = ContextAwareAnalyzer(ollama_client=None)
+    analyzer.context.project_structure = {"components": {}}
+    analyzer.context.import_graph = {
+        "src/app.ts": ["./utils"],
+        "src/page.ts": ["./utils/index"],
+        "src/utils/index.ts": [],
+    }
+    analyzer._build_file_indexes()
+
+    assert set(analyzer._get_related_files("src/utils/index.ts")) == {"src/app.ts", "src/page.ts"}
+
+
+def test_get_file_content_caches_and_evicts(tmp_path):
+    (tmp_path / "a.py").write_text("a" * 10)
+    (tmp_path / "b.py").write_text("b" * 10)
+    analyzer = ContextAwareAnalyzer(ollama_client=None, repo_path=tmp_path)
+    analyzer._content_cache_budget = 15
+
+    assert analyzer._get_file_content("a.py") == "a" * 10
+    (tmp_path / "a.py").write_text("changed")
+    assert analyzer._get_file_content("a.py") == "a" * 10
+
+    assert analyzer._get_file_content("b.py") == "b" * 10
+    assert list(analyzer._content_cache) == ["b.py"]
+    assert analyzer._get_file_content("a.py") == "changed"
+    assert analyzer._get_file_content("missing.py") is None
+
+
+def test_file_import_context_is_limited_to_neighbors():
+    analyzer = ContextAwareAnalyzer(ollama_client=None)
+    analyzer.context.project_structure = {"components": {}}
+    analyzer.context.import_graph = {
+        "api/main.py": ["helpers"],
+        "api/other.py": ["requests"],
+        "core/helpers.py": ["json"],
+    }
+    analyzer._build_file_indexes()
+
+    assert analyzer._file_import_context("core/helpers.py") == {
+        "imports": ["json"],
+        "imported_by": ["api/main.py"],
+    }
+
+
+def test_extract_import_graph_reads_files_concurrently(tmp_path):
+    (tmp_path / "api").mkdir()
+    (tmp_path / "api" / "main.py").write_text("import os\nfrom core import helpers\n")
+    (tmp_path / "api" / "empty.py").write_text("")
+    analyzer = ContextAwareAnalyzer(ollama_client=None, repo_path=tmp_path)
+    components = [{
+        "name": "api",
+        "files": [
+            {"path": "api/main.py", "language": "python"},
+            {"path": "api/empty.py", "language": "python"},
+            {"path": "api/missing.py", "language": "python"},
+        ],
+    }]
+
+    graph = asyncio.run(analyzer._extract_import_graph(components))
+
+    assert set(graph) == {"api/main.py"}
+    assert set(graph["api/main.py"]) == {"os", "core"}
+    assert "api/main.py" in analyzer._content_cache
+
+
+def test_parse_analysis_response_handles_bare_and_fenced_json():
+    analyzer = ContextAwareAnalyzer(ollama_client=None)
+
+    assert analyzer._parse_analysis_response(' {"summary": "ok"}\n') == {"summary": "ok"}
+    fenced = 'Here you go:\n```json\n{"summary": "fenced"}\n```'
+    assert analyzer._parse_analysis_response(fenced) == {"summary": "fenced"}
+    assert analyzer._parse_analysis_response("{not json}")["error"] == "JSON parsing failed"
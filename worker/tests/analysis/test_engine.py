@@ -0,0 +1,682 @@
+import asyncio
+
+import pytest
+
+from analysis import engine as engine_module
+from analysis.engine import AnalysisEngine
+from database import db
+
+
+class FakeScanner:
+    def __init__(self, name, findings=None, error=None, delay=0.0):
+        self.name = name
+        self.findings = findings or []
+        self.error = error
+        self.delay = delay
+
+    def get_tool_name(self):
+        return self.name
+
+    async def scan(self, target_path, job_id, component_id=None):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.findings
+
+
+def _finding(title, line):
+    return {"severity": "high", "title": title, "file_path": "app.py", "line_start": line}
+
+
+def test_universal_scanners_run_concurrently(tmp_path, monkeypatch):
+    job_id = db.create_job("https://example.com/repo.git", "main", "model")
+    scanners = [
+        FakeScanner("slow", [_finding("a", 1)], delay=0.05),
+        FakeScanner("fast", [_finding("b", 2), _finding("c", 3)]),
+        FakeScanner("broken", error=RuntimeError("boom")),
+    ]
+    monkeypatch.setattr(engine_module, "get_universal_scanners", lambda path: scanners)
+
+    engine = AnalysisEngine(job_id)
+    engine.repo_path = tmp_path
+
+    findings = asyncio.run(engine._run_universal_scanners())
+
+    assert sorted(f["title"] for f in findings) == ["a", "b", "c"]
+    assert {f["scanner"] for f in db.get_findings(job_id)} == {"slow", "fast"}
+
+
+def test_component_scanners_share_concurrency_cap(tmp_path, monkeypatch):
+    from config import settings
+
+    job_id = db.create_job("https://example.com/repo.git", "main", "model")
+    components = [
+        {"name": name, "path": name, "language": "python", "files": []}
+        for name in ("api", "web", "cli")
+    ]
+    for comp, comp_id in zip(components, db.bulk_create_components(job_id, components)):
+        comp["db_id"] = comp_id
+
+    in_flight = 0
+    peak = 0
+
+    class TrackingScanner(FakeScanner):
+        async def scan(self, target_path, job_id, component_id=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                await asyncio.sleep(0.02)
+                return [_finding(f"{target_path}:{self.name}", 1)]
+            finally:
+                in_flight -= 1
+
+    monkeypatch.setattr(settings, "max_concurrent_scanners", 2)
+    lookups = []
+
+    def scanners_for(language, path):
+        lookups.append(language)
+        return [TrackingScanner("lint"), TrackingScanner("types")]
+
+    monkeypatch.setattr(engine_module, "get_scanner_for_language", scanners_for)
+
+    engine = AnalysisEngine(job_id)
+    engine.repo_path = tmp_path
+
+    findings = asyncio.run(engine._run_component_scanners(components))
+
+    assert len(findings) == 6
+    assert peak == 2
+    assert lookups == ["python"]
+    stored = db.get_findings(job_id)
+    assert {f["component_id"] for f in stored} == {c["db_id"] for c in components}
+
+
+def test_run_never_steps_the_job_stage_backwards(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    (repo / "src" / "api").mkdir(parents=True)
+    (repo / "src" / "api" / "main.py").write_text("print('hi')\n")
+    job_id = db.create_job("https://example.com/repo.git", "main", "model")
+    engine = AnalysisEngine(job_id)
+
+    async def clone(repo_url, branch):
+        return repo
+
+    async def no_op(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(engine, "_init_llm_clients", lambda job: None)
+    monkeypatch.setattr(engine, "_clone_repository", clone)
+    monkeypatch.setattr(engine, "_run_llm_analysis", no_op)
+    monkeypatch.setattr(engine, "_generate_report", no_op)
+    monkeypatch.setattr(engine_module, "_schedule_repo_cleanup", lambda path: None)
+    monkeypatch.setattr(
+        engine_module, "get_universal_scanners", lambda path: [FakeScanner("slow", delay=0.05)]
+    )
+    monkeypatch.setattr(engine_module, "get_scanner_for_language", lambda language, path: [])
+
+    assert asyncio.run(engine.run())
+
+    order = ["cloning", "detecting_components", "scanning", "analyzing", "generating_report", "completed"]
+    stages = [
+        order.index(u["stage"])
+        for u in reversed(db.get_status_updates(job_id))
+        if u["stage"] in order
+    ]
+    assert stages == sorted(stages)
+    assert stages[-1] == order.index("completed")
+
+
+def test_status_updates_within_a_stage_are_coalesced(monkeypatch):
+    from analysis.engine import StatusTracker
+
+    job_id = db.create_job("https://example.com/repo.git", "main", "model")
+    writes = []
+    real_update = db.update_job_status
+
+    def recording_update(job_id, **kwargs):
+        writes.append((kwargs["status"], kwargs["progress"]))
+        return real_update(job_id, **kwargs)
+
+    monkeypatch.setattr(db, "update_job_status", recording_update)
+    status = StatusTracker(job_id)
+
+    status.update("analyzing", "Starting", progress=50)
+    for progress in range(51, 60):
+        status.update("analyzing", "Analyzing code files...", progress=progress)
+    assert writes == [("analyzing", 50)]
+
+    status.flush()
+    assert writes == [("analyzing", 50), ("analyzing", 59)]
+    assert db.get_job(job_id)["progress"] == 59
+
+    status.update("analyzing", "Analyzing code files...", progress=60)
+    status.update("completed", "Done", progress=100)
+    status.flush()
+    assert writes[-1] == ("completed", 100)
+    assert db.get_job(job_id)["status"] == "completed"
+
+
+class FakeLLMClient:
+    def __init__(self):
+        self.analyzed = []
+        self.batches = []
+
+    async def filter_security_irrelevant_files(self, file_paths):
+        return []
+
+    async def analyze_code(self, code, file_path, language):
+        self.analyzed.append(file_path)
+        return {
+            "summary": f"summary of {file_path}",
+            "security_issues": [{"severity": "high", "title": f"issue in {file_path}"}],
+            "quality_issues": [],
+        }
+
+    async def analyze_code_batch(self, items):
+        self.batches.append([item["file_path"] for item in items])
+        return [await self.analyze_code(**item) for item in items]
+
+    async def summarize_component(self, component_name, component_path, file_summaries, language):
+        return {"summary": f"{len(file_summaries)} files", "health_score": 80}
+
+
+def test_llm_analysis_reads_files_ahead_of_workers(tmp_path):
+    from analysis.component_detector import ComponentDetector
+
+    job_id = db.create_job("https://example.com/repo.git", "main", "model")
+    (tmp_path / "src").mkdir()
+    for name in ("a", "b", "c"):
+        (tmp_path / "src" / f"{name}.py").write_text(f"def {name}():\n    return '{name}' * 40\n" * 2)
+    (tmp_path / "src" / "tiny.py").write_text("x = 1\n")
+    (tmp_path / "src" / "blank.py").write_text("x = 1\n" + " " * 80)
+
+    files = [
+        {
+            "path": f"src/{name}.py",
+            "language": "python",
+            "size_bytes": (tmp_path / "src" / f"{name}.py").stat().st_size,
+            "llm_eligible": True,
+        }
+        for name in ("a", "b", "c", "tiny", "blank")
+    ]
+    components = [{"name": "src", "path": "src", "component_type": "module", "language": "python", "files": files}]
+    components[0]["db_id"] = db.bulk_create_components(job_id, components)[0]
+
+    clients = [FakeLLMClient(), FakeLLMClient()]
+    engine = AnalysisEngine(job_id)
+    engine.repo_path = tmp_path
+    engine.ollama = clients[0]
+    engine.ollama_clients = clients
+
+    asyncio.run(engine._run_llm_analysis(components, ComponentDetector(tmp_path), []))
+
+    analyzed = sorted(path for client in clients for path in client.analyzed)
+    assert analyzed == ["src/a.py", "src/b.py", "src/c.py"]
+    assert len(db.get_findings(job_id, scanner="llm")) == 3
+    assert db.get_components(job_id)[0]["analysis_summary"] == "3 files"
+
+
+def test_unchanged_files_reuse_cached_llm_analysis(tmp_path):
+    from analysis.component_detector import ComponentDetector
+
+    (tmp_path / "svc").mkdir()
+    (tmp_path / "svc" / "cached.py").write_text("def cached_handler(request):\n    return request.args\n" * 3)
+    files = [{"path": "svc/cached.py", "language": "python", "size_bytes": 200, "llm_eligible": True}]
+
+    def run_job():
+        job_id = db.create_job("https://example.com/repo.git", "main", "model")
+        components = [{"name": "svc", "path": "svc", "component_type": "module", "language": "python", "files": files}]
+        components[0]["db_id"] = db.bulk_create_components(job_id, components)[0]
+        client = FakeLLMClient()
+        engine = AnalysisEngine(job_id, model="cache-test-model")
+        engine.ollama = client
+        engine.ollama_clients = [client]
+        asyncio.run(engine._run_llm_analysis(components, ComponentDetector(tmp_path), []))
+        return job_id, client
+
+    first_job, first_client = run_job()
+    second_job, second_client = run_job()
+
+    assert first_client.analyzed == ["svc/cached.py"]
+    assert second_client.analyzed == []
+    assert [f["title"] for f in db.get_findings(second_job, scanner="llm")] == ["issue in svc/cached.py"]
+
+
+def test_failed_cache_lookup_falls_back_to_fresh_analysis(tmp_path, monkeypatch):
+    from analysis.component_detector import ComponentDetector
+
+    def broken_lookup(content_hash, model):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(db, "get_cached_analysis", broken_lookup)
+    (tmp_path / "svc").mkdir()
+    (tmp_path / "svc" / "app.py").write_text("def handler(request):\n    return request.args\n" * 3)
+    files = [{"path": "svc/app.py", "language": "python", "size_bytes": 200, "llm_eligible": True}]
+    job_id = db.create_job("https://example.com/repo.git", "main", "model")
+    components = [{"name": "svc", "path": "svc", "component_type": "module", "language": "python", "files": files}]
+    components[0]["db_id"] = db.bulk_create_components(job_id, components)[0]
+    client = FakeLLMClient()
+    engine = AnalysisEngine(job_id)
+    engine.ollama = client
+    engine.ollama_clients = [client]
+
+    asyncio.run(engine._run_llm_analysis(components, ComponentDetector(tmp_path), []))
+
+    assert client.analyzed == ["svc/app.py"]
+
+
+def test_llm_analysis_fails_when_file_reads_fail(tmp_path):
+    from analysis.component_detector import ComponentDetector
+
+    class BrokenDetector(ComponentDetector):
+        def get_file_content(self, file_path):
+            raise OSError("disk gone")
+
+    (tmp_path / "svc").mkdir()
+    files = [{"path": "svc/app.py", "language": "python", "size_bytes": 200, "llm_eligible": True}]
+    job_id = db.create_job("https://example.com/repo.git", "main", "model")
+    components = [{"name": "svc", "path": "svc", "component_type": "module", "language": "python", "files": files}]
+    components[0]["db_id"] = db.bulk_create_components(job_id, components)[0]
+    engine = AnalysisEngine(job_id)
+    engine.ollama = FakeLLMClient()
+    engine.ollama_clients = [engine.ollama]
+
+    async def run():
+        await asyncio.wait_for(
+            engine._run_llm_analysis(components, BrokenDetector(tmp_path), []), timeout=5
+        )
+
+    with pytest.raises(OSError, match="disk gone"):
+        asyncio.run(run())
+
+
+def test_cancelling_mid_analysis_stops_the_stage(tmp_path, monkeypatch):
+    from analysis.component_detector import ComponentDetector
+    from analysis.engine import AnalysisCancelled
+    from config import settings
+
+    monkeypatch.setattr(settings, "llm_batch_size", 1)
+    monkeypatch.setattr(settings, "llm_concurrency_per_key", 1)
+    (tmp_path / "svc").mkdir()
+    files = []
+    for i in range(20):
+        path = tmp_path / "svc" / f"mod{i}.py"
+        path.write_text(f"def handler_{i}(request):\n    return request.args\n" * 3)
+        files.append({"path": f"svc/mod{i}.py", "language": "python", "size_bytes": 200, "llm_eligible": True})
+    job_id = db.create_job("https://example.com/repo.git", "main", "model")
+    components = [{"name": "svc", "path": "svc", "component_type": "module", "language": "python", "files": files}]
+    components[0]["db_id"] = db.bulk_create_components(job_id, components)[0]
+    engine = AnalysisEngine(job_id)
+
+    class CancellingClient(FakeLLMClient):
+        async def analyze_code_batch(self, items):
+            # The user stops the job while the first batch is in flight,
+            # after the read-ahead has filled the queue
+            await asyncio.sleep(0.05)
+            engine._cancel_event.set()
+            return await super().analyze_code_batch(items)
+
+    engine.ollama = CancellingClient()
+    engine.ollama_clients = [engine.ollama]
+
+    async def run():
+        await asyncio.wait_for(
+            engine._run_llm_analysis(components, ComponentDetector(tmp_path), []), timeout=5
+        )
+
+    with pytest.raises(AnalysisCancelled):
+        asyncio.run(run())
+    assert len(engine.ollama.analyzed) < len(files)
+
+
+def test_component_summary_starts_before_other_files_finish(tmp_path, monkeypatch):
+    from analysis.component_detector import ComponentDetector
+    from config import settings
+
+    monkeypatch.setattr(settings, "llm_batch_size", 1)
+
+    job_id = db.create_job("https://example.com/repo.git", "main", "model")
+    components = []
+    for name, size in (("first", 400), ("second", 100)):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "mod.py").write_text(f"def {name}_handler(request):\n    return request\n" * (size // 40))
+        components.append({
+            "name": name, "path": name, "component_type": "module", "language": "python",
+            "files": [{"path": f"{name}/mod.py", "language": "python", "size_bytes": size, "llm_eligible": True}],
+        })
+    for comp, comp_id in zip(components, db.bulk_create_components(job_id, components)):
+        comp["db_id"] = comp_id
+
+    class OrderedClient(FakeLLMClient):
+        def __init__(self):
+            super().__init__()
+            self.first_summarized = asyncio.Event()
+
+        async def analyze_code(self, code, file_path, language):
+            if file_path.startswith("second/"):
+                await asyncio.wait_for(self.first_summarized.wait(), timeout=1)
+            return await super().analyze_code(code, file_path, language)
+
+        async def summarize_component(self, component_name, component_path, file_summaries, language):
+            if component_name == "first":
+                self.first_summarized.set()
+            return await super().summarize_component(component_name, component_path, file_summaries, language)
+
+    async def run():
+        client = OrderedClient()
+        engine = AnalysisEngine(job_id)
+        engine.ollama = client
+        engine.ollama_clients = [client]
+        await engine._run_llm_analysis(components, ComponentDetector(tmp_path), [])
+        return client
+
+    client = asyncio.run(run())
+
+    assert sorted(client.analyzed) == ["first/mod.py", "second/mod.py"]
+    assert {c["analysis_summary"] for c in db.get_components(job_id)} == {"1 files"}
+
+
+def test_screen_model_clears_files_before_full_analysis(tmp_path, monkeypatch):
+    from analysis.component_detector import ComponentDetector
+    from config import settings
+
+    monkeypatch.setattr(settings, "ollama_screen_model", "small-model")
+    job_id = db.create_job("https://example.com/repo.git", "main", "model")
+    (tmp_path / "svc").mkdir()
+    for name in ("clean", "risky"):
+        (tmp_path / "svc" / f"{name}.py").write_text(f"def {name}_screened(request):\n    return request.body\n" * 3)
+    files = [
+        {"path": f"svc/{name}.py", "language": "python", "size_bytes": 150, "llm_eligible": True}
+        for name in ("clean", "risky")
+    ]
+    components = [{"name": "svc", "path": "svc", "component_type": "module", "language": "python", "files": files}]
+    components[0]["db_id"] = db.bulk_create_components(job_id, components)[0]
+
+    class ScreeningClient(FakeLLMClient):
+        async def screen_code_batch(self, items, model):
+            assert model == "small-model"
+            return {"svc/clean.py": {"suspicious": False, "summary": "harmless"}}
+
+    client = ScreeningClient()
+    engine = AnalysisEngine(job_id)
+    engine.ollama = client
+    engine.ollama_clients = [client]
+
+    asyncio.run(engine._run_llm_analysis(components, ComponentDetector(tmp_path), []))
+
+    assert client.analyzed == ["svc/risky.py"]
+    assert [f["file_path"] for f in db.get_findings(job_id, scanner="llm")] == ["svc/risky.py"]
+    assert db.get_components(job_id)[0]["analysis_summary"] == "2 files"
+
+
+def test_unavailable_screen_model_skips_screening(tmp_path, monkeypatch):
+    from analysis.component_detector import ComponentDetector
+    from config import settings
+    from llm.ollama_client import ScreenModelUnavailable
+
+    monkeypatch.setattr(settings, "ollama_screen_model", "missing-model")
+    monkeypatch.setattr(settings, "llm_batch_size", 1)
+    monkeypatch.setattr(settings, "llm_concurrency_per_key", 1)
+    job_id = db.create_job("https://example.com/repo.git", "main", "model")
+    (tmp_path / "svc").mkdir()
+    for name in ("one", "two", "three"):
+        (tmp_path / "svc" / f"{name}.py").write_text(f"def {name}_handler(request):\n    return request.body\n" * 3)
+    files = [
+        {"path": f"svc/{name}.py", "language": "python", "size_bytes": 150, "llm_eligible": True}
+        for name in ("one", "two", "three")
+    ]
+    components = [{"name": "svc", "path": "svc", "component_type": "module", "language": "python", "files": files}]
+    components[0]["db_id"] = db.bulk_create_components(job_id, components)[0]
+
+    class BrokenScreenClient(FakeLLMClient):
+        screen_calls = 0
+
+        async def screen_code_batch(self, items, model):
+            BrokenScreenClient.screen_calls += 1
+            raise ScreenModelUnavailable(model)
+
+    client = BrokenScreenClient()
+    engine = AnalysisEngine(job_id)
+    engine.ollama = client
+    engine.ollama_clients = [client]
+
+    asyncio.run(engine._run_llm_analysis(components, ComponentDetector(tmp_path), []))
+
+    assert BrokenScreenClient.screen_calls == 1
+    assert sorted(client.analyzed) == ["svc/one.py", "svc/three.py", "svc/two.py"]
+
+
+def test_llm_file_reads_overlap_on_io_pool(tmp_path):
+    import threading
+    import time
+
+    job_id = db.create_job("https://example.com/repo.git", "main", "model")
+    files = [
+        {"path": f"src/f{idx}.py", "language": "python", "size_bytes": 100, "llm_eligible": True}
+        for idx in range(6)
+    ]
+    components = [{"name": "src", "path": "src", "component_type": "module", "language": "python", "files": files}]
+    components[0]["db_id"] = db.bulk_create_components(job_id, components)[0]
+
+    lock = threading.Lock()
+    reading = 0
+    peak = 0
+
+    class SlowDetector:
+        def get_file_content(self, file_path):
+            nonlocal reading, peak
+            with lock:
+                reading += 1
+                peak = max(peak, reading)
+            time.sleep(0.05)
+            with lock:
+                reading -= 1
+            return f"def handler():\n    return {file_path!r} * 40\n" * 3
+
+    client = FakeLLMClient()
+    engine = AnalysisEngine(job_id)
+    engine.ollama = client
+    engine.ollama_clients = [client]
+
+    asyncio.run(engine._run_llm_analysis(components, SlowDetector(), []))
+
+    assert sorted(client.analyzed) == sorted(f["path"] for f in files)
+    assert peak > 1
+
+
+def test_llm_batches_stay_within_one_packed_request(tmp_path, monkeypatch):
+    from analysis.component_detector import ComponentDetector
+
+    monkeypatch.setattr(engine_module, "MAX_CODE_LENGTH", 1000)
+    job_id = db.create_job("https://example.com/repo.git", "main", "model")
+    (tmp_path / "src").mkdir()
+    sizes = {"big1": 700, "big2": 600, "small1": 200, "small2": 100}
+    for name, size in sizes.items():
+        (tmp_path / "src" / f"{name}.py").write_text("x = 12345\n" * (size // 10))
+
+    files = [
+        {"path": f"src/{name}.py", "language": "python", "size_bytes": size, "llm_eligible": True}
+        for name, size in sizes.items()
+    ]
+    components = [{"name": "src", "path": "src", "component_type": "module", "language": "python", "files": files}]
+    components[0]["db_id"] = db.bulk_create_components(job_id, components)[0]
+
+    client = FakeLLMClient()
+    engine = AnalysisEngine(job_id)
+    engine.repo_path = tmp_path
+    engine.ollama = client
+    engine.ollama_clients = [client]
+
+    async def run():
+        # Let the producer fill the queue before the worker drains it
+        real_queue = asyncio.Queue
+
+        class PrefilledQueue(real_queue):
+            async def get(self):
+                await asyncio.sleep(0.05)
+                return await super().get()
+
+        monkeypatch.setattr(engine_module.asyncio, "Queue", PrefilledQueue)
+        await engine._run_llm_analysis(components, ComponentDetector(tmp_path), [])
+
+    asyncio.run(run())
+
+    assert sorted(path for batch in client.batches for path in batch) == sorted(f["path"] for f in files)
+    assert all(sum(sizes[p[4:-3]] for p in batch) <= 1000 for batch in client.batches)
+
+
+def test_name_preview_dedupes_and_bounds_names():
+    from analysis.engine import _name_preview
+
+    assert _name_preview(["api", "web", "api"]) == "api, web"
+    assert _name_preview([f"c{i}" for i in range(8)], limit=3) == "c0, c1, c2 (+5 more)"
+
+
+def test_minified_code_is_detected_from_line_length():
+    from analysis.engine import _looks_minified
+
+    assert _looks_minified("var a=1;" * 200)
+    assert not _looks_minified("def handler(request):\n    return request\n" * 200)
+    assert not _looks_minified("x" * 100)
+
+
+def test_low_signal_paths_are_matched_without_llm():
+    from analysis.engine import _is_low_signal_path
+
+    assert _is_low_signal_path("web/types/index.d.ts")
+    assert _is_low_signal_path("api/proto/user_pb2.py")
+    assert _is_low_signal_path("docs/conf.py")
+    assert _is_low_signal_path("app\\migrations\\0001_initial.py")
+    assert not _is_low_signal_path("api/auth/login.py")
+    assert not _is_low_signal_path("docs.py")
+
+
+def test_generate_report_stores_compact_json(tmp_path):
+    import json
+
+    class SummaryClient:
+        async def generate_executive_summary(self, **kwargs):
+            return "All good."
+
+    job_id = db.create_job("https://example.com/repo.git", "main", "model")
+    db.bulk_create_findings(job_id, [{"scanner": "gitleaks", "severity": "high", "title": "Secret"}])
+    engine = AnalysisEngine(job_id)
+    engine.ollama = SummaryClient()
+
+    asyncio.run(engine._generate_report([]))
+
+    content = db.get_report(job_id)["content"]
+    report = json.loads(content)
+    assert "\n" not in content
+    assert report["executive_summary"] == "All good."
+    assert [f["title"] for f in report["findings"]] == ["Secret"]
+
+
+def test_generate_report_caps_findings_per_severity(monkeypatch):
+    import json
+
+    from config import settings
+
+    class SummaryClient:
+        async def generate_executive_summary(self, **kwargs):
+            return "Summary."
+
+    monkeypatch.setattr(settings, "report_max_findings_per_severity", 2)
+    job_id = db.create_job("https://example.com/repo.git", "main", "model")
+    db.bulk_create_findings(job_id, [
+        {"scanner": "opengrep", "severity": severity, "title": f"{severity}-{idx}", "line_start": idx}
+        for severity, count in (("high", 3), ("low", 1))
+        for idx in range(count)
+    ])
+    engine = AnalysisEngine(job_id)
+    engine.ollama = SummaryClient()
+
+    asyncio.run(engine._generate_report([]))
+
+    report = json.loads(db.get_report(job_id)["content"])
+    assert [f["severity"] for f in report["findings"]] == ["high", "high", "low"]
+    assert report["findings_truncated"] is True
+    assert report["summary"]["total"] == 4
+
+
+def test_clone_repository_sparse_checkout(tmp_path, monkeypatch):
+    from git import Repo
+    from config import settings
+
+    origin = tmp_path / "origin"
+    (origin / "src").mkdir(parents=True)
+    (origin / "assets").mkdir()
+    (origin / "src" / "app.py").write_text("print('hi')\n")
+    (origin / "assets" / "logo.bin").write_bytes(b"\0" * 16)
+    repo = Repo.init(origin, initial_branch="main")
+    repo.index.add(["src/app.py", "assets/logo.bin"])
+    repo.index.commit("init")
+
+    monkeypatch.setattr(settings, "repos_dir", tmp_path / "repos")
+    monkeypatch.setattr(settings, "clone_sparse_paths", "src")
+    job_id = db.create_job(origin.as_uri(), "main", "model")
+    engine = AnalysisEngine(job_id)
+
+    repo_dir = asyncio.run(engine._clone_repository(origin.as_uri(), "main"))
+
+    assert (repo_dir / "src" / "app.py").exists()
+    assert not (repo_dir / "assets").exists()
+    assert db.get_job(job_id)["commit_hash"] == repo.head.commit.hexsha
+
+
+def test_repo_cleanup_moves_clone_aside_and_deletes_in_background(tmp_path):
+    repo_path = tmp_path / "repo_abc"
+    (repo_path / "src").mkdir(parents=True)
+    (repo_path / "src" / "app.py").write_text("x = 1\n")
+    (repo_path / ".git" / "objects").mkdir(parents=True)
+    pack = repo_path / ".git" / "objects" / "pack.idx"
+    pack.write_bytes(b"\0")
+    pack.chmod(0o444)
+    (repo_path / ".git" / "objects").chmod(0o555)
+
+    future = engine_module._schedule_repo_cleanup(repo_path)
+
+    assert not repo_path.exists()
+    future.result(timeout=5)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_clone_repository_runs_off_the_event_loop(tmp_path, monkeypatch):
+    from git import Repo
+
+    from config import settings
+
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "app.py").write_text("print('hi')\n")
+    origin = Repo.init(source, initial_branch="main")
+    origin.index.add(["app.py"])
+    origin.index.commit("init")
+
+    monkeypatch.setattr(settings, "repos_dir", tmp_path / "repos")
+    monkeypatch.setattr(settings, "clone_sparse_paths", "")
+    job_id = db.create_job("https://example.com/repo.git", "main", "model")
+    engine = AnalysisEngine(job_id)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        tick_task = asyncio.create_task(ticker())
+        try:
+            repo_dir = await engine._clone_repository(source.as_uri(), "main")
+        finally:
+            tick_task.cancel()
+        return repo_dir, ticks
+
+    repo_dir, ticks = asyncio.run(run())
+
+    assert (repo_dir / "app.py").exists()
+    assert ticks > 1
+    assert db.get_job(job_id)["commit_hash"] == origin.head.commit.hexsha
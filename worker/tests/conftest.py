@@ -1,6 +1,7 @@
 from pathlib import Path
 import os
 import sys
+import tempfile
 
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -8,3 +9,4 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 os.environ.setdefault("API_KEY", "test-key")
+os.environ.setdefault("DATABASE_PATH", str(Path(tempfile.mkdtemp()) / "bullseye.db"))
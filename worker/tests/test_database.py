@@ -0,0 +1,301 @@
+import sqlite3
+
+import pytest
+
+import database as database_module
+from database import Database
+
+
+@pytest.fixture
+def database(tmp_path):
+    return Database(tmp_path / "bullseye.db")
+
+
+def test_bulk_create_components_and_files(database):
+    job_id = database.create_job("https://example.com/repo.git", "main", "model")
+    components = [
+        {
+            "name": "api",
+            "path": "src/api",
+            "component_type": "service",
+            "language": "python",
+            "line_count": 12,
+            "files": [
+                {"path": "src/api/main.py", "language": "python", "line_count": 10, "size_bytes": 100},
+                {"path": "src/api/util.py", "language": "python", "line_count": 2, "size_bytes": 20},
+            ],
+        },
+        {"name": "web", "path": "src/web", "component_type": "module", "language": "typescript", "files": []},
+    ]
+
+    component_ids = database.bulk_create_components(job_id, components)
+    created = database.bulk_create_files(component_ids[0], job_id, components[0]["files"])
+
+    assert created == 2
+    stored = {c["id"]: c for c in database.get_components(job_id)}
+    assert stored[component_ids[0]]["file_count"] == 2
+    assert stored[component_ids[0]]["line_count"] == 12
+    assert stored[component_ids[1]]["file_count"] == 0
+    assert [f["path"] for f in database.get_files(component_ids[0])] == ["src/api/main.py", "src/api/util.py"]
+
+
+def test_bulk_create_components_with_files_in_one_call(database):
+    job_id = database.create_job("https://example.com/repo.git", "main", "model")
+    components = [
+        {"name": "api", "path": "src/api", "files": [{"path": "src/api/main.py", "size_bytes": 10}]},
+        {"name": "web", "path": "src/web", "files": [{"path": "src/web/a.ts"}, {"path": "src/web/b.ts"}]},
+    ]
+
+    api_id, web_id = database.bulk_create_components(job_id, components, include_files=True)
+
+    assert [f["path"] for f in database.get_files(api_id)] == ["src/api/main.py"]
+    assert [f["path"] for f in database.get_files(web_id)] == ["src/web/a.ts", "src/web/b.ts"]
+
+
+def test_update_job_status_unless_cancelled_keeps_cancellation(database):
+    job_id = database.create_job("https://example.com/repo.git", "main", "model")
+
+    assert database.update_job_status(job_id, "scanning", unless_cancelled=True) is True
+    database.update_job_status(job_id, "cancelled", message="Job stopped by user")
+
+    assert database.update_job_status(job_id, "analyzing", unless_cancelled=True) is False
+    assert database.get_job(job_id)["status"] == "cancelled"
+
+
+def test_bulk_create_findings_skips_duplicates_and_invalid_rows(database):
+    job_id = database.create_job("https://example.com/repo.git", "main", "model")
+    finding = {"scanner": "gitleaks", "severity": "high", "title": "Secret", "file_path": "a.py", "line_start": 3}
+
+    inserted = database.bulk_create_findings(job_id, [
+        finding,
+        dict(finding),
+        {**finding, "line_start": 4},
+        {**finding, "line_start": 5, "severity": "urgent"},
+    ])
+
+    assert inserted == 2
+    assert database.bulk_create_findings(job_id, [finding]) == 0
+    assert database.get_findings_summary(job_id)["high"] == 2
+
+
+def test_get_job_status(database):
+    job_id = database.create_job("https://example.com/repo.git", "main", "model")
+    database.update_job_status(job_id, "scanning")
+
+    assert database.get_job_status(job_id) == "scanning"
+    assert database.get_job_status("missing") is None
+
+
+def test_bulk_add_status_updates_keeps_timestamps(database):
+    job_id = database.create_job("https://example.com/repo.git", "main", "model")
+
+    database.bulk_add_status_updates(job_id, [
+        {"stage": "scanning", "message": "first", "progress": 10, "timestamp": "2030-01-01 00:00:01"},
+        {"stage": "scanning", "message": "second", "timestamp": "2030-01-01 00:00:02"},
+    ])
+
+    latest = database.get_status_updates(job_id, limit=2)
+    assert [u["message"] for u in latest] == ["second", "first"]
+    assert latest[1]["progress"] == 10
+
+
+def test_get_status_updates_pages_by_id(database):
+    job_id = database.create_job("https://example.com/repo.git", "main", "model")
+    for i in range(5):
+        database.add_status_update(job_id, "scanning", f"update {i}")
+
+    first = database.get_status_updates(job_id, limit=3)
+    older = database.get_status_updates(job_id, before_id=first[-1]["id"], limit=3)
+
+    assert [u["message"] for u in first] == ["update 4", "update 3", "update 2"]
+    assert [u["message"] for u in older[:2]] == ["update 1", "update 0"]
+    assert older[2]["stage"] == "created"
+    assert "job_id" not in first[0]
+
+
+def test_get_findings_summary_bulk(database):
+    first = database.create_job("https://example.com/a.git", "main", "model")
+    second = database.create_job("https://example.com/b.git", "main", "model")
+    database.bulk_create_findings(first, [
+        {"scanner": "gitleaks", "severity": "high", "title": "Secret", "file_path": "a.py", "line_start": 1},
+        {"scanner": "gitleaks", "severity": "low", "title": "Secret", "file_path": "a.py", "line_start": 2},
+    ])
+
+    summaries = database.get_findings_summary_bulk([first, second])
+
+    assert summaries[first] == database.get_findings_summary(first)
+    assert summaries[first]["total"] == 2
+    assert summaries[second]["total"] == 0
+    assert database.get_findings_summary_bulk([]) == {}
+
+
+def test_list_jobs_with_summary_matches_per_job_summaries(database):
+    first = database.create_job("https://example.com/a.git", "main", "model")
+    second = database.create_job("https://example.com/b.git", "main", "model")
+    database.update_job_status(second, "completed")
+    with database.get_connection() as conn:
+        conn.execute("UPDATE jobs SET created_at = '2030-01-01 00:00:00' WHERE id = ?", (second,))
+    database.bulk_create_findings(second, [
+        {"scanner": "gitleaks", "severity": "high", "title": "Secret", "file_path": "a.py", "line_start": 1},
+        {"scanner": "gitleaks", "severity": "high", "title": "Secret", "file_path": "a.py", "line_start": 2},
+        {"scanner": "lizard", "severity": "info", "title": "Complex", "file_path": "b.py", "line_start": 1},
+    ])
+
+    jobs = [j for j in database.list_jobs_with_summary(limit=100) if j["id"] in (first, second)]
+
+    assert [j["id"] for j in jobs] == [second, first]
+    by_id = {j["id"]: j for j in jobs}
+    assert by_id[second]["findings_count"] == database.get_findings_summary(second)
+    assert by_id[first]["findings_count"]["total"] == 0
+    assert second in [j["id"] for j in database.list_jobs_with_summary(status="completed")]
+    assert first not in [j["id"] for j in database.list_jobs_with_summary(status="completed")]
+    assert len(database.list_jobs_with_summary(limit=1)) == 1
+
+
+def test_update_job_status_publishes_stored_progress(database, monkeypatch):
+    published = []
+    monkeypatch.setattr(database_module, "publish_job_status", lambda job_id, payload: published.append((job_id, payload)))
+    job_id = database.create_job("https://example.com/repo.git", "main", "model")
+
+    database.update_job_status(job_id, "scanning", message="Scanning", progress=40, progress_detail="gitleaks")
+    database.update_job_status(job_id, "scanning", message="Still scanning")
+
+    assert published[-1] == (job_id, {
+        "status": "scanning",
+        "progress": 40,
+        "progress_total": 100,
+        "message": "Still scanning",
+        "detail": "gitleaks",
+        "rev": 2,
+    })
+
+
+def test_create_job_with_task_id_returns_stored_row(database):
+    job = database.create_job_with_task_id(
+        "https://example.com/repo.git", "main", "model", "task-1", config={"ollama_api_key": "k"}
+    )
+
+    assert job == database.get_job(job["id"])
+    assert job["celery_task_id"] == "task-1"
+    assert job["config"] == {"ollama_api_key": "k"}
+    assert [u["stage"] for u in database.get_status_updates(job["id"])] == ["created"]
+
+
+def test_get_job_if_newer_tracks_status_revisions(database):
+    job_id = database.create_job("https://example.com/repo.git", "main", "model")
+    rev = database.get_job(job_id)["status_rev"]
+
+    assert database.get_job_if_newer(job_id, rev) is None
+    database.update_job_status(job_id, "scanning", progress=10)
+
+    job = database.get_job_if_newer(job_id, rev)
+    assert job["progress"] == 10
+    assert database.get_job_if_newer(job_id, job["status_rev"]) is None
+
+
+def test_create_jobs_bulk(database):
+    job_ids = database.create_jobs_bulk([
+        {"repo_url": "https://example.com/a.git", "model": "model", "celery_task_id": "task-a"},
+        {"repo_url": "https://example.com/b.git", "branch": "dev", "model": "model", "name": "B", "config": {"x": 1}},
+    ])
+
+    first, second = (database.get_job(job_id) for job_id in job_ids)
+    assert (first["name"], first["celery_task_id"], first["branch"]) == ("Analysis of a", "task-a", "main")
+    assert (second["name"], second["branch"], second["config"]) == ("B", "dev", {"x": 1})
+    assert [u["stage"] for u in database.get_status_updates(job_ids[1])] == ["created"]
+
+
+def test_get_findings_and_components_select_columns(database):
+    job_id = database.create_job("https://example.com/repo.git", "main", "model")
+    database.bulk_create_components(job_id, [{"name": "api", "path": "src/api", "component_type": None}])
+    database.bulk_create_findings(job_id, [
+        {"scanner": "gitleaks", "severity": "high", "title": "Secret", "file_path": "a.py", "line_start": 1},
+    ])
+
+    findings = database.get_findings(job_id, columns=("title", "severity"))
+    components = database.get_components(job_id, columns=("name", "COALESCE(component_type, 'module') AS component_type"))
+
+    assert findings == [{"title": "Secret", "severity": "high"}]
+    assert components == [{"name": "api", "component_type": "module"}]
+
+
+def test_bulk_create_findings_commits_in_batches(database, monkeypatch):
+    monkeypatch.setattr(database_module, "FINDINGS_BATCH_SIZE", 2)
+    job_id = database.create_job("https://example.com/repo.git", "main", "model")
+    findings = [
+        {"scanner": "lizard", "severity": "low", "title": "Complex", "file_path": "a.py", "line_start": line}
+        for line in range(5)
+    ]
+
+    assert database.bulk_create_findings(job_id, findings + findings[:1]) == 5
+    assert database.get_findings_summary(job_id)["total"] == 5
+
+
+def test_pooled_connections_serve_more_threads_than_pool_size(database):
+    from concurrent.futures import ThreadPoolExecutor
+
+    job_id = database.create_job("https://example.com/repo.git", "main", "model")
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(lambda i: database.add_status_update(job_id, "scanning", f"step {i}"), range(64)))
+
+    assert len(database.get_status_updates(job_id, limit=100)) == 65
+
+
+def test_reader_connections_are_read_only(database):
+    job_id = database.create_job("https://example.com/repo.git", "main", "model")
+
+    with pytest.raises(sqlite3.OperationalError):
+        with database.reader() as conn:
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+    assert database.get_job(job_id) is not None
+
+
+def test_get_stats_counts_and_refreshes_after_writes(database):
+    job_id = database.create_job("https://example.com/repo.git", "main", "model")
+    database.update_job_status(job_id, "scanning")
+
+    assert database.get_stats()["jobs"] == {"total": 1, "completed": 0, "failed": 0, "running": 1}
+
+    database.update_job_status(job_id, "completed")
+    database.bulk_create_findings(job_id, [
+        {"scanner": "gitleaks", "severity": "critical", "title": "Secret", "file_path": "a.py", "line_start": 1},
+        {"scanner": "lizard", "severity": "info", "title": "Complex", "file_path": "a.py", "line_start": 2},
+    ])
+
+    stats = database.get_stats()
+    assert stats["jobs"]["completed"] == 1
+    assert stats["findings"] == {"total": 2, "critical": 1, "high": 0, "medium": 0, "low": 0}
+
+
+def test_mint_ids_are_unique_uuid4_strings():
+    import uuid
+
+    ids = database_module._mint_ids(500)
+
+    assert len(set(ids)) == 500
+    assert all(str(uuid.UUID(value)) == value and uuid.UUID(value).version == 4 for value in ids)
+    assert database_module._mint_ids(0) == []
+
+
+def test_update_job_status_stamps_start_and_completion(database):
+    job_id = database.create_job("https://example.com/repo.git", "main", "model")
+
+    database.update_job_status(job_id, "cloning")
+    started = database.get_job(job_id)
+    database.update_job_status(job_id, "completed")
+    completed = database.get_job(job_id)
+
+    assert started["started_at"] and started["completed_at"] is None
+    assert completed["started_at"] == started["started_at"]
+    assert completed["completed_at"] >= started["started_at"]
+    assert "T" in completed["completed_at"]
+
+
+def test_get_jobs_decodes_config_only_when_selected(database):
+    job_id = database.create_job("https://example.com/repo.git", "main", "model", config={"ollama_api_key": "k"})
+
+    full = next(j for j in database.get_jobs(limit=100) if j["id"] == job_id)
+    slim = next(j for j in database.get_jobs(limit=100, columns=("id", "status")) if j["id"] == job_id)
+
+    assert full["config"] == {"ollama_api_key": "k"}
+    assert slim == {"id": job_id, "status": "pending"}
@@ -0,0 +1,169 @@
+import asyncio
+import json
+
+from llm.ollama_client import MAX_CODE_LENGTH, OllamaCloudClient
+
+
+def _client(monkeypatch, responses):
+    client = OllamaCloudClient(api_key="test")
+    prompts = []
+
+    async def fake_chat(messages, temperature=0.3, model=None, allow_fallback=True):
+        prompts.append(messages[-1]["content"])
+        return responses.pop(0)
+
+    monkeypatch.setattr(client, "chat", fake_chat)
+    return client, prompts
+
+
+def test_analyze_code_batch_packs_small_files(monkeypatch):
+    response = json.dumps({"files": {
+        "a.py": {"summary": "A", "security_issues": [{"title": "x"}]},
+        "b.py": {"summary": "B"},
+    }})
+    client, prompts = _client(monkeypatch, [response])
+
+    results = asyncio.run(client.analyze_code_batch([
+        {"code": "print('a')", "file_path": "a.py", "language": "python"},
+        {"code": "print('b')", "file_path": "b.py", "language": "python"},
+    ]))
+
+    assert len(prompts) == 1
+    assert [r["summary"] for r in results] == ["A", "B"]
+    assert results[0]["security_issues"] == [{"title": "x"}]
+
+
+def test_analyze_code_batch_falls_back_for_missing_and_large_files(monkeypatch):
+    responses = [
+        json.dumps({"files": {"a.py": {"summary": "A"}}}),
+        json.dumps({"summary": "B alone"}),
+        json.dumps({"summary": "big alone"}),
+    ]
+    client, prompts = _client(monkeypatch, responses)
+
+    results = asyncio.run(client.analyze_code_batch([
+        {"code": "print('a')", "file_path": "a.py", "language": "python"},
+        {"code": "print('b')", "file_path": "b.py", "language": "python"},
+        {"code": "x" * MAX_CODE_LENGTH, "file_path": "big.py", "language": "python"},
+    ]))
+
+    assert len(prompts) == 3
+    assert [r["summary"] for r in results] == ["A", "B alone", "big alone"]
+
+
+def test_clients_share_injected_http_pool():
+    import httpx
+
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers["Authorization"])
+        return httpx.Response(200, json={"message": {"content": "ok"}})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+            clients = [OllamaCloudClient(api_key=key, http_client=http_client) for key in ("k1", "k2")]
+            return [await client.chat([{"role": "user", "content": "hi"}]) for client in clients]
+
+    assert asyncio.run(run()) == ["ok", "ok"]
+    assert seen == ["Bearer k1", "Bearer k2"]
+
+
+def test_requests_on_one_key_overlap_up_to_configured_slots(monkeypatch):
+    import httpx
+
+    from config import settings
+    from llm import ollama_client
+
+    monkeypatch.setattr(settings, "llm_concurrency_per_key", 2)
+    monkeypatch.setattr(settings, "llm_request_delay", 0.0)
+    monkeypatch.setattr(ollama_client, "_ollama_slots", {})
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return httpx.Response(200, json={"message": {"content": "ok"}})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+            client = OllamaCloudClient(api_key="slots", http_client=http_client)
+            await asyncio.gather(*(client.chat([{"role": "user", "content": "hi"}]) for _ in range(4)))
+
+    asyncio.run(run())
+    assert peak == 2
+
+
+def test_key_slots_survive_a_new_event_loop(monkeypatch):
+    import httpx
+
+    from config import settings
+    from llm import ollama_client
+
+    monkeypatch.setattr(settings, "llm_concurrency_per_key", 1)
+    monkeypatch.setattr(settings, "llm_request_delay", 0.0)
+    monkeypatch.setattr(ollama_client, "_ollama_slots", {})
+
+    async def handler(request):
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"message": {"content": "ok"}})
+
+    async def run():
+        # Contended, so the slot semaphore binds to this loop
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+            client = OllamaCloudClient(api_key="per-loop", http_client=http_client)
+            return await asyncio.gather(*(client.chat([{"role": "user", "content": "hi"}]) for _ in range(3)))
+
+    # Each Celery task runs its own loop in the same process
+    assert asyncio.run(run()) == ["ok"] * 3
+    assert asyncio.run(run()) == ["ok"] * 3
+
+
+def test_screen_code_batch_treats_unclear_entries_as_suspicious(monkeypatch):
+    response = json.dumps({"files": {
+        "a.py": {"suspicious": False, "summary": "Helpers"},
+        "b.py": {"summary": "No verdict"},
+    }})
+    client, prompts = _client(monkeypatch, [response])
+
+    results = asyncio.run(client.screen_code_batch([
+        {"code": "print('a')", "file_path": "a.py", "language": "python"},
+        {"code": "print('b')", "file_path": "b.py", "language": "python"},
+        {"code": "print('c')", "file_path": "c.py", "language": "python"},
+    ], model="small"))
+
+    assert results == {
+        "a.py": {"suspicious": False, "summary": "Helpers"},
+        "b.py": {"suspicious": True, "summary": "No verdict"},
+    }
+    assert len(prompts) == 1
+
+
+def test_screen_code_batch_never_falls_back_to_analysis_models(monkeypatch):
+    import httpx
+    import pytest
+
+    from config import settings
+    from llm.ollama_client import ScreenModelUnavailable
+
+    monkeypatch.setattr(settings, "llm_request_delay", 0.0)
+    requested = []
+
+    def handler(request):
+        requested.append(json.loads(request.content)["model"])
+        return httpx.Response(404, json={"error": "model not found"})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+            client = OllamaCloudClient(api_key="screen", http_client=http_client)
+            await client.screen_code_batch(
+                [{"code": "print('a')", "file_path": "a.py", "language": "python"}], model="small"
+            )
+
+    with pytest.raises(ScreenModelUnavailable):
+        asyncio.run(run())
+    assert requested == ["small"]
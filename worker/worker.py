@@ -5,10 +5,22 @@ Bull's Eye - Celery Worker Configuration
 import asyncio
 from typing import Optional
 from celery import Celery
+import orjson
 import structlog
 
 from config import settings
 
+try:
+    import uvloop
+except ImportError:  # not available on Windows
+    uvloop = None
+
+
+def _orjson_dumps(event_dict, **kwargs) -> str:
+    """Serialize log events with orjson for the JSON renderer."""
+    return orjson.dumps(event_dict, **kwargs).decode()
+
+
 # Configure structlog
 structlog.configure(
     processors=[
@@ -20,7 +32,9 @@ structlog.configure(
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
         structlog.processors.UnicodeDecoder(),
-        structlog.dev.ConsoleRenderer()
+        structlog.processors.JSONRenderer(serializer=_orjson_dumps)
+        if settings.log_format == "json"
+        else structlog.dev.ConsoleRenderer()
     ],
     wrapper_class=structlog.stdlib.BoundLogger,
     context_class=dict,
@@ -61,8 +75,8 @@ def analyze_repository(self, job_id: str, model: Optional[str] = None):
         # Create engine and run analysis
         engine = AnalysisEngine(job_id, model)
         
-        # Run async analysis in sync context
-        loop = asyncio.new_event_loop()
+        # Run async analysis in sync context, on uvloop when installed
+        loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         try:
             result = loop.run_until_complete(engine.run())